@@ -0,0 +1,86 @@
+"""
+Known-address filter for Mode S address/parity replies.
+
+DF0/4/5/16/20/21 replies overlay the transponder address on the parity
+field, so any corrupted frame still "decodes" to some address. Such replies
+are only trusted when their address was recently confirmed by a frame whose
+parity could be checked (DF11 all-call or DF17 extended squitter).
+"""
+
+import time
+from typing import Any, Dict, Optional
+
+
+# Formats whose address is overlaid on the parity field
+ADDRESS_PARITY_FORMATS = frozenset((0, 4, 5, 16, 20, 21))
+
+# Parity-checked formats that confirm an address (DF18 is left out, it may carry non-ICAO addresses)
+CONFIRMING_FORMATS = frozenset((11, 17))
+
+
+class KnownAddressFilter:
+    """Set of recently confirmed ICAO addresses with per-address expiry."""
+
+    def __init__(self, timeout: float = 60.0, prune_interval: float = 10.0):
+        self.timeout = timeout
+        self.prune_interval = prune_interval
+        self.addresses: Dict[int, float] = {}  # address -> monotonic time last confirmed
+        self._next_prune = 0.0
+
+        # Statistics
+        self.accepted = 0
+        self.rejected = 0
+        self.expired = 0
+
+    def __len__(self) -> int:
+        return len(self.addresses)
+
+    def confirm(self, address: int, now: Optional[float] = None) -> None:
+        """Record a parity-checked frame from an address."""
+        if now is None:
+            now = time.monotonic()
+        self.addresses[address] = now
+        if now >= self._next_prune:
+            self.prune(now)
+
+    def is_known(self, address: int, now: Optional[float] = None) -> bool:
+        """Check an address/parity reply's address against the confirmed set."""
+        confirmed = self.addresses.get(address)
+        if confirmed is not None:
+            if now is None:
+                now = time.monotonic()
+            if now - confirmed <= self.timeout:
+                self.accepted += 1
+                return True
+        self.rejected += 1
+        return False
+
+    def admit(self, df: Optional[int], address: int, now: Optional[float] = None) -> bool:
+        """Confirm checked formats; admit address/parity replies only from known addresses."""
+        if df in CONFIRMING_FORMATS:
+            self.confirm(address, now)
+            return True
+        if df in ADDRESS_PARITY_FORMATS:
+            return self.is_known(address, now)
+        return True
+
+    def prune(self, now: Optional[float] = None) -> int:
+        """Forget addresses not confirmed within the timeout."""
+        if now is None:
+            now = time.monotonic()
+        self._next_prune = now + self.prune_interval
+        cutoff = now - self.timeout
+        stale = [address for address, confirmed in self.addresses.items() if confirmed < cutoff]
+        for address in stale:
+            del self.addresses[address]
+        self.expired += len(stale)
+        return len(stale)
+
+    def get_statistics(self) -> Dict[str, Any]:
+        """Get filter statistics."""
+        return {
+            "known_addresses": len(self.addresses),
+            "accepted": self.accepted,
+            "rejected": self.rejected,
+            "expired": self.expired
+        }
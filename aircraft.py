@@ -4,20 +4,53 @@ Aircraft data structures and tracking logic for Ursine Capture system.
 
 import json
 import logging
-from dataclasses import dataclass, field, asdict
+import time
+from dataclasses import dataclass, field
 from datetime import datetime, timedelta
-from typing import Dict, Optional, Any
+from typing import Callable, Dict, List, Optional, Any, Tuple
+from emergency import classify_emergency
+from spatial_index import GridIndex
+from timing_wheel import TimingWheel
+from track_history import TrackHistoryStore
 from utils import (validate_icao, safe_int, safe_float, error_handler, 
-                  ErrorSeverity, ComponentType, handle_exception, safe_execute)
+                  ErrorSeverity, ComponentType, handle_exception, safe_execute, atomic_write)
 
 
 logger = logging.getLogger(__name__)
 
 
-@dataclass
+# Offset for converting time.monotonic() readings to wall-clock timestamps
+_WALL_CLOCK_OFFSET = time.time() - time.monotonic()
+
+# Downlink formats whose squawk arrives without a parity check
+_UNCHECKED_SQUAWK_FORMATS = (5, 21)
+
+
+def _to_datetime(monotonic_time: Optional[float]) -> Optional[datetime]:
+    """Convert a time.monotonic() reading to a local datetime."""
+    if monotonic_time is None:
+        return None
+    return datetime.fromtimestamp(_WALL_CLOCK_OFFSET + monotonic_time)
+
+
+@dataclass(slots=True)
+class WatchlistState:
+    """Watchlist tracking, only allocated for aircraft on the watchlist."""
+    first_detected: float
+    last_alerted: Optional[float] = None
+    alert_count: int = 0
+    name: str = ""
+
+
+@dataclass(slots=True)
 class Aircraft:
-    """Aircraft data structure with all tracking information."""
+    """Aircraft data structure with all tracking information.
+    
+    Timestamps are stored as time.monotonic() floats; last_seen, first_seen
+    and the watchlist timestamps are exposed as datetime properties.
+    """
     icao: str
+    address: int = -1  # 24-bit ICAO address, derived from icao if not given
     callsign: Optional[str] = None
     altitude: Optional[int] = None
     speed: Optional[int] = None
@@ -26,51 +59,140 @@ class Aircraft:
     longitude: Optional[float] = None
     squawk: Optional[str] = None
     vertical_rate: Optional[int] = None
-    last_seen: datetime = field(default_factory=datetime.now)
-    first_seen: datetime = field(default_factory=datetime.now)
+    on_ground: bool = False
+    spi: bool = False  # special position identification (ident) pulse
+    emergency_state: int = 0  # TC 28 emergency state, 0 when none
+    emergency: Optional[str] = None  # declared emergency, see emergency.classify_emergency
+    emergency_alerted: Optional[str] = None  # emergency the last priority alert was sent for
+    last_seen_mono: float = field(default_factory=time.monotonic)
+    first_seen_mono: float = field(default_factory=time.monotonic)
     message_count: int = 0
     on_watchlist: bool = False
-    # Watchlist-specific tracking
-    watchlist_first_detected: Optional[datetime] = None
-    watchlist_last_alerted: Optional[datetime] = None
-    watchlist_alert_count: int = 0
-    watchlist_name: str = ""
+    watchlist: Optional[WatchlistState] = None
     
     def __post_init__(self):
-        """Validate ICAO after initialization."""
-        if not validate_icao(self.icao):
-            raise ValueError(f"Invalid ICAO: {self.icao}")
+        """Validate ICAO after initialization (skipped for pre-validated addresses)."""
+        if self.address < 0:
+            if not validate_icao(self.icao):
+                raise ValueError(f"Invalid ICAO: {self.icao}")
+            self.address = int(self.icao, 16)
+    
+    @property
+    def last_seen(self) -> datetime:
+        """Get time the aircraft was last seen."""
+        return _to_datetime(self.last_seen_mono)
     
-    def update_from_message(self, message: Dict[str, Any]) -> None:
-        """Update aircraft data from decoded ADS-B message with error handling."""
+    @property
+    def first_seen(self) -> datetime:
+        """Get time the aircraft was first seen."""
+        return _to_datetime(self.first_seen_mono)
+    
+    @property
+    def watchlist_first_detected(self) -> Optional[datetime]:
+        """Get time the aircraft was first detected on the watchlist."""
+        return _to_datetime(self.watchlist.first_detected) if self.watchlist else None
+    
+    @property
+    def watchlist_last_alerted(self) -> Optional[datetime]:
+        """Get time of the last watchlist alert."""
+        return _to_datetime(self.watchlist.last_alerted) if self.watchlist else None
+    
+    @property
+    def watchlist_alert_count(self) -> int:
+        """Get number of watchlist alerts sent."""
+        return self.watchlist.alert_count if self.watchlist else 0
+    
+    @property
+    def watchlist_name(self) -> str:
+        """Get watchlist display name."""
+        return self.watchlist.name if self.watchlist else ""
+    
+    @watchlist_name.setter
+    def watchlist_name(self, name: str) -> None:
+        if self.watchlist:
+            self.watchlist.name = name
+    
+    def update_from_message(self, message: Dict[str, Any]) -> List[str]:
+        """Update aircraft data from decoded ADS-B message, returning the names of fields whose value changed."""
+        changed: List[str] = []
         try:
-            self.last_seen = datetime.now()
+            self.last_seen_mono = time.monotonic()
             self.message_count += 1
             
             # Update fields if present in message
             if 'callsign' in message and message['callsign']:
-                self.callsign = str(message['callsign']).strip()
+                callsign = str(message['callsign']).strip()
+                if callsign != self.callsign:
+                    self.callsign = callsign
+                    changed.append('callsign')
                 
             if 'altitude' in message:
-                self.altitude = safe_int(message['altitude'])
+                altitude = safe_int(message['altitude'])
+                if altitude != self.altitude:
+                    self.altitude = altitude
+                    changed.append('altitude')
                 
             if 'speed' in message:
-                self.speed = safe_int(message['speed'])
+                speed = safe_int(message['speed'])
+                if speed != self.speed:
+                    self.speed = speed
+                    changed.append('speed')
                 
             if 'track' in message:
-                self.track = safe_int(message['track'])
+                track = safe_int(message['track'])
+                if track != self.track:
+                    self.track = track
+                    changed.append('track')
                 
             if 'latitude' in message:
-                self.latitude = safe_float(message['latitude'])
+                latitude = safe_float(message['latitude'])
+                if latitude != self.latitude:
+                    self.latitude = latitude
+                    changed.append('latitude')
                 
             if 'longitude' in message:
-                self.longitude = safe_float(message['longitude'])
+                longitude = safe_float(message['longitude'])
+                if longitude != self.longitude:
+                    self.longitude = longitude
+                    changed.append('longitude')
                 
+            emergency_changed = False
             if 'squawk' in message and message['squawk']:
-                self.squawk = str(message['squawk'])
+                squawk = str(message['squawk'])
+                # Replies with address/parity are unchecked: an emergency code must repeat
+                if squawk == self.squawk or message.get('df') not in _UNCHECKED_SQUAWK_FORMATS:
+                    emergency_changed = True
+                if squawk != self.squawk:
+                    self.squawk = squawk
+                    changed.append('squawk')
+            
+            if 'emergency_state' in message:
+                self.emergency_state = safe_int(message['emergency_state']) or 0
+                emergency_changed = True
+            
+            if emergency_changed:
+                emergency = classify_emergency(self.squawk, self.emergency_state)
+                if emergency != self.emergency:
+                    self.emergency = emergency
+                    changed.append('emergency')
                 
             if 'vertical_rate' in message:
-                self.vertical_rate = safe_int(message['vertical_rate'])
+                vertical_rate = safe_int(message['vertical_rate'])
+                if vertical_rate != self.vertical_rate:
+                    self.vertical_rate = vertical_rate
+                    changed.append('vertical_rate')
+            
+            if 'on_ground' in message:
+                on_ground = bool(message['on_ground'])
+                if on_ground != self.on_ground:
+                    self.on_ground = on_ground
+                    changed.append('on_ground')
+            
+            if 'spi' in message:
+                spi = bool(message['spi'])
+                if spi != self.spi:
+                    self.spi = spi
+                    changed.append('spi')
                 
         except Exception as e:
             error_handler.handle_error(
@@ -80,18 +202,37 @@ class Aircraft:
                 error_code="AIRCRAFT_UPDATE_ERROR",
                 details=f"Message: {str(message)[:200]}"
             )
+        return changed
     
     def to_dict(self) -> Dict[str, Any]:
         """Convert aircraft to dictionary for JSON serialization."""
-        data = asdict(self)
-        # Convert datetime objects to ISO strings
-        data['last_seen'] = self.last_seen.isoformat()
-        data['first_seen'] = self.first_seen.isoformat()
-        return data
+        watchlist = self.watchlist
+        return {
+            'icao': self.icao,
+            'callsign': self.callsign,
+            'altitude': self.altitude,
+            'speed': self.speed,
+            'track': self.track,
+            'latitude': self.latitude,
+            'longitude': self.longitude,
+            'squawk': self.squawk,
+            'vertical_rate': self.vertical_rate,
+            'emergency': self.emergency,
+            # Convert timestamps to ISO strings
+            'last_seen': self.last_seen.isoformat(),
+            'first_seen': self.first_seen.isoformat(),
+            'message_count': self.message_count,
+            'on_watchlist': self.on_watchlist,
+            'watchlist_first_detected': self.watchlist_first_detected.isoformat() if watchlist else None,
+            'watchlist_last_alerted': (self.watchlist_last_alerted.isoformat()
+                                       if watchlist and watchlist.last_alerted is not None else None),
+            'watchlist_alert_count': self.watchlist_alert_count,
+            'watchlist_name': self.watchlist_name
+        }
     
     def is_stale(self, timeout: int = 300) -> bool:
         """Check if aircraft data is stale (not seen recently)."""
-        return (datetime.now() - self.last_seen).total_seconds() > timeout
+        return time.monotonic() - self.last_seen_mono > timeout
     
     def get_display_name(self) -> str:
         """Get display name for aircraft (callsign or ICAO)."""
@@ -99,6 +240,11 @@ class Aircraft:
             return self.callsign.strip()
         return self.icao
     
+    @property
+    def alert_key(self) -> str:
+        """Key for de-duplicating queued watchlist alerts."""
+        return self.icao
+    
     def has_position(self) -> bool:
         """Check if aircraft has valid position data."""
         return (self.latitude is not None and 
@@ -108,58 +254,79 @@ class Aircraft:
     
     def get_age_seconds(self) -> int:
         """Get age of aircraft data in seconds."""
-        return int((datetime.now() - self.last_seen).total_seconds())
+        return int(time.monotonic() - self.last_seen_mono)
     
     def is_new_watchlist_detection(self) -> bool:
         """Check if this is a new watchlist aircraft detection."""
         return (self.on_watchlist and 
-                self.watchlist_first_detected is not None and
-                self.watchlist_last_alerted is None)
+                self.watchlist is not None and
+                self.watchlist.last_alerted is None)
     
     def should_send_watchlist_alert(self, alert_interval: int = 300) -> bool:
         """Check if we should send a watchlist alert for this aircraft."""
-        if not self.on_watchlist:
+        if not self.on_watchlist or self.watchlist is None:
             return False
             
         # Always alert on first detection (when first_detected is set but never alerted)
-        if self.watchlist_first_detected is not None and self.watchlist_last_alerted is None:
+        if self.watchlist.last_alerted is None:
             return True
             
         # Alert if enough time has passed since last alert
-        if self.watchlist_last_alerted is not None:
-            time_since_last_alert = (datetime.now() - self.watchlist_last_alerted).total_seconds()
-            return time_since_last_alert >= alert_interval
-            
-        return False
+        return time.monotonic() - self.watchlist.last_alerted >= alert_interval
     
     def mark_watchlist_detected(self, watchlist_name: str = "") -> None:
         """Mark aircraft as detected on watchlist."""
-        if self.watchlist_first_detected is None:
-            self.watchlist_first_detected = datetime.now()
-        self.watchlist_name = watchlist_name
+        if self.watchlist is None:
+            self.watchlist = WatchlistState(first_detected=time.monotonic())
+        self.watchlist.name = watchlist_name
     
     def mark_watchlist_alerted(self) -> None:
         """Mark that an alert was sent for this watchlist aircraft."""
-        self.watchlist_last_alerted = datetime.now()
-        self.watchlist_alert_count += 1
+        if self.watchlist is None:
+            self.watchlist = WatchlistState(first_detected=time.monotonic())
+        self.watchlist.last_alerted = time.monotonic()
+        self.watchlist.alert_count += 1
     
     def clear_watchlist_status(self) -> None:
         """Clear watchlist status when aircraft is removed from watchlist."""
         self.on_watchlist = False
-        self.watchlist_first_detected = None
-        self.watchlist_last_alerted = None
-        self.watchlist_alert_count = 0
-        self.watchlist_name = ""
+        self.watchlist = None
 
 
 class AircraftTracker:
     """Manages collection of tracked aircraft."""
     
-    def __init__(self):
+    def __init__(self, history_size: int = 120, history_max_samples: int = 200000):
         self.aircraft: Dict[str, Aircraft] = {}
+        self._by_address: Dict[int, Aircraft] = {}  # same aircraft keyed by 24-bit address
         self.watchlist_icaos: set = set()
         self.watchlist_entries: Dict[str, str] = {}  # icao -> name mapping
         
+        # Incremental export state
+        self._dirty: set = set()  # ICAOs changed since the last export
+        self._fragments: Dict[str, str] = {}  # icao -> cached JSON object
+        self._removed = False  # aircraft removed since the last export
+        self._export_json: Optional[str] = None
+        self._export_version = 0
+        self._saved_export: Optional[tuple] = None  # (filename, export version) last written
+        
+        # Called with the ICAO of each aircraft dropped by cleanup_stale or expire
+        self.on_removed: Optional[Callable[[str], None]] = None
+        
+        # Called with each updated aircraft and the names of the fields that changed
+        self.on_changed: Optional[Callable[[Aircraft, List[str]], None]] = None
+        
+        # Expiry wheel keyed by address; deadlines are re-checked lazily when due
+        self.airborne_timeout = 300.0
+        self.surface_timeout = 60.0
+        self.expiry = TimingWheel()
+        
+        # Position trails (None when disabled)
+        self.history = TrackHistoryStore(history_size, history_max_samples) if history_size > 0 else None
+        
+        # Positioned aircraft keyed by address, for range and nearest queries
+        self.spatial = GridIndex()
+        
     def update_aircraft(self, icao: str, data: Dict[str, Any]) -> Aircraft:
         """Update or create aircraft from message data."""
         try:
@@ -170,18 +337,19 @@ class AircraftTracker:
                 return None
                 
             # Create new aircraft if not exists
-            if icao not in self.aircraft:
-                aircraft = Aircraft(icao=icao)
-                if icao in self.watchlist_icaos:
-                    aircraft.on_watchlist = True
-                    aircraft.mark_watchlist_detected(self.watchlist_entries.get(icao, ''))
-                self.aircraft[icao] = aircraft
-                logger.debug(f"New aircraft tracked: {icao}")
-            else:
-                aircraft = self.aircraft[icao]
+            aircraft = self.aircraft.get(icao)
+            if aircraft is None:
+                aircraft = self._add_aircraft(int(icao, 16))
             
             # Update with new data
-            aircraft.update_from_message(data)
+            changed = aircraft.update_from_message(data)
+            self._dirty.add(icao)
+            if data.get('on_ground'):
+                self._schedule_expiry(aircraft)
+            if 'latitude' in data:
+                self._record_position(aircraft)
+            if changed and self.on_changed:
+                self.on_changed(aircraft, changed)
             
             return aircraft
             
@@ -189,29 +357,96 @@ class AircraftTracker:
             logger.error(f"Error updating aircraft {icao}: {e}")
             return None
     
+    def update_aircraft_fast(self, address: int, data: Dict[str, Any]) -> Aircraft:
+        """Update or create aircraft by 24-bit ICAO address already validated by the decoder."""
+        aircraft = self._by_address.get(address)
+        if aircraft is None:
+            aircraft = self._add_aircraft(address)
+        changed = aircraft.update_from_message(data)
+        self._dirty.add(aircraft.icao)
+        if data.get('on_ground'):
+            # Surface timeout is shorter, move the deadline forward
+            self._schedule_expiry(aircraft)
+        if 'latitude' in data:
+            self._record_position(aircraft)
+        if changed and self.on_changed:
+            self.on_changed(aircraft, changed)
+        return aircraft
+    
+    def _record_position(self, aircraft: Aircraft) -> None:
+        """Move an aircraft in the spatial index and add its new position to its trail."""
+        if not aircraft.has_position():
+            self.spatial.remove(aircraft.address)
+            return
+        self.spatial.update(aircraft.address, aircraft.latitude, aircraft.longitude)
+        if self.history is not None:
+            self.history.record(aircraft.address, aircraft.last_seen_mono, aircraft.latitude,
+                                aircraft.longitude, aircraft.altitude, aircraft.speed)
+    
+    def _add_aircraft(self, address: int) -> Aircraft:
+        """Create and index a new aircraft; the hex ICAO string is built only here."""
+        icao = f"{address:06X}"
+        aircraft = Aircraft(icao=icao, address=address)
+        if icao in self.watchlist_icaos:
+            aircraft.on_watchlist = True
+            aircraft.mark_watchlist_detected(self.watchlist_entries.get(icao, ''))
+        self.aircraft[icao] = aircraft
+        self._by_address[address] = aircraft
+        self._schedule_expiry(aircraft)
+        logger.debug(f"New aircraft tracked: {icao}")
+        return aircraft
+    
+    def _schedule_expiry(self, aircraft: Aircraft) -> None:
+        """File an aircraft in the expiry wheel at its current deadline."""
+        timeout = self.surface_timeout if aircraft.on_ground else self.airborne_timeout
+        self.expiry.schedule(aircraft.address, aircraft.last_seen_mono + timeout)
+    
+    def _remove_aircraft(self, aircraft: Aircraft) -> None:
+        """Drop an aircraft from all indexes and notify the removal listener."""
+        icao = aircraft.icao
+        self.aircraft.pop(icao, None)
+        self._by_address.pop(aircraft.address, None)
+        self._fragments.pop(icao, None)
+        self.spatial.remove(aircraft.address)
+        if self.history is not None:
+            self.history.discard(aircraft.address)
+        self._removed = True
+        logger.debug(f"Removed stale aircraft: {icao}")
+        if self.on_removed:
+            self.on_removed(icao)
+    
     def get_aircraft(self, icao: str) -> Optional[Aircraft]:
         """Get specific aircraft by ICAO."""
         return self.aircraft.get(icao.upper())
     
+    def mark_dirty(self, icao: str) -> None:
+        """Flag an aircraft changed outside update_aircraft for the next export."""
+        self._dirty.add(icao)
+    
+    def get_aircraft_by_address(self, address: int) -> Optional[Aircraft]:
+        """Get specific aircraft by 24-bit ICAO address."""
+        return self._by_address.get(address)
+    
     def get_all_aircraft(self) -> Dict[str, Aircraft]:
         """Get all tracked aircraft."""
         return self.aircraft.copy()
     
     def get_aircraft_list(self) -> list:
         """Get list of aircraft dictionaries for JSON output."""
-        return [aircraft.to_dict() for aircraft in self.aircraft.values()]
+        # Copy first: the push server calls this from its own thread while updates add aircraft
+        return [aircraft.to_dict() for aircraft in list(self.aircraft.values())]
     
     def cleanup_stale(self, timeout: int = 300) -> int:
         """Remove stale aircraft and return count removed."""
         try:
-            stale_icaos = []
-            for icao, aircraft in self.aircraft.items():
-                if aircraft.is_stale(timeout):
-                    stale_icaos.append(icao)
+            cutoff = time.monotonic() - timeout
+            stale_icaos = [icao for icao, aircraft in self.aircraft.items()
+                           if aircraft.last_seen_mono < cutoff]
             
             for icao in stale_icaos:
-                del self.aircraft[icao]
-                logger.debug(f"Removed stale aircraft: {icao}")
+                aircraft = self.aircraft[icao]
+                self.expiry.cancel(aircraft.address)
+                self._remove_aircraft(aircraft)
             
             if stale_icaos:
                 logger.info(f"Cleaned up {len(stale_icaos)} stale aircraft")
@@ -222,6 +457,33 @@ class AircraftTracker:
             logger.error(f"Error during aircraft cleanup: {e}")
             return 0
     
+    def expire(self, now: Optional[float] = None) -> int:
+        """Remove aircraft whose airborne or surface timeout has passed and return count removed."""
+        try:
+            if now is None:
+                now = time.monotonic()
+            removed = 0
+            for address in self.expiry.advance(now):
+                aircraft = self._by_address.get(address)
+                if aircraft is None:
+                    continue
+                timeout = self.surface_timeout if aircraft.on_ground else self.airborne_timeout
+                deadline = aircraft.last_seen_mono + timeout
+                if deadline <= now:
+                    self._remove_aircraft(aircraft)
+                    removed += 1
+                else:
+                    # Seen since it was filed: file it again at its new deadline
+                    self.expiry.schedule(address, deadline)
+            
+            if removed:
+                logger.debug(f"Expired {removed} stale aircraft")
+            return removed
+            
+        except Exception as e:
+            logger.error(f"Error during aircraft expiry: {e}")
+            return 0
+    
     def update_watchlist(self, watchlist_entries: list) -> None:
         """Update watchlist and mark aircraft accordingly."""
         try:
@@ -247,6 +509,9 @@ class AircraftTracker:
                 was_on_watchlist = aircraft.on_watchlist
                 is_on_watchlist = aircraft.icao in self.watchlist_icaos
                 
+                if is_on_watchlist or was_on_watchlist:
+                    self._dirty.add(aircraft.icao)
+                
                 if is_on_watchlist and not was_on_watchlist:
                     # Aircraft added to watchlist
                     aircraft.on_watchlist = True
@@ -274,14 +539,57 @@ class AircraftTracker:
         return {icao: aircraft for icao, aircraft in self.aircraft.items() 
                 if aircraft.on_watchlist}
     
+    def get_track(self, icao: str, since_seconds: Optional[float] = None) -> list:
+        """Get an aircraft's position trail oldest first, optionally only the last since_seconds."""
+        aircraft = self.aircraft.get(icao.upper())
+        if aircraft is None or self.history is None:
+            return []
+        track = self.history.get(aircraft.address)
+        if track is None:
+            return []
+        since = time.monotonic() - since_seconds if since_seconds else 0.0
+        return [{'timestamp': round(_WALL_CLOCK_OFFSET + timestamp, 3), 'latitude': lat, 'longitude': lon,
+                 'altitude': altitude, 'speed': speed}
+                for timestamp, lat, lon, altitude, speed in track.samples(since)]
+    
+    def get_course_change(self, icao: str, seconds: float = 300) -> Optional[float]:
+        """Get how far an aircraft's course over ground turned in the last seconds."""
+        aircraft = self.aircraft.get(icao.upper())
+        if aircraft is None or self.history is None:
+            return None
+        track = self.history.get(aircraft.address)
+        return track.course_change(seconds) if track is not None else None
+    
     def get_aircraft_count(self) -> int:
         """Get total number of tracked aircraft."""
         return len(self.aircraft)
     
     def get_aircraft_with_position(self) -> Dict[str, Aircraft]:
         """Get aircraft that have valid position data."""
-        return {icao: aircraft for icao, aircraft in self.aircraft.items() 
-                if aircraft.has_position()}
+        by_address = self._by_address
+        return {aircraft.icao: aircraft for aircraft in
+                (by_address.get(address) for address in list(self.spatial.positions)) if aircraft}
+    
+    def get_aircraft_within(self, lat: float, lon: float, radius_km: float) -> List[Tuple[float, Aircraft]]:
+        """Get (distance km, aircraft) for aircraft within radius_km of a point, nearest first."""
+        return self._resolve_addresses(self.spatial.within_radius(lat, lon, radius_km))
+    
+    def get_aircraft_in_bbox(self, south: float, west: float, north: float, east: float) -> List[Aircraft]:
+        """Get aircraft inside a lat/lon bounding box (west > east crosses the antimeridian)."""
+        by_address = self._by_address
+        return [by_address[address] for address in self.spatial.in_bbox(south, west, north, east)
+                if address in by_address]
+    
+    def get_nearest_aircraft(self, lat: float, lon: float, k: int = 10,
+                             max_km: Optional[float] = None) -> List[Tuple[float, Aircraft]]:
+        """Get (distance km, aircraft) for the k aircraft nearest a point, nearest first."""
+        return self._resolve_addresses(self.spatial.nearest(lat, lon, k, max_km))
+    
+    def _resolve_addresses(self, found: List[Tuple[float, int]]) -> List[Tuple[float, Aircraft]]:
+        """Swap addresses in (distance, address) pairs for their aircraft."""
+        by_address = self._by_address
+        return [(distance, by_address[address]) for distance, address in found
+                if address in by_address]
     
     def get_watchlist_aircraft_needing_alerts(self, alert_interval: int = 300) -> Dict[str, Aircraft]:
         """Get watchlist aircraft that need alerts sent."""
@@ -295,51 +603,87 @@ class AircraftTracker:
     
     def get_watchlist_statistics(self) -> Dict[str, Any]:
         """Get watchlist-specific statistics."""
-        watchlist_aircraft = self.get_watchlist_aircraft()
-        total_alerts_sent = sum(aircraft.watchlist_alert_count for aircraft in watchlist_aircraft.values())
-        
-        new_detections = len(self.get_new_watchlist_detections())
-        need_alerts = len(self.get_watchlist_aircraft_needing_alerts())
+        active = new_detections = need_alerts = total_alerts_sent = 0
+        for aircraft in list(self.aircraft.values()):
+            if not aircraft.on_watchlist:
+                continue
+            active += 1
+            total_alerts_sent += aircraft.watchlist_alert_count
+            if aircraft.is_new_watchlist_detection():
+                new_detections += 1
+            if aircraft.should_send_watchlist_alert():
+                need_alerts += 1
         
         return {
             "watchlist_size": len(self.watchlist_icaos),
-            "active_watchlist_aircraft": len(watchlist_aircraft),
+            "active_watchlist_aircraft": active,
             "new_detections": new_detections,
             "pending_alerts": need_alerts,
             "total_alerts_sent": total_alerts_sent
         }
     
     def get_statistics(self) -> Dict[str, Any]:
-        """Get tracking statistics."""
-        total_aircraft = len(self.aircraft)
-        with_position = len(self.get_aircraft_with_position())
-        on_watchlist = len(self.get_watchlist_aircraft())
-        
-        total_messages = sum(aircraft.message_count for aircraft in self.aircraft.values())
+        """Get tracking statistics in a single pass over the aircraft."""
+        with_position = on_watchlist = total_messages = 0
+        for aircraft in list(self.aircraft.values()):
+            total_messages += aircraft.message_count
+            if aircraft.has_position():
+                with_position += 1
+            if aircraft.on_watchlist:
+                on_watchlist += 1
         
         return {
-            "total_aircraft": total_aircraft,
+            "total_aircraft": len(self.aircraft),
             "aircraft_with_position": with_position,
             "watchlist_aircraft": on_watchlist,
             "total_messages": total_messages,
             "watchlist_size": len(self.watchlist_icaos)
         }
     
+    def get_export_json(self) -> str:
+        """Get the aircraft.json document, re-serializing only aircraft changed since the last call."""
+        if self._export_json is not None and not self._dirty and not self._removed:
+            return self._export_json
+        
+        # Swap out the dirty set so updates from other threads land in the next export
+        dirty, self._dirty = self._dirty, set()
+        self._removed = False
+        
+        fragments = self._fragments
+        for icao in list(dirty):
+            aircraft = self.aircraft.get(icao)
+            if aircraft is not None:
+                fragments[icao] = json.dumps(aircraft.to_dict(), separators=(',', ':'))
+        
+        aircraft_json = ",".join(fragment for fragment in
+                                 (fragments.get(icao) for icao in list(self.aircraft))
+                                 if fragment is not None)
+        statistics_json = json.dumps(self.get_statistics(), separators=(',', ':'))
+        
+        self._export_json = '{"timestamp":%s,"aircraft":[%s],"statistics":%s}' % (
+            json.dumps(datetime.now().isoformat()), aircraft_json, statistics_json)
+        self._export_version += 1
+        return self._export_json
+    
     def save_to_json(self, filename: str = "aircraft.json") -> bool:
-        """Save aircraft data to JSON file with error handling."""
+        """Save aircraft data to JSON file with error handling.
+        
+        The file is replaced atomically, and nothing is written if no
+        aircraft changed since it was last saved.
+        """
         try:
-            data = {
-                "timestamp": datetime.now().isoformat(),
-                "aircraft": self.get_aircraft_list(),
-                "statistics": self.get_statistics()
-            }
+            export_json = self.get_export_json()
+            if self._saved_export == (filename, self._export_version):
+                return True
             
-            with open(filename, 'w') as f:
-                json.dump(data, f, indent=2)
-                
+            atomic_write(filename, export_json)
+            
+            self._saved_export = (filename, self._export_version)
             return True
             
         except Exception as e:
+            # Force a full rewrite next time
+            self._saved_export = None
             error_handler.handle_error(
                 ComponentType.AIRCRAFT_TRACKER,
                 ErrorSeverity.MEDIUM,
@@ -0,0 +1,126 @@
+"""
+Airport reference table for surface position decoding.
+
+Surface CPR positions are only unambiguous within about 45 NM of a known
+reference, so aircraft first seen on the ground are decoded against the
+airports near the receiver. Airports are loaded once from a CSV file (the
+OurAirports airports.csv layout, or any file with ident/lat/lon columns)
+into a one-degree grid for nearest-airport lookups.
+"""
+
+import csv
+import logging
+import math
+from typing import Dict, List, Optional, Tuple
+
+from utils import calculate_distance
+
+
+logger = logging.getLogger(__name__)
+
+
+# Column names accepted for each field, first match wins
+_IDENT_COLUMNS = ('ident', 'icao', 'code', 'name')
+_LAT_COLUMNS = ('latitude_deg', 'latitude', 'lat')
+_LON_COLUMNS = ('longitude_deg', 'longitude', 'lon')
+
+# OurAirports types that never see surface traffic
+_SKIPPED_TYPES = ('closed', 'balloonport')
+
+# Grid cell size in degrees
+CELL_DEGREES = 1.0
+
+# Airports this close to the receiver are used as surface decoding references
+SURFACE_REFERENCE_RADIUS_KM = 100.0
+
+
+Airport = Tuple[str, float, float]
+
+
+def _column(row: Dict[str, str], names: Tuple[str, ...]) -> Optional[str]:
+    """Get the first present column of a CSV row."""
+    for name in names:
+        value = row.get(name)
+        if value:
+            return value
+    return None
+
+
+class AirportIndex:
+    """Airports bucketed into a lat/lon grid."""
+
+    def __init__(self, airports: Optional[List[Airport]] = None):
+        self.cells: Dict[Tuple[int, int], List[Airport]] = {}
+        self.count = 0
+        for airport in airports or ():
+            self.add(*airport)
+
+    def __len__(self) -> int:
+        return self.count
+
+    @classmethod
+    def load(cls, path: str) -> "AirportIndex":
+        """Load airports from a CSV file; an unreadable file gives an empty index."""
+        index = cls()
+        if not path:
+            return index
+        try:
+            with open(path, 'r', newline='', encoding='utf-8') as f:
+                for row in csv.DictReader(f):
+                    if row.get('type') in _SKIPPED_TYPES:
+                        continue
+                    ident = _column(row, _IDENT_COLUMNS)
+                    lat = _column(row, _LAT_COLUMNS)
+                    lon = _column(row, _LON_COLUMNS)
+                    if not ident or lat is None or lon is None:
+                        continue
+                    try:
+                        index.add(ident, float(lat), float(lon))
+                    except ValueError:
+                        continue
+            logger.info(f"Loaded {index.count} airports from {path}")
+        except Exception as e:
+            logger.error(f"Failed to load airports from {path}: {e}")
+        return index
+
+    def add(self, ident: str, lat: float, lon: float) -> None:
+        """Add an airport."""
+        self.cells.setdefault(self._cell(lat, lon), []).append((ident, lat, lon))
+        self.count += 1
+
+    def within(self, lat: float, lon: float, radius_km: float) -> List[Tuple[float, Airport]]:
+        """Get (distance km, airport) for airports within a radius, nearest first."""
+        lat_cells = int(math.ceil(radius_km / 111.0 / CELL_DEGREES))
+        lon_scale = max(math.cos(math.radians(min(abs(lat) + lat_cells * CELL_DEGREES, 89.0))), 0.01)
+        lon_cells = min(int(math.ceil(radius_km / (111.0 * lon_scale) / CELL_DEGREES)), int(180 / CELL_DEGREES))
+        row, column = self._cell(lat, lon)
+        columns = int(360 / CELL_DEGREES)
+
+        cell_columns = {(column + offset + columns // 2) % columns - columns // 2
+                        for offset in range(-lon_cells, lon_cells + 1)}
+
+        found = []
+        for cell_row in range(row - lat_cells, row + lat_cells + 1):
+            for cell_column in cell_columns:
+                for airport in self.cells.get((cell_row, cell_column), ()):
+                    distance = calculate_distance(lat, lon, airport[1], airport[2])
+                    if distance <= radius_km:
+                        found.append((distance, airport))
+        found.sort()
+        return found
+
+    def nearest(self, lat: float, lon: float, max_km: float = 100.0) -> Optional[Airport]:
+        """Get the nearest airport within max_km."""
+        found = self.within(lat, lon, max_km)
+        return found[0][1] if found else None
+
+    @staticmethod
+    def _cell(lat: float, lon: float) -> Tuple[int, int]:
+        """Grid cell of a position."""
+        return int(math.floor(lat / CELL_DEGREES)), int(math.floor(lon / CELL_DEGREES))
+
+
+def surface_references(index: AirportIndex, lat: float, lon: float,
+                       radius_km: float = SURFACE_REFERENCE_RADIUS_KM) -> List[Tuple[float, float]]:
+    """Get the receiver position and the airports around it as surface decoding references."""
+    return [(lat, lon)] + [(airport[1], airport[2]) for _, airport in index.within(lat, lon, radius_km)]
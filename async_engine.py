@@ -0,0 +1,237 @@
+"""
+asyncio engine for the Ursine Capture receiver.
+
+Replaces the dump1090 reader, status, cleanup and health monitor threads
+with tasks on a single event loop. Selected with receiver.engine = "asyncio";
+the threaded engine remains the default.
+"""
+
+import asyncio
+import logging
+import signal
+from datetime import datetime
+from typing import Callable, List, Optional
+
+from utils import error_handler, ErrorSeverity, ComponentType
+
+
+logger = logging.getLogger(__name__)
+
+
+class AsyncReceiverEngine:
+    """Runs all receiver I/O and periodic jobs on one asyncio event loop."""
+
+    def __init__(self, receiver, status_interval: float = 5, cleanup_interval: float = 1,
+                 health_interval: float = 30, read_timeout: float = 30,
+                 alert_queue_size: int = 100):
+        self.receiver = receiver
+        self.status_interval = status_interval
+        self.cleanup_interval = cleanup_interval
+        self.health_interval = health_interval
+        self.read_timeout = read_timeout
+        self.alert_queue_size = alert_queue_size
+
+        self.loop: Optional[asyncio.AbstractEventLoop] = None
+        self.alert_queue: Optional[asyncio.Queue] = None
+        self.priority_queue: Optional[asyncio.Queue] = None  # emergencies, unbounded
+        self._send_lock: Optional[asyncio.Lock] = None  # one alert on the serial link at a time
+        self._stop: Optional[asyncio.Event] = None
+        self._tasks: List[asyncio.Task] = []
+
+        # Alert keys with an alert already queued, to avoid duplicate sends
+        self._pending_alerts = set()
+        self.alerts_dropped = 0
+
+    def run(self) -> None:
+        """Run the engine until request_stop() is called or a signal arrives."""
+        asyncio.run(self._main())
+
+    def request_stop(self) -> None:
+        """Ask the engine to shut down. Safe to call from any thread."""
+        loop = self.loop
+        if loop and not loop.is_closed():
+            try:
+                loop.call_soon_threadsafe(self._stop.set)
+            except RuntimeError:
+                pass  # Loop already closed
+
+    def is_running(self) -> bool:
+        """Check if the event loop is running."""
+        return self.loop is not None and self.loop.is_running() and not self._stop.is_set()
+
+    def submit_alert(self, aircraft) -> None:
+        """Queue a watchlist or geofence alert for the alert task. Safe to call from any thread."""
+        try:
+            self.loop.call_soon_threadsafe(self._enqueue_alert, aircraft)
+        except RuntimeError:
+            logger.warning(f"Event loop closed, dropping alert for {aircraft.icao}")
+
+    def submit_priority_alert(self, alert) -> None:
+        """Queue an alert to be sent ahead of normal alerts. Safe to call from any thread."""
+        try:
+            self.loop.call_soon_threadsafe(self.priority_queue.put_nowait, alert)
+        except RuntimeError:
+            logger.warning(f"Event loop closed, dropping priority alert for {alert.icao}")
+
+    def _enqueue_alert(self, aircraft) -> None:
+        """Put an alert on the queue from the loop thread."""
+        if aircraft.alert_key in self._pending_alerts:
+            return
+        try:
+            self.alert_queue.put_nowait(aircraft)
+            self._pending_alerts.add(aircraft.alert_key)
+        except asyncio.QueueFull:
+            self.alerts_dropped += 1
+            logger.warning(f"Alert queue full, dropping alert for {aircraft.icao}")
+
+    async def _main(self) -> None:
+        """Start all tasks, wait for shutdown, then cancel them in order."""
+        self.loop = asyncio.get_running_loop()
+        self._stop = asyncio.Event()
+        self.alert_queue = asyncio.Queue(maxsize=self.alert_queue_size)
+        self.priority_queue = asyncio.Queue()
+        self._send_lock = asyncio.Lock()
+
+        self._install_signal_handlers()
+
+        receiver = self.receiver
+        self._tasks = [
+            asyncio.create_task(self._stream_loop(), name="dump1090-stream"),
+            asyncio.create_task(self._alert_loop(), name="meshtastic-alerts"),
+            asyncio.create_task(self._priority_alert_loop(), name="meshtastic-priority-alerts"),
+            asyncio.create_task(self._periodic("status", self.status_interval,
+                                               receiver._update_status_files, blocking=True),
+                                name="status"),
+            asyncio.create_task(self._periodic("cleanup", self.cleanup_interval,
+                                               receiver.request_cleanup),
+                                name="cleanup"),
+            asyncio.create_task(self._periodic("health", self.health_interval,
+                                               receiver.run_health_checks, blocking=True),
+                                name="health"),
+        ]
+        logger.info("asyncio engine started")
+
+        await self._stop.wait()
+
+        logger.info("asyncio engine stopping...")
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+        logger.info("asyncio engine stopped")
+
+    def _install_signal_handlers(self) -> None:
+        """Route SIGINT/SIGTERM to a graceful stop when running in the main thread."""
+        for signum in (signal.SIGINT, signal.SIGTERM):
+            try:
+                self.loop.add_signal_handler(signum, self._stop.set)
+            except (NotImplementedError, RuntimeError, ValueError):
+                # Not supported on this platform or not the main thread
+                pass
+
+    async def _stream_loop(self) -> None:
+        """Read the dump1090 stream, reconnecting with exponential backoff."""
+        receiver = self.receiver
+        connection_attempts = 0
+
+        while True:
+            connection_attempts += 1
+            try:
+                if not await asyncio.to_thread(receiver.dump1090_manager.is_running):
+                    logger.warning("dump1090 not running, attempting restart...")
+                    if not await asyncio.to_thread(receiver.dump1090_manager.start_dump1090):
+                        logger.error("Failed to start dump1090, retrying in 10 seconds...")
+                        await asyncio.sleep(10)
+                        continue
+
+                dump1090_port = receiver.config.snapshot.dump1090_port
+                reader, writer = await asyncio.wait_for(
+                    asyncio.open_connection('localhost', dump1090_port), timeout=10.0)
+
+                logger.info(f"Connected to dump1090 data stream (attempt {connection_attempts})")
+                connection_attempts = 0
+
+                try:
+                    receiver._reset_stream_state()
+                    await self._read_stream(reader)
+                finally:
+                    writer.close()
+                    try:
+                        await writer.wait_closed()
+                    except Exception:
+                        pass
+
+            except asyncio.CancelledError:
+                raise
+            except ConnectionRefusedError:
+                error_handler.handle_error(
+                    ComponentType.RECEIVER,
+                    ErrorSeverity.HIGH,
+                    f"Connection refused by dump1090 (port {receiver.config.snapshot.dump1090_port})",
+                    error_code="TCP_CONNECTION_FAILED"
+                )
+            except Exception as e:
+                logger.error(f"Error connecting to dump1090: {e}")
+
+            # Exponential backoff for reconnection
+            wait_time = min(30, 2 ** min(connection_attempts, 5))
+            logger.info(f"Retrying connection in {wait_time} seconds...")
+            await asyncio.sleep(wait_time)
+
+    async def _read_stream(self, reader: asyncio.StreamReader) -> None:
+        """Feed received bytes to the receiver until the connection drops."""
+        receiver = self.receiver
+        while True:
+            try:
+                data = await asyncio.wait_for(reader.read(4096), timeout=self.read_timeout)
+            except asyncio.TimeoutError:
+                logger.warning(f"No data received for {self.read_timeout:.0f} seconds, reconnecting...")
+                return
+
+            if not data:
+                logger.warning("No data received from dump1090, connection closed")
+                return
+
+            try:
+                receiver._handle_stream_data(data)
+                receiver.last_successful_message = datetime.now()
+            except Exception as e:
+                logger.error(f"Error processing data from dump1090: {e}")
+
+    async def _alert_loop(self) -> None:
+        """Send queued watchlist and geofence alerts over the async Meshtastic writer."""
+        while True:
+            aircraft = await self.alert_queue.get()
+            try:
+                async with self._send_lock:
+                    await self.receiver.send_meshtastic_alert_async(aircraft)
+            except Exception as e:
+                logger.error(f"Error in alert task: {e}")
+            finally:
+                self._pending_alerts.discard(aircraft.alert_key)
+
+    async def _priority_alert_loop(self) -> None:
+        """Send emergency alerts as soon as the alert in flight, if any, has gone out."""
+        while True:
+            alert = await self.priority_queue.get()
+            try:
+                # The lock is FIFO, so this waits for at most the alert being sent now
+                async with self._send_lock:
+                    await self.receiver.send_meshtastic_alert_async(alert)
+            except Exception as e:
+                logger.error(f"Error in priority alert task: {e}")
+
+    async def _periodic(self, name: str, interval: float, func: Callable[[], None],
+                        blocking: bool = False) -> None:
+        """Run func every interval seconds; blocking jobs run in a worker thread."""
+        while True:
+            try:
+                if blocking:
+                    await asyncio.to_thread(func)
+                else:
+                    func()
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.error(f"Error in {name} task: {e}")
+            await asyncio.sleep(interval)
@@ -0,0 +1,204 @@
+"""
+Streaming Beast binary protocol decoder for the dump1090 --net-bo-port output.
+
+Each Beast frame is laid out as:
+
+    0x1A <type> <6-byte 12 MHz MLAT timestamp> <1-byte signal> <payload>
+
+where type '1' carries a 2-byte Mode A/C reply, '2' a 7-byte Mode S short
+frame and '3' a 14-byte Mode S long frame. Any literal 0x1A after the type
+byte is escaped by doubling it.
+"""
+
+import logging
+from dataclasses import dataclass
+from typing import List
+
+
+logger = logging.getLogger(__name__)
+
+
+BEAST_ESCAPE = 0x1A
+
+FRAME_MODE_AC = 0x31        # '1'
+FRAME_MODE_S_SHORT = 0x32   # '2'
+FRAME_MODE_S_LONG = 0x33    # '3'
+
+# Payload length per frame type, excluding timestamp and signal bytes
+PAYLOAD_LENGTHS = {
+    FRAME_MODE_AC: 2,
+    FRAME_MODE_S_SHORT: 7,
+    FRAME_MODE_S_LONG: 14,
+}
+
+TIMESTAMP_LENGTH = 6
+MLAT_CLOCK_HZ = 12_000_000
+
+
+@dataclass(slots=True)
+class BeastFrame:
+    """Single decoded Beast frame."""
+    frame_type: int
+    timestamp: int          # 12 MHz MLAT clock ticks
+    signal: int             # raw signal level byte (0-255)
+    message: bytes          # Mode S / Mode A/C payload
+
+    @property
+    def is_mode_s(self) -> bool:
+        """Check if frame carries a Mode S reply."""
+        return self.frame_type != FRAME_MODE_AC
+
+    @property
+    def hex(self) -> str:
+        """Get payload as upper-case hex string (pyModeS format)."""
+        return self.message.hex().upper()
+
+    @property
+    def seconds(self) -> float:
+        """Get MLAT timestamp converted to seconds."""
+        return self.timestamp / MLAT_CLOCK_HZ
+
+    @property
+    def signal_level(self) -> float:
+        """Get signal level normalised to 0.0-1.0."""
+        return self.signal / 255.0
+
+
+class BeastDecoder:
+    """Incremental Beast decoder working directly on a bytearray buffer."""
+
+    def __init__(self, max_buffer_size: int = 65536):
+        self.buffer = bytearray()
+        self.max_buffer_size = max_buffer_size
+
+        # Statistics
+        self.frames_decoded = 0
+        self.mode_ac_frames = 0
+        self.bytes_discarded = 0
+        self.resyncs = 0
+
+    def reset(self) -> None:
+        """Drop any partial frame (e.g. after a reconnect)."""
+        self.buffer.clear()
+
+    def feed(self, data: bytes) -> List[BeastFrame]:
+        """Append received bytes and return all complete frames."""
+        buf = self.buffer
+        buf += data
+        frames = []
+
+        end = len(buf)
+        pos = 0
+
+        while pos < end:
+            start = buf.find(BEAST_ESCAPE, pos)
+            if start < 0:
+                # No frame start in the remaining bytes
+                self.bytes_discarded += end - pos
+                pos = end
+                break
+
+            if start > pos:
+                self.bytes_discarded += start - pos
+                self.resyncs += 1
+
+            if start + 1 >= end:
+                pos = start
+                break
+
+            frame_type = buf[start + 1]
+            payload_length = PAYLOAD_LENGTHS.get(frame_type)
+            if payload_length is None:
+                # Escaped 0x1A data byte or unknown type - skip and resync
+                self.bytes_discarded += 1
+                pos = start + 1
+                continue
+
+            body_length = TIMESTAMP_LENGTH + 1 + payload_length
+            body_start = start + 2
+            body_end = body_start + body_length
+            if body_end > end:
+                pos = start
+                break
+
+            if buf.find(BEAST_ESCAPE, body_start, body_end) < 0:
+                # Fast path: no escaped bytes inside the frame
+                body = buf[body_start:body_end]
+                next_pos = body_end
+            else:
+                body, next_pos = self._unescape(buf, body_start, body_length)
+                if body is None:
+                    if next_pos < 0:
+                        # Need more data to finish this frame
+                        pos = start
+                        break
+                    # Lone 0x1A inside the body marks a new frame start
+                    self.bytes_discarded += next_pos - start
+                    self.resyncs += 1
+                    pos = next_pos
+                    continue
+
+            pos = next_pos
+
+            if frame_type == FRAME_MODE_AC:
+                self.mode_ac_frames += 1
+
+            frames.append(BeastFrame(
+                frame_type=frame_type,
+                timestamp=int.from_bytes(body[:TIMESTAMP_LENGTH], 'big'),
+                signal=body[TIMESTAMP_LENGTH],
+                message=bytes(body[TIMESTAMP_LENGTH + 1:])
+            ))
+
+        if pos:
+            del buf[:pos]
+
+        if len(buf) > self.max_buffer_size:
+            logger.warning(f"Beast buffer overflow ({len(buf)} bytes), discarding")
+            self.bytes_discarded += len(buf)
+            buf.clear()
+
+        self.frames_decoded += len(frames)
+        return frames
+
+    @staticmethod
+    def _unescape(buf: bytearray, body_start: int, body_length: int) -> tuple:
+        """Collect an escaped frame body.
+
+        Returns (body, next_pos) on success, (None, -1) if the buffer ends
+        mid-frame and (None, pos) if an unescaped 0x1A interrupts the frame.
+        """
+        body = bytearray()
+        end = len(buf)
+        i = body_start
+
+        while len(body) < body_length:
+            if i >= end:
+                return None, -1
+            byte = buf[i]
+            if byte == BEAST_ESCAPE:
+                if i + 1 >= end:
+                    return None, -1
+                if buf[i + 1] != BEAST_ESCAPE:
+                    return None, i
+                i += 1
+            body.append(byte)
+            i += 1
+
+        return body, i
+
+    def get_statistics(self) -> dict:
+        """Get decoder statistics."""
+        return {
+            "frames_decoded": self.frames_decoded,
+            "mode_ac_frames": self.mode_ac_frames,
+            "bytes_discarded": self.bytes_discarded,
+            "resyncs": self.resyncs,
+            "buffered_bytes": len(self.buffer)
+        }
+
+
+def encode_frame(frame_type: int, message: bytes, timestamp: int = 0, signal: int = 0) -> bytes:
+    """Encode a single Beast frame, escaping 0x1A bytes."""
+    body = timestamp.to_bytes(TIMESTAMP_LENGTH, 'big') + bytes([signal & 0xFF]) + message
+    return bytes([BEAST_ESCAPE, frame_type]) + body.replace(b'\x1a', b'\x1a\x1a')
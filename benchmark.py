@@ -0,0 +1,384 @@
+#!/usr/bin/env python3
+"""
+Performance benchmarks for Ursine Capture.
+
+All results are printed as JSON so they can be tracked across releases.
+"""
+
+import gc
+import json
+import logging
+import platform
+import resource
+import sys
+import time
+import tracemalloc
+from typing import Any, Dict, List, Optional, Tuple
+
+import psutil
+
+from aircraft import AircraftTracker
+from decoder import decode_adsb_fields, decode_adsb_batch, MESSAGE_RAW, MESSAGE_SBS
+
+try:
+    import pyModeS as pms
+except ImportError:
+    pms = None
+
+
+logger = logging.getLogger(__name__)
+
+
+def _rss_mb() -> float:
+    """Get resident set size of this process in MB."""
+    return psutil.Process().memory_info().rss / 1024 / 1024
+
+
+def synthetic_icaos(count: int) -> List[str]:
+    """Generate distinct, valid ICAO addresses."""
+    return [f"{(0x400000 + i * 7) & 0xFFFFFF:06X}" for i in range(count)]
+
+
+def synthetic_updates(icaos: List[str], count: int) -> List[tuple]:
+    """Generate (icao, message) pairs cycling through the given aircraft."""
+    updates = []
+    for i in range(count):
+        icao = icaos[i % len(icaos)]
+        kind = i % 3
+        if kind == 0:
+            message = {'altitude': 30000 + i % 1000, 'latitude': 41.9 + (i % 100) * 0.001,
+                       'longitude': -87.6 - (i % 100) * 0.001}
+        elif kind == 1:
+            message = {'speed': 450 + i % 50, 'track': i % 360, 'vertical_rate': -64}
+        else:
+            message = {'callsign': f"UAL{i % 1000}"}
+        updates.append((icao, message))
+    return updates
+
+
+# Real DF17 frames used as templates for synthetic traffic:
+# identification, airborne position (even and odd CPR) and velocity
+TEMPLATE_FRAMES = (
+    '8D4840D6202CC371C32CE0576098',
+    '8D40621D58C382D690C8AC2863A7',
+    '8D40621D58C386435CC412692AD6',
+    '8D485020994409940838175B284F',
+)
+
+
+def _peak_rss_mb() -> float:
+    """Get peak resident set size of this process in MB."""
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+
+def _with_address(frame: str, icao: str) -> str:
+    """Re-address a DF17 frame and recompute its CRC parity."""
+    message = frame[:2] + icao + frame[8:22]
+    return message + f"{pms.crc(message + '000000', encode=True):06X}"
+
+
+def synthetic_frames(icaos: List[str], count: int) -> List[Tuple[str, str]]:
+    """Generate (kind, payload) raw DF17 messages cycling through the given aircraft."""
+    templates = {icao: [_with_address(frame, icao) for frame in TEMPLATE_FRAMES] for icao in icaos}
+    messages = []
+    for i in range(count):
+        icao = icaos[(i // len(TEMPLATE_FRAMES)) % len(icaos)]
+        messages.append((MESSAGE_RAW, templates[icao][i % len(TEMPLATE_FRAMES)]))
+    return messages
+
+
+def synthetic_sbs_lines(icaos: List[str], count: int) -> List[Tuple[str, str]]:
+    """Generate (kind, payload) SBS messages cycling through the given aircraft."""
+    messages = []
+    for i in range(count):
+        icao = icaos[i % len(icaos)]
+        stamp = f"2024/01/01,12:00:{(i // 1000) % 60:02d}.{i % 1000:03d}"
+        kind = i % 3
+        if kind == 0:
+            line = (f"MSG,3,1,1,{icao},1,{stamp},{stamp},,{30000 + i % 1000},,,"
+                    f"{41.9 + (i % 100) * 0.001:.5f},{-87.6 - (i % 100) * 0.001:.5f},,,0,0,0,0")
+        elif kind == 1:
+            line = f"MSG,4,1,1,{icao},1,{stamp},{stamp},,,{450 + i % 50},{i % 360},,,-64,,0,0,0,0"
+        else:
+            line = f"MSG,1,1,1,{icao},1,{stamp},{stamp},UAL{i % 1000},,,,,,,,0,0,0,0"
+        messages.append((MESSAGE_SBS, line))
+    return messages
+
+
+def capture_messages(receiver, path: str) -> List[Tuple[str, str]]:
+    """Split a recorded capture (file or recorder directory) into (kind, payload) messages."""
+    from replay import CaptureReader
+
+    receiver.reset_stream_parser()
+    messages = []
+    for _, data in CaptureReader(path, timed=False):
+        if data:
+            messages.extend(receiver.parse_stream_data(data))
+        else:
+            receiver.reset_stream_parser()
+    return messages
+
+
+def _latency_summary(samples_ns: List[int]) -> Dict[str, Any]:
+    """Summarize per-message latencies (nanoseconds) as rate and percentiles in microseconds."""
+    if not samples_ns:
+        return {"messages": 0}
+    ordered = sorted(samples_ns)
+    total = sum(ordered)
+    count = len(ordered)
+    return {
+        "messages": count,
+        "msgs_per_sec": round(count / (total / 1e9)) if total else 0,
+        "p50_usec": round(ordered[count // 2] / 1000, 2),
+        "p99_usec": round(ordered[min(count - 1, int(count * 0.99))] / 1000, 2),
+        "max_usec": round(ordered[-1] / 1000, 2)
+    }
+
+
+class _NullMeshtastic:
+    """Meshtastic stand-in that accepts every alert without transmitting."""
+
+    def __init__(self):
+        self.alerts = 0
+
+    def send_alert(self, aircraft_data: Dict[str, Any]) -> bool:
+        self.alerts += 1
+        return True
+
+    def disconnect(self) -> None:
+        pass
+
+
+def _make_receiver(config_path: str, watchlist: Optional[List[str]] = None):
+    """Create a receiver with no dump1090, radio or Meshtastic I/O (configured watchlist by default)."""
+    from receiver import ADSBReceiver
+
+    receiver = ADSBReceiver(config_path)
+    # Alerts are built and marked sent as usual, but nothing is transmitted
+    receiver.meshtastic_manager = _NullMeshtastic()
+    if watchlist is None:
+        receiver.aircraft_tracker.update_watchlist(receiver.config.get_watchlist())
+    else:
+        receiver.aircraft_tracker.update_watchlist([{'icao': icao, 'name': f"BENCH{i}"}
+                                                    for i, icao in enumerate(watchlist)])
+    return receiver
+
+
+def _run_message_path(receiver, messages: List[Tuple[str, str]]) -> Dict[str, Any]:
+    """Time each message through decode, track and alert on the calling thread."""
+    decode_ns = []
+    track_ns = []
+    alert_ns = []
+    total_ns = []
+
+    perf_ns = time.perf_counter_ns
+    decode = receiver.decode_stream_message
+    tracker = receiver.aircraft_tracker
+    check_watchlist = receiver.check_watchlist
+
+    gc.collect()
+    start = time.perf_counter()
+    for kind, payload in messages:
+        t0 = perf_ns()
+        update = decode(kind, payload)
+        t1 = perf_ns()
+        decode_ns.append(t1 - t0)
+        if not update:
+            total_ns.append(t1 - t0)
+            continue
+
+        # apply_update without the watchlist check, so tracking and alerting are timed apart
+        if update.get('position_pending'):
+            receiver._resolve_position(update)
+        address = update.get('address')
+        if address is not None:
+            aircraft = tracker.update_aircraft_fast(address, update)
+        else:
+            aircraft = tracker.update_aircraft(update['icao'], update)
+        t2 = perf_ns()
+        track_ns.append(t2 - t1)
+
+        if aircraft:
+            check_watchlist(aircraft)
+        t3 = perf_ns()
+        alert_ns.append(t3 - t2)
+        total_ns.append(t3 - t0)
+    elapsed = time.perf_counter() - start
+
+    return {
+        "messages": len(messages),
+        "elapsed_seconds": round(elapsed, 3),
+        "msgs_per_sec": round(len(messages) / elapsed) if elapsed > 0 else 0,
+        "aircraft": tracker.get_aircraft_count(),
+        "watchlist_alerts": receiver.meshtastic_manager.alerts,
+        "decode": _latency_summary(decode_ns),
+        "track": _latency_summary(track_ns),
+        "alert": _latency_summary(alert_ns),
+        "end_to_end": _latency_summary(total_ns)
+    }
+
+
+def _run_batch_decode(messages: List[Tuple[str, str]], batch_size: int = 180) -> Dict[str, Any]:
+    """Compare per-frame and vectorized batch decoding of raw frames (180 ~ one 4 KiB Beast read)."""
+    frames = [payload for kind, payload in messages if kind == MESSAGE_RAW]
+
+    gc.collect()
+    start = time.perf_counter()
+    for frame in frames:
+        decode_adsb_fields(frame)
+    per_frame = time.perf_counter() - start
+
+    start = time.perf_counter()
+    for i in range(0, len(frames), batch_size):
+        decode_adsb_batch(frames[i:i + batch_size])
+    batched = time.perf_counter() - start
+
+    return {
+        "frames": len(frames),
+        "batch_size": batch_size,
+        "per_frame_msgs_per_sec": round(len(frames) / per_frame) if per_frame > 0 else 0,
+        "batch_msgs_per_sec": round(len(frames) / batched) if batched > 0 else 0,
+        "speedup": round(per_frame / batched, 2) if batched > 0 else 0.0
+    }
+
+
+def _run_stream_path(receiver, messages: List[Tuple[str, str]], beast: bool) -> Dict[str, Any]:
+    """Measure throughput of whole stream chunks through _handle_stream_data, inline."""
+    from beast import encode_frame, FRAME_MODE_S_LONG, FRAME_MODE_S_SHORT
+
+    if beast:
+        stream = b''.join(encode_frame(FRAME_MODE_S_LONG if len(payload) == 28 else FRAME_MODE_S_SHORT,
+                                       bytes.fromhex(payload), i * 1200, 128)
+                          for i, (kind, payload) in enumerate(messages) if kind == MESSAGE_RAW)
+    else:
+        stream = ''.join(payload + "\n" for kind, payload in messages if kind == MESSAGE_SBS).encode('ascii')
+    chunks = [stream[i:i + 4096] for i in range(0, len(stream), 4096)]
+
+    receiver.reset_stream_parser()
+    counted = receiver.message_count
+    gc.collect()
+    start = time.perf_counter()
+    for chunk in chunks:
+        receiver._handle_stream_data(chunk)
+    elapsed = time.perf_counter() - start
+    handled = receiver.message_count - counted
+
+    return {
+        "format": "beast" if beast else "sbs",
+        "messages": handled,
+        "elapsed_seconds": round(elapsed, 3),
+        "msgs_per_sec": round(handled / elapsed) if elapsed > 0 else 0
+    }
+
+
+def benchmark_message_path(aircraft_count: int = 500, message_count: int = 50000,
+                           config_path: str = "config.json", capture: Optional[str] = None) -> Dict[str, Any]:
+    """Benchmark the decode -> track -> alert path on synthetic or recorded traffic."""
+    if pms is None and capture is None:
+        raise RuntimeError("pyModeS is required for synthetic raw traffic")
+
+    results = {"python": platform.python_version()}
+
+    if capture:
+        messages = capture_messages(_make_receiver(config_path), capture)
+        results["capture"] = capture
+        results["recorded"] = _run_message_path(_make_receiver(config_path), messages)
+    else:
+        icaos = synthetic_icaos(aircraft_count)
+        watchlist = icaos[::max(1, aircraft_count // 10)]
+        results["aircraft_count"] = aircraft_count
+        results["watchlist_size"] = len(watchlist)
+
+        raw_messages = synthetic_frames(icaos, message_count)
+        sbs_messages = synthetic_sbs_lines(icaos, message_count)
+        results["raw"] = _run_message_path(_make_receiver(config_path, watchlist), raw_messages)
+        results["sbs"] = _run_message_path(_make_receiver(config_path, watchlist), sbs_messages)
+        results["batch_decode"] = _run_batch_decode(raw_messages)
+        results["stream"] = [
+            _run_stream_path(_make_receiver(config_path, watchlist), raw_messages, beast=True),
+            _run_stream_path(_make_receiver(config_path, watchlist), sbs_messages, beast=False)
+        ]
+
+    results["peak_rss_mb"] = round(_peak_rss_mb(), 1)
+    return results
+
+
+def benchmark_aircraft_store(aircraft_count: int = 5000, update_count: int = 200000) -> Dict[str, Any]:
+    """Measure per-aircraft memory and update throughput of AircraftTracker."""
+    icaos = synthetic_icaos(aircraft_count)
+    updates = synthetic_updates(icaos, update_count)
+
+    gc.collect()
+    rss_before = _rss_mb()
+    tracemalloc.start()
+
+    tracker = AircraftTracker()
+    for icao, message in updates[:aircraft_count]:
+        tracker.update_aircraft(icao, message)
+
+    traced_bytes, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    rss_after = _rss_mb()
+
+    start = time.perf_counter()
+    for icao, message in updates:
+        tracker.update_aircraft(icao, message)
+    elapsed = time.perf_counter() - start
+
+    # Integer-address fast path, as used for decoder output
+    address_updates = [(int(icao, 16), message) for icao, message in updates]
+    start = time.perf_counter()
+    for address, message in address_updates:
+        tracker.update_aircraft_fast(address, message)
+    fast_elapsed = time.perf_counter() - start
+
+    return {
+        "aircraft": tracker.get_aircraft_count(),
+        "bytes_per_aircraft": round(traced_bytes / aircraft_count, 1),
+        "rss_delta_mb": round(rss_after - rss_before, 2),
+        "updates": update_count,
+        "updates_per_sec": round(update_count / elapsed),
+        "usec_per_update": round(elapsed / update_count * 1e6, 3),
+        "fast_updates_per_sec": round(update_count / fast_elapsed),
+        "usec_per_fast_update": round(fast_elapsed / update_count * 1e6, 3)
+    }
+
+
+def main():
+    """Main benchmark entry point."""
+    logging.basicConfig(level=logging.WARNING)
+
+    if len(sys.argv) < 2:
+        print("Usage: python benchmark.py <command> [options]")
+        print("Commands:")
+        print("  aircraft [count] [updates]  - Aircraft store memory and update speed")
+        print("  messages [aircraft] [count] [config]  - Decode/track/alert path on synthetic traffic")
+        print("  capture <file|dir> [config]  - Decode/track/alert path on a recorded capture")
+        sys.exit(1)
+
+    command = sys.argv[1].lower()
+
+    if command == "aircraft":
+        aircraft_count = int(sys.argv[2]) if len(sys.argv) > 2 else 5000
+        update_count = int(sys.argv[3]) if len(sys.argv) > 3 else 200000
+        results = benchmark_aircraft_store(aircraft_count, update_count)
+    elif command == "messages":
+        aircraft_count = int(sys.argv[2]) if len(sys.argv) > 2 else 500
+        message_count = int(sys.argv[3]) if len(sys.argv) > 3 else 50000
+        config_path = sys.argv[4] if len(sys.argv) > 4 else "config.json"
+        results = benchmark_message_path(aircraft_count, message_count, config_path)
+    elif command == "capture":
+        if len(sys.argv) < 3:
+            print("Usage: python benchmark.py capture <file|dir> [config]")
+            sys.exit(1)
+        config_path = sys.argv[3] if len(sys.argv) > 3 else "config.json"
+        results = benchmark_message_path(config_path=config_path, capture=sys.argv[2])
+    else:
+        print(f"Unknown command: {command}")
+        sys.exit(1)
+
+    print(json.dumps(results, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -7,11 +7,12 @@ import logging
 import os
 import threading
 import time
-from dataclasses import dataclass, asdict, field
+from dataclasses import dataclass, asdict, field, replace
 from pathlib import Path
-from typing import Dict, List, Any, Optional, Callable
+from typing import Dict, List, Any, Optional, Callable, Tuple
 from utils import (validate_frequency, validate_gain, validate_coordinates, validate_icao,
                   error_handler, ErrorSeverity, ComponentType, handle_exception, safe_execute)
+from rules import compile_expression
 
 
 logger = logging.getLogger(__name__)
@@ -46,6 +47,30 @@ class ReceiverConfig:
     reference_lat: float = 41.9481
     reference_lon: float = -87.6555
     alert_interval: int = 300
+    # Ingest pipeline: reader -> decode -> tracker stages with bounded queues
+    ingest_pipeline: bool = True
+    ingest_queue_size: int = 2000
+    decode_processes: int = 0  # >0 decodes pyModeS fields in a process pool
+    engine: str = "threaded"  # "threaded" or "asyncio"
+    live_state_path: str = "live_state.bin"  # shared-memory channel to the dashboard, "" to disable
+    push_host: str = "127.0.0.1"
+    push_port: int = 30010  # NDJSON aircraft delta stream, 0 to disable
+    push_socket: str = ""  # optional Unix socket path for the same stream
+    push_queue_size: int = 1000  # per-client backlog before a slow client is dropped
+    record_dir: str = ""  # directory for raw stream capture segments, "" to disable
+    record_segment_seconds: int = 300
+    record_max_segments: int = 288  # oldest segments are deleted beyond this, 0 keeps all
+    record_compression: str = "zstd"  # "zstd" (falls back to gzip if unavailable) or "gzip"
+    crc_check: bool = True  # drop DF11/17/18 frames whose parity does not match
+    crc_fix_single_bit: bool = True  # repair DF17/18 frames with a single flipped bit
+    address_parity_filter: bool = True  # keep DF0/4/5/16/20/21 replies only from addresses seen in checked frames (needs crc_check)
+    known_icao_timeout: int = 60  # seconds an address stays known after its last checked frame
+    aircraft_timeout: int = 300  # seconds without messages before an airborne aircraft is dropped
+    surface_aircraft_timeout: int = 60  # same for aircraft last seen on the ground
+    cpr_timeout: int = 60  # seconds CPR frames and fixes are kept for position decoding
+    track_history_size: int = 120  # position samples kept per aircraft, 0 disables trails
+    track_history_max_samples: int = 200000  # cap across all aircraft, oldest samples evicted first
+    airports_file: str = ""  # airports CSV (OurAirports format) used as surface position references
 
 
 @dataclass
@@ -55,6 +80,46 @@ class WatchlistEntry:
     name: str = ""
 
 
+@dataclass
+class GeofenceZone:
+    """Alert zone: a polygon of [lat, lon] points, or a circle when radius_km is set."""
+    name: str
+    points: Optional[list] = field(default=None)
+    center_lat: Optional[float] = None
+    center_lon: Optional[float] = None
+    radius_km: float = 0.0
+    alert_on: list = field(default_factory=lambda: ["entry"])  # any of "entry", "exit", "dwell"
+    dwell_seconds: int = 300  # time inside before a dwell alert
+    min_altitude: Optional[int] = None  # feet, optional vertical limits of the zone
+    max_altitude: Optional[int] = None
+
+
+@dataclass
+class AlertRule:
+    """Named alert rule over aircraft fields, e.g. "altitude < 3000 and distance < 20"."""
+    name: str
+    expression: str
+
+
+@dataclass(frozen=True)
+class ConfigSnapshot:
+    """Immutable, versioned view of the parsed configuration.
+    
+    Hot paths should read typed sections from here instead of calling
+    Config.load(); the nested dataclasses are shared and must be treated
+    as read-only.
+    """
+    version: int
+    radio: RadioConfig
+    meshtastic: MeshtasticConfig
+    receiver: ReceiverConfig
+    watchlist: Tuple[WatchlistEntry, ...]
+    dump1090_port: int = 30005
+    geofences: Tuple[GeofenceZone, ...] = ()
+    rules: Tuple[AlertRule, ...] = ()
+    raw: Dict[str, Any] = field(default_factory=dict, compare=False)
+
+
 class ConfigValidator:
     """Configuration validation utilities."""
     
@@ -128,7 +193,29 @@ class ConfigValidator:
             if not isinstance(alert_interval, int) or alert_interval < 0:
                 logger.error(f"Invalid alert interval: {alert_interval}")
                 return False
-                
+
+            engine = settings.get('engine', 'threaded')
+            if engine not in ('threaded', 'asyncio'):
+                logger.error(f"Invalid receiver engine: {engine}")
+                return False
+
+            record_compression = settings.get('record_compression', 'zstd')
+            if record_compression not in ('zstd', 'gzip'):
+                logger.error(f"Invalid record compression: {record_compression}")
+                return False
+
+            push_port = settings.get('push_port', 30010)
+            if not isinstance(push_port, int) or not 0 <= push_port <= 65535:
+                logger.error(f"Invalid push API port: {push_port}")
+                return False
+
+            for key, default in (('known_icao_timeout', 60), ('aircraft_timeout', 300),
+                                 ('surface_aircraft_timeout', 60), ('cpr_timeout', 60)):
+                value = settings.get(key, default)
+                if not isinstance(value, (int, float)) or value <= 0:
+                    logger.error(f"Invalid {key}: {value}")
+                    return False
+
             return True
         except Exception as e:
             logger.error(f"Receiver settings validation error: {e}")
@@ -174,6 +261,84 @@ class ConfigValidator:
             return False
 
 
+    @staticmethod
+    def validate_geofences(geofences) -> bool:
+        """Validate geofence zone definitions."""
+        try:
+            if not isinstance(geofences, list):
+                logger.error("Geofences must be a list of zones")
+                return False
+            
+            for zone in geofences:
+                if not isinstance(zone, dict) or not zone.get('name'):
+                    logger.error(f"Invalid geofence zone: {zone}")
+                    return False
+                name = zone['name']
+                
+                if zone.get('radius_km'):
+                    if not validate_coordinates(zone.get('center_lat'), zone.get('center_lon')):
+                        logger.error(f"Invalid center for geofence {name}")
+                        return False
+                    if not isinstance(zone['radius_km'], (int, float)) or zone['radius_km'] <= 0:
+                        logger.error(f"Invalid radius for geofence {name}: {zone['radius_km']}")
+                        return False
+                else:
+                    points = zone.get('points')
+                    if not isinstance(points, list) or len(points) < 3:
+                        logger.error(f"Geofence {name} needs radius_km or at least 3 points")
+                        return False
+                    for point in points:
+                        if (not isinstance(point, (list, tuple)) or len(point) != 2 or
+                                not validate_coordinates(point[0], point[1])):
+                            logger.error(f"Invalid point in geofence {name}: {point}")
+                            return False
+                
+                alert_on = zone.get('alert_on', ['entry'])
+                if not isinstance(alert_on, list) or not set(alert_on) <= {'entry', 'exit', 'dwell'}:
+                    logger.error(f"Invalid alert_on for geofence {name}: {alert_on}")
+                    return False
+                
+                dwell_seconds = zone.get('dwell_seconds', 300)
+                if not isinstance(dwell_seconds, (int, float)) or dwell_seconds <= 0:
+                    logger.error(f"Invalid dwell_seconds for geofence {name}: {dwell_seconds}")
+                    return False
+            
+            return True
+        except Exception as e:
+            logger.error(f"Geofence validation error: {e}")
+            return False
+
+
+    @staticmethod
+    def validate_rules(rules) -> bool:
+        """Validate alert rules by compiling their expressions."""
+        try:
+            if not isinstance(rules, list):
+                logger.error("Rules must be a list of rules")
+                return False
+            
+            names = set()
+            for rule in rules:
+                if not isinstance(rule, dict) or not rule.get('name') or not isinstance(rule.get('expression'), str):
+                    logger.error(f"Invalid alert rule: {rule}")
+                    return False
+                if rule['name'] in names:
+                    logger.error(f"Duplicate alert rule name: {rule['name']}")
+                    return False
+                names.add(rule['name'])
+                
+                try:
+                    compile_expression(rule['expression'])
+                except ValueError as e:
+                    logger.error(f"Invalid expression for alert rule {rule['name']}: {e}")
+                    return False
+            
+            return True
+        except Exception as e:
+            logger.error(f"Rule validation error: {e}")
+            return False
+
+
 class Config:
     """Main configuration management class with hot-reload capability."""
     
@@ -186,6 +351,9 @@ class Config:
         self._watch_thread = None
         self._stop_watching = False
         self._lock = threading.Lock()
+        self._snapshot: Optional[ConfigSnapshot] = None
+        self._snapshot_version = 0
+        self._snapshot_lock = threading.Lock()
         
     def get_defaults(self) -> Dict[str, Any]:
         """Get default configuration values."""
@@ -193,7 +361,9 @@ class Config:
             "radio": asdict(RadioConfig()),
             "meshtastic": asdict(MeshtasticConfig()),
             "receiver": asdict(ReceiverConfig()),
-            "watchlist": []
+            "watchlist": [],
+            "geofences": [],
+            "rules": []
         }
     
     def load(self) -> Dict[str, Any]:
@@ -266,6 +436,7 @@ class Config:
             with open(self.config_path, 'w') as f:
                 json.dump(config, f, indent=2)
             self._config_data = config
+            self._publish_snapshot(config)
             logger.info(f"Configuration saved to {self.config_path}")
             
         except Exception as e:
@@ -298,6 +469,14 @@ class Config:
                 if not self.validator.validate_watchlist(config['watchlist']):
                     return False
             
+            if 'geofences' in config:
+                if not self.validator.validate_geofences(config['geofences']):
+                    return False
+            
+            if 'rules' in config:
+                if not self.validator.validate_rules(config['rules']):
+                    return False
+            
             # Also validate legacy target_icao_codes format
             if 'target_icao_codes' in config:
                 if not self.validator.validate_watchlist(config['target_icao_codes']):
@@ -308,10 +487,61 @@ class Config:
             logger.error(f"Configuration validation error: {e}")
             return False
     
+    @property
+    def snapshot(self) -> ConfigSnapshot:
+        """Get the current configuration snapshot, loading it on first use."""
+        snapshot = self._snapshot
+        if snapshot is None:
+            snapshot = self._publish_snapshot(self.load())
+        return snapshot
+    
+    def _publish_snapshot(self, config: Dict[str, Any]) -> ConfigSnapshot:
+        """Parse configuration data into a new snapshot and make it current."""
+        with self._snapshot_lock:
+            self._snapshot_version += 1
+            snapshot = ConfigSnapshot(
+                version=self._snapshot_version,
+                radio=self._parse_radio_config(config),
+                meshtastic=self._parse_meshtastic_config(config),
+                receiver=self._parse_receiver_config(config),
+                watchlist=tuple(self._parse_watchlist(config)),
+                dump1090_port=config.get('dump1090_port', 30005),
+                geofences=tuple(self._parse_geofences(config)),
+                rules=tuple(self._parse_rules(config)),
+                raw=config
+            )
+            self._snapshot = snapshot
+        logger.debug(f"Published configuration snapshot v{snapshot.version}")
+        return snapshot
+    
     def get_radio_config(self) -> RadioConfig:
         """Get radio configuration as dataclass."""
-        config = self.load()
-        radio_data = config.get('radio', {})
+        return replace(self.snapshot.radio)
+    
+    def get_meshtastic_config(self) -> MeshtasticConfig:
+        """Get Meshtastic configuration as dataclass."""
+        return replace(self.snapshot.meshtastic)
+    
+    def get_receiver_config(self) -> ReceiverConfig:
+        """Get receiver configuration as dataclass."""
+        return replace(self.snapshot.receiver)
+    
+    def get_watchlist(self) -> List[WatchlistEntry]:
+        """Get watchlist as list of dataclasses."""
+        return [replace(entry) for entry in self.snapshot.watchlist]
+    
+    def get_geofences(self) -> List[GeofenceZone]:
+        """Get geofence zones as list of dataclasses."""
+        return [replace(zone) for zone in self.snapshot.geofences]
+    
+    def get_rules(self) -> List[AlertRule]:
+        """Get alert rules as list of dataclasses."""
+        return [replace(rule) for rule in self.snapshot.rules]
+    
+    @staticmethod
+    def _parse_radio_config(config: Dict[str, Any]) -> RadioConfig:
+        """Build radio configuration dataclass from raw config data."""
+        radio_data = dict(config.get('radio', {}))
         
         # Handle legacy config format where radio settings are at root level
         # Always check root level and override radio section if values exist there
@@ -337,10 +567,10 @@ class Config:
         
         return RadioConfig(**radio_data)
     
-    def get_meshtastic_config(self) -> MeshtasticConfig:
-        """Get Meshtastic configuration as dataclass."""
-        config = self.load()
-        meshtastic_data = config.get('meshtastic', {})
+    @staticmethod
+    def _parse_meshtastic_config(config: Dict[str, Any]) -> MeshtasticConfig:
+        """Build Meshtastic configuration dataclass from raw config data."""
+        meshtastic_data = dict(config.get('meshtastic', {}))
         
         # Handle legacy config format where meshtastic settings are at root level
         if not meshtastic_data and 'meshtastic_port' in config:
@@ -368,10 +598,10 @@ class Config:
             
         return MeshtasticConfig(**filtered_data)
     
-    def get_receiver_config(self) -> ReceiverConfig:
-        """Get receiver configuration as dataclass."""
-        config = self.load()
-        receiver_data = config.get('receiver', {})
+    @staticmethod
+    def _parse_receiver_config(config: Dict[str, Any]) -> ReceiverConfig:
+        """Build receiver configuration dataclass from raw config data."""
+        receiver_data = dict(config.get('receiver', {}))
         
         # Handle legacy config format where receiver settings are at root level
         # Always check root level and override receiver section if values exist there
@@ -407,9 +637,9 @@ class Config:
         
         return ReceiverConfig(**receiver_data)
     
-    def get_watchlist(self) -> List[WatchlistEntry]:
-        """Get watchlist as list of dataclasses."""
-        config = self.load()
+    @staticmethod
+    def _parse_watchlist(config: Dict[str, Any]) -> List[WatchlistEntry]:
+        """Build watchlist entries from raw config data."""
         watchlist_data = config.get('watchlist', [])
         
         # Handle legacy format with target_icao_codes
@@ -430,10 +660,33 @@ class Config:
                 entries.append(WatchlistEntry(icao=entry, name=''))
             elif isinstance(entry, dict):
                 # Handle object format
-                entries.append(WatchlistEntry(**entry))
+                entries.append(WatchlistEntry(icao=entry.get('icao', ''), name=entry.get('name', '')))
         
         return entries
     
+    @staticmethod
+    def _parse_geofences(config: Dict[str, Any]) -> List[GeofenceZone]:
+        """Build geofence zones from raw config data."""
+        zones = []
+        for zone in config.get('geofences', []):
+            if not isinstance(zone, dict):
+                continue
+            known = {key: value for key, value in zone.items() if key in GeofenceZone.__dataclass_fields__}
+            try:
+                zones.append(GeofenceZone(**known))
+            except TypeError as e:
+                logger.warning(f"Skipping geofence zone {zone.get('name', '?')}: {e}")
+        return zones
+    
+    @staticmethod
+    def _parse_rules(config: Dict[str, Any]) -> List[AlertRule]:
+        """Build alert rules from raw config data."""
+        rules = []
+        for rule in config.get('rules', []):
+            if isinstance(rule, dict) and rule.get('name') and isinstance(rule.get('expression'), str):
+                rules.append(AlertRule(name=str(rule['name']), expression=rule['expression']))
+        return rules
+    
     def add_to_watchlist(self, icao: str, name: str = "") -> bool:
         """Add aircraft to watchlist."""
         try:
@@ -535,6 +788,7 @@ class Config:
                         
                         # Validate new configuration
                         if self.validate(new_config):
+                            self._publish_snapshot(new_config)
                             logger.info("Configuration reloaded successfully")
                             
                             # Call registered callbacks
@@ -563,6 +817,7 @@ class Config:
             new_config = self.load()
             
             if self.validate(new_config):
+                self._publish_snapshot(new_config)
                 logger.info("Configuration reloaded manually")
                 
                 # Call registered callbacks
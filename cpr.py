@@ -0,0 +1,270 @@
+"""
+Compact Position Reporting (CPR) decoding with per-aircraft state.
+
+An aircraft's first airborne fix comes from a global decode of a fresh
+even/odd pair; after that each position frame is decoded locally relative
+to the aircraft's own last fix, which needs only one frame. Surface frames
+are acquired against nearby reference points instead. Every fix is checked
+against the previous one for a plausible ground speed.
+"""
+
+import math
+import time
+from dataclasses import dataclass
+from typing import Any, Dict, Optional, Sequence, Tuple
+
+from modes import cpr_nl
+from timing_wheel import TimingWheel
+
+
+_CPR_SCALE = float(1 << 17)
+
+# Even and odd frames older than this cannot be combined (airborne, seconds)
+PAIR_TIMEOUT = 10.0
+
+# A fix older than this is not used as a local decode reference (seconds)
+POSITION_TIMEOUT = 60.0
+
+# Surface CPR repeats every 90 degrees; a reference must be within half a
+# latitude zone (0.75 degrees) of the aircraft to resolve it
+SURFACE_REFERENCE_RANGE_KM = 80.0
+
+# Fastest plausible ground speed, and slack for CPR and timing jitter
+MAX_SPEED_KMS = 0.75  # about 1450 knots
+POSITION_MARGIN_KM = 2.0
+
+
+def global_position(even: Tuple[int, int], odd: Tuple[int, int], odd_newest: bool) -> Optional[Tuple[float, float]]:
+    """Decode an airborne position from an even and an odd (lat_cpr, lon_cpr) pair."""
+    lat_even = even[0] / _CPR_SCALE
+    lat_odd = odd[0] / _CPR_SCALE
+    j = math.floor(59 * lat_even - 60 * lat_odd + 0.5)
+
+    rlat_even = 6.0 * (j % 60 + lat_even)
+    rlat_odd = (360.0 / 59) * (j % 59 + lat_odd)
+    if rlat_even >= 270:
+        rlat_even -= 360
+    if rlat_odd >= 270:
+        rlat_odd -= 360
+    if not -90 <= rlat_even <= 90 or not -90 <= rlat_odd <= 90:
+        return None
+
+    nl = cpr_nl(rlat_even)
+    if nl != cpr_nl(rlat_odd):
+        # The pair straddles a zone boundary, wait for a new pair
+        return None
+
+    lon_even = even[1] / _CPR_SCALE
+    lon_odd = odd[1] / _CPR_SCALE
+    m = math.floor(lon_even * (nl - 1) - lon_odd * nl + 0.5)
+    if odd_newest:
+        lat = rlat_odd
+        ni = max(nl - 1, 1)
+        lon = (360.0 / ni) * (m % ni + lon_odd)
+    else:
+        lat = rlat_even
+        ni = max(nl, 1)
+        lon = (360.0 / ni) * (m % ni + lon_even)
+
+    if lon >= 180:
+        lon -= 360
+    return lat, lon
+
+
+def local_position(odd: bool, lat_cpr: int, lon_cpr: int, ref_lat: float, ref_lon: float,
+                   surface: bool = False) -> Tuple[float, float]:
+    """Decode a position from one frame relative to a reference within half a zone."""
+    i = 1 if odd else 0
+    span = 90.0 if surface else 360.0
+    lat_fraction = lat_cpr / _CPR_SCALE
+    dlat = span / (60 - i)
+    j = math.floor(ref_lat / dlat) + math.floor(0.5 + (ref_lat % dlat) / dlat - lat_fraction)
+    lat = dlat * (j + lat_fraction)
+
+    lon_fraction = lon_cpr / _CPR_SCALE
+    dlon = span / max(cpr_nl(lat) - i, 1)
+    m = math.floor(ref_lon / dlon) + math.floor(0.5 + (ref_lon % dlon) / dlon - lon_fraction)
+    lon = dlon * (m + lon_fraction)
+    if lon >= 180:
+        lon -= 360
+    elif lon < -180:
+        lon += 360
+    return lat, lon
+
+
+def _distance_km(lat1: float, lon1: float, lat2: float, lon2: float) -> float:
+    """Great-circle distance in kilometers."""
+    dlat = math.radians(lat2 - lat1)
+    dlon = math.radians(lon2 - lon1)
+    a = (math.sin(dlat / 2) ** 2 +
+         math.cos(math.radians(lat1)) * math.cos(math.radians(lat2)) * math.sin(dlon / 2) ** 2)
+    return 12742.0 * math.asin(min(1.0, math.sqrt(a)))
+
+
+@dataclass(slots=True)
+class CPRState:
+    """Latest even and odd frames and last fix of one aircraft."""
+    even: Optional[Tuple[int, int]] = None
+    even_time: float = 0.0
+    odd: Optional[Tuple[int, int]] = None
+    odd_time: float = 0.0
+    lat: Optional[float] = None
+    lon: Optional[float] = None
+    position_time: float = 0.0
+    last_seen: float = 0.0
+
+
+class CPRDecoder:
+    """Per-aircraft CPR state machine: global decode to acquire, local decode to track."""
+
+    def __init__(self, pair_timeout: float = PAIR_TIMEOUT, position_timeout: float = POSITION_TIMEOUT,
+                 max_speed_kms: float = MAX_SPEED_KMS):
+        self.pair_timeout = pair_timeout
+        self.position_timeout = position_timeout
+        self.max_speed_kms = max_speed_kms
+        self.states: Dict[int, CPRState] = {}
+        self.expiry = TimingWheel()
+
+        # Statistics
+        self.global_decodes = 0
+        self.local_decodes = 0
+        self.reference_decodes = 0
+        self.failed = 0
+        self.implausible = 0
+
+    def __len__(self) -> int:
+        return len(self.states)
+
+    def decode(self, address: int, odd: bool, lat_cpr: int, lon_cpr: int,
+               now: Optional[float] = None) -> Optional[Tuple[float, float]]:
+        """Feed an airborne position frame and return the aircraft's position if known."""
+        if now is None:
+            now = time.monotonic()
+        state = self.states.get(address) or self._new_state(address, now)
+        state.last_seen = now
+
+        if odd:
+            state.odd = (lat_cpr, lon_cpr)
+            state.odd_time = now
+        else:
+            state.even = (lat_cpr, lon_cpr)
+            state.even_time = now
+
+        has_reference = state.lat is not None and now - state.position_time <= self.position_timeout
+        if has_reference:
+            position = local_position(odd, lat_cpr, lon_cpr, state.lat, state.lon)
+            if self._plausible(state, position, now):
+                self.local_decodes += 1
+                return self._fix(state, position, now)
+
+        # Global decode needs the other half from the last few seconds
+        other_time = state.even_time if odd else state.odd_time
+        if state.even is None or state.odd is None or now - other_time > self.pair_timeout:
+            if has_reference:
+                self.implausible += 1
+            return None
+
+        position = global_position(state.even, state.odd, odd)
+        if position is None:
+            self.failed += 1
+            return None
+
+        if has_reference and not self._plausible(state, position, now):
+            # Neither decode agrees with the track: start again from a fresh pair
+            self.implausible += 1
+            state.even = state.odd = None
+            state.lat = state.lon = None
+            return None
+
+        self.global_decodes += 1
+        return self._fix(state, position, now)
+
+    def decode_surface(self, address: int, odd: bool, lat_cpr: int, lon_cpr: int,
+                       references: Sequence[Tuple[float, float]],
+                       now: Optional[float] = None) -> Optional[Tuple[float, float]]:
+        """Feed a surface position frame and return the aircraft's position if it can be resolved.
+
+        The aircraft's own recent fix (airborne or surface) is the reference
+        when there is one; otherwise the frame is decoded against each of the
+        given references (nearby airports, receiver) and the candidate lying
+        closest to its reference wins.
+        """
+        if now is None:
+            now = time.monotonic()
+        state = self.states.get(address) or self._new_state(address, now)
+        state.last_seen = now
+
+        if state.lat is not None and now - state.position_time <= self.position_timeout:
+            position = local_position(odd, lat_cpr, lon_cpr, state.lat, state.lon, surface=True)
+            if self._plausible(state, position, now):
+                self.local_decodes += 1
+                return self._fix(state, position, now)
+            self.implausible += 1
+
+        best = None
+        best_distance = SURFACE_REFERENCE_RANGE_KM
+        for ref_lat, ref_lon in references:
+            position = local_position(odd, lat_cpr, lon_cpr, ref_lat, ref_lon, surface=True)
+            distance = _distance_km(ref_lat, ref_lon, position[0], position[1])
+            if distance <= best_distance:
+                best, best_distance = position, distance
+
+        if best is None:
+            self.failed += 1
+            return None
+        self.reference_decodes += 1
+        return self._fix(state, best, now)
+
+    def forget(self, address: int) -> None:
+        """Drop an aircraft's CPR state."""
+        self.states.pop(address, None)
+        self.expiry.cancel(address)
+
+    def expire(self, now: Optional[float] = None) -> int:
+        """Drop state of aircraft with no position frames within the position timeout."""
+        if now is None:
+            now = time.monotonic()
+        removed = 0
+        for address in self.expiry.advance(now):
+            state = self.states.get(address)
+            if state is None:
+                continue
+            deadline = state.last_seen + self.position_timeout
+            if deadline <= now:
+                del self.states[address]
+                removed += 1
+            else:
+                self.expiry.schedule(address, deadline)
+        return removed
+
+    def get_statistics(self) -> Dict[str, Any]:
+        """Get decoder statistics."""
+        return {
+            "aircraft": len(self.states),
+            "global_decodes": self.global_decodes,
+            "local_decodes": self.local_decodes,
+            "reference_decodes": self.reference_decodes,
+            "failed": self.failed,
+            "implausible": self.implausible
+        }
+
+    def _new_state(self, address: int, now: float) -> CPRState:
+        """Create an aircraft's CPR state and file it for expiry."""
+        state = self.states[address] = CPRState()
+        self.expiry.schedule(address, now + self.position_timeout)
+        return state
+
+    def _plausible(self, state: CPRState, position: Tuple[float, float], now: float) -> bool:
+        """Check that a fix is reachable from the last one at a plausible speed."""
+        lat, lon = position
+        if not -90 <= lat <= 90:
+            return False
+        limit = self.max_speed_kms * (now - state.position_time) + POSITION_MARGIN_KM
+        return _distance_km(state.lat, state.lon, lat, lon) <= limit
+
+    @staticmethod
+    def _fix(state: CPRState, position: Tuple[float, float], now: float) -> Tuple[float, float]:
+        """Record a new fix as the local decode reference."""
+        state.lat, state.lon = position
+        state.position_time = now
+        return position
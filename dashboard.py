@@ -16,6 +16,7 @@ from typing import Dict, List, Any, Optional
 from utils import (setup_logging, format_time_ago, error_handler, ErrorSeverity, 
                   ComponentType, handle_exception, safe_execute)
 from config import Config, RadioConfig
+from live_state import LiveStateReader
 
 
 logger = logging.getLogger(__name__)
@@ -396,11 +397,22 @@ class SystemStatusMonitor:
     def __init__(self, status_file: str = "status.json"):
         self.status_file = Path(status_file)
         self.last_status = {}
+        self.live_status = None  # set from the receiver's live state channel
         self.last_update = datetime.now()
         self.update_interval = 1.0  # Update every second
         
+    def set_live_status(self, status: Optional[dict]) -> None:
+        """Use status from the live state channel, or None to read status.json again."""
+        self.live_status = status
+        if status is not None:
+            self.last_status = status
+            self.last_update = datetime.now()
+    
     def load_status(self) -> dict:
         """Load system status from status.json file with error handling."""
+        if self.live_status is not None:
+            return self.live_status
+        
         try:
             if self.status_file.exists():
                 with open(self.status_file, 'r') as f:
@@ -1635,6 +1647,8 @@ class Dashboard:
         self.aircraft_data = {}
         self.status_data = {}
         self.last_update = datetime.now()
+        self.live_state = None  # LiveStateReader, created on first load
+        self.live_state_timeout = 15.0  # fall back to JSON files after this many seconds
         self.update_interval = 0.2  # 200ms refresh rate (5 FPS)
         
         # Aircraft display settings
@@ -1650,6 +1664,8 @@ class Dashboard:
     def run(self) -> None:
         """Run the dashboard application."""
         try:
+            # Keep the configuration snapshot in sync with external edits
+            self.config.start_watching()
             curses.wrapper(self._main_loop)
         except KeyboardInterrupt:
             logger.info("Dashboard interrupted by user")
@@ -1672,6 +1688,7 @@ class Dashboard:
             last_refresh = time.time()
             last_data_load = 0
             data_load_interval = 1.0  # Load data every 1 second
+            idle_redraw_interval = 5.0  # Redraw unchanged data this often (ages, waterfall)
             needs_redraw = True
             
             while self.running:
@@ -1686,9 +1703,9 @@ class Dashboard:
                     
                     # Load data less frequently
                     if current_time - last_data_load >= data_load_interval:
-                        self.load_data()
+                        if self.load_data() or current_time - last_refresh >= idle_redraw_interval:
+                            needs_redraw = True
                         last_data_load = current_time
-                        needs_redraw = True
                     
                     # Only refresh screen when needed and at specified interval
                     if needs_redraw and (current_time - last_refresh >= self.update_interval):
@@ -1788,8 +1805,16 @@ class Dashboard:
         except:
             return False
     
-    def load_data(self) -> None:
-        """Load aircraft and status data from JSON files with error handling."""
+    def load_data(self) -> bool:
+        """Load aircraft and status data, returning True if it may have changed.
+        
+        Reads the receiver's shared-memory live state when it is available
+        and falls back to the JSON files otherwise.
+        """
+        live_result = self._load_live_state()
+        if live_result is not None:
+            return live_result
+        
         try:
             # Load aircraft data
             aircraft_file = Path("aircraft.json")
@@ -1847,6 +1872,42 @@ class Dashboard:
             
         except Exception as e:
             logger.error(f"Error loading data: {e}")
+        
+        return True
+    
+    def _load_live_state(self) -> Optional[bool]:
+        """Load data from the receiver's live state channel.
+        
+        Returns True if new data was loaded, False if the channel is live but
+        unchanged, and None if it is unavailable or stale.
+        """
+        try:
+            path = self.config.snapshot.receiver.live_state_path
+            if not path:
+                return None
+            
+            if self.live_state is None or self.live_state.path != path:
+                if self.live_state:
+                    self.live_state.close()
+                self.live_state = LiveStateReader(path)
+            
+            state = self.live_state.poll()
+            if state is not None:
+                self.aircraft_data = state.get("aircraft_data") or {"aircraft": []}
+                self.status_data = state.get("status") or {}
+                self.status_monitor.set_live_status(self.status_data)
+                self.last_update = datetime.now()
+                return True
+            
+            if self.live_state.age() < self.live_state_timeout:
+                return False
+            
+        except Exception as e:
+            logger.error(f"Error reading live state: {e}")
+        
+        # Receiver not publishing, use the JSON files
+        self.status_monitor.set_live_status(None)
+        return None
     
     def draw_header(self, screen) -> None:
         """Draw dashboard header with enhanced status information."""
@@ -1882,6 +1943,12 @@ class Dashboard:
             if not aircraft_list:
                 return aircraft_list
             
+            if self.sort_column == 'distance':
+                # Reference point and distance function are looked up once per sort
+                receiver_config = self.config.snapshot.receiver
+                ref_lat, ref_lon = receiver_config.reference_lat, receiver_config.reference_lon
+                from utils import calculate_distance
+            
             # Define sort key functions
             def get_sort_key(aircraft):
                 if self.sort_column == 'icao':
@@ -1900,9 +1967,7 @@ class Dashboard:
                     lon = aircraft.get('longitude')
                     if lat is not None and lon is not None:
                         try:
-                            receiver_config = self.config.get_receiver_config()
-                            from utils import calculate_distance
-                            return calculate_distance(receiver_config.reference_lat, receiver_config.reference_lon, lat, lon)
+                            return calculate_distance(ref_lat, ref_lon, lat, lon)
                         except:
                             return 999999  # Put aircraft without distance at end
                     return 999999
@@ -2845,6 +2910,7 @@ class Dashboard:
         """Gracefully shutdown the dashboard."""
         try:
             self.running = False
+            self.config.stop_watching()
             logger.info("Dashboard shutting down")
         except Exception as e:
             logger.error(f"Error during dashboard shutdown: {e}")
@@ -0,0 +1,476 @@
+"""
+Stateless Mode S / ADS-B field decoding for Ursine Capture.
+
+Everything here is a plain module-level function so it can run in worker
+processes; anything that needs per-aircraft state (CPR position decoding)
+is left to the receiver.
+"""
+
+import logging
+from typing import Dict, Any, List, Optional, Tuple
+
+from modes import CRC24_TABLE, check_frame, correct_single_bit, CRC_CORRECTED, CRC_FAILED
+from emergency import identity_code
+
+
+logger = logging.getLogger(__name__)
+
+
+# Parsed message kinds handed from the stream parser to the decoder
+MESSAGE_RAW = 'raw'
+MESSAGE_SBS = 'sbs'
+
+try:
+    import pyModeS as pms
+except ImportError:
+    pms = None
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+
+# Below this many frames the per-frame decoder is faster than setting up arrays
+MIN_BATCH_SIZE = 8
+
+# Downlink formats whose address is sent in clear, and those where it is
+# overlaid on the parity field (address/parity)
+_DF_ADDRESS_CLEAR = (11, 17, 18)
+_DF_ADDRESS_PARITY = (0, 4, 5, 16, 20, 21)
+
+# Downlink formats with a flight status field (alert, SPI, airborne/ground)
+_DF_FLIGHT_STATUS = (4, 5, 20, 21)
+
+# pyModeS identification charset ('_' is a space, '#' is invalid)
+_CALLSIGN_CHARS = "#ABCDEFGHIJKLMNOPQRSTUVWXYZ#####_###############0123456789######"
+
+
+
+def _build_surface_speed_table() -> Tuple[Optional[float], ...]:
+    """Map the 7-bit surface movement code to ground speed in knots."""
+    bounds = ((2, 0.125, 0.125), (9, 1.0, 0.25), (13, 2.0, 0.5), (39, 15.0, 1.0),
+              (94, 70.0, 2.0), (109, 100.0, 5.0))
+    speeds: List[Optional[float]] = [None, 0.0]
+    for movement in range(2, 128):
+        if movement == 124:
+            speeds.append(175.0)
+        elif movement > 124:
+            speeds.append(None)
+        else:
+            start, knots, step = [bound for bound in bounds if bound[0] <= movement][-1]
+            speeds.append(knots + (movement - start) * step)
+    return tuple(speeds)
+
+
+_SURFACE_SPEEDS = _build_surface_speed_table()
+
+if np is not None:
+    _CRC_TABLE_ARRAY = np.array(CRC24_TABLE, dtype=np.uint32)
+    _CALLSIGN_CHARS_ARRAY = np.frombuffer(_CALLSIGN_CHARS.encode('ascii'), dtype=np.uint8)
+    _DF_CLEAR_MASK = np.isin(np.arange(25), _DF_ADDRESS_CLEAR)
+    _DF_PARITY_MASK = np.isin(np.arange(25), _DF_ADDRESS_PARITY)
+    _DF_EXTENDED_MASK = np.isin(np.arange(25), (17, 18))
+
+
+def decode_adsb_fields(raw_message: str) -> Optional[Dict[str, Any]]:
+    """Decode the stateless fields of an ADS-B message using pyModeS.
+
+    Position messages (typecodes 5-18) are flagged with 'position_pending'
+    so the caller can resolve latitude/longitude with its CPR state.
+    """
+    if pms is None:
+        logger.error("pyModeS not installed. Run: pip install pyModeS")
+        return None
+
+    try:
+        # Extract ICAO address
+        icao = pms.adsb.icao(raw_message)
+        if not icao:
+            return None
+
+        # Initialize decoded data
+        df = pms.df(raw_message)
+        decoded_data = {
+            'icao': icao,
+            'address': int(icao, 16),
+            'df': df,
+            'raw_message': raw_message,
+            'message_type': None
+        }
+
+        if df in _DF_ADDRESS_PARITY:
+            _add_surveillance_fields(decoded_data, raw_message, df)
+            return decoded_data
+
+        # Determine message type
+        typecode = pms.adsb.typecode(raw_message)
+        decoded_data['message_type'] = typecode
+        if typecode is None:
+            return decoded_data
+
+        # Decode based on message type
+        if 1 <= typecode <= 4:
+            # Aircraft identification
+            callsign = pms.adsb.callsign(raw_message)
+            if callsign:
+                decoded_data['callsign'] = callsign.strip('_ ')
+
+        elif 5 <= typecode <= 8:
+            # Surface position, resolved against a reference by the caller
+            _add_surface_movement(decoded_data, int(raw_message[8:22], 16))
+            _add_cpr_fields(decoded_data, raw_message)
+
+        elif 9 <= typecode <= 18:
+            # Airborne position
+            try:
+                # Decode altitude first (always available)
+                altitude = pms.adsb.altitude(raw_message)
+                if altitude is not None:
+                    decoded_data['altitude'] = altitude
+            except Exception as e:
+                logger.debug(f"Error decoding altitude: {e}")
+
+            _add_cpr_fields(decoded_data, raw_message)
+
+        elif typecode == 19:
+            # Airborne velocity
+            try:
+                velocity = pms.adsb.velocity(raw_message)
+                if velocity:
+                    speed, track, vertical_rate, _ = velocity
+                    if speed is not None:
+                        decoded_data['speed'] = int(speed)
+                    if track is not None:
+                        decoded_data['track'] = int(track)
+                    if vertical_rate is not None:
+                        decoded_data['vertical_rate'] = int(vertical_rate)
+
+            except Exception as e:
+                logger.debug(f"Error decoding velocity: {e}")
+
+        elif typecode == 28:
+            # Aircraft status: emergency state and squawk
+            _add_emergency_status(decoded_data, int(raw_message[8:22], 16))
+
+        return decoded_data
+
+    except Exception as e:
+        logger.debug(f"Error decoding message {raw_message[:20]}...: {e}")
+        return None
+
+
+def _add_cpr_fields(decoded_data: Dict[str, Any], raw_message: str) -> None:
+    """Add the raw CPR format and coordinates of a position message for the caller's CPR state."""
+    me = int(raw_message[8:22], 16)
+    decoded_data['position_pending'] = True
+    decoded_data['cpr_odd'] = (me >> 34) & 1
+    decoded_data['cpr_lat'] = (me >> 17) & 0x1FFFF
+    decoded_data['cpr_lon'] = me & 0x1FFFF
+
+
+def _add_surface_movement(decoded_data: Dict[str, Any], me: int) -> None:
+    """Add ground speed and track of a surface position message."""
+    speed = _SURFACE_SPEEDS[(me >> 44) & 0x7F]
+    if speed is not None:
+        decoded_data['speed'] = int(speed)
+    if (me >> 43) & 1:
+        decoded_data['track'] = int(((me >> 36) & 0x7F) * 360 / 128)
+
+
+def _add_emergency_status(decoded_data: Dict[str, Any], me: int) -> None:
+    """Add emergency state and squawk of an emergency/priority status message (TC 28 subtype 1)."""
+    if (me >> 48) & 0x7 == 1:
+        decoded_data['emergency_state'] = (me >> 45) & 0x7
+        decoded_data['squawk'] = identity_code((me >> 32) & 0x1FFF)
+
+
+def _add_surveillance_fields(decoded_data: Dict[str, Any], raw_message: str, df: int) -> None:
+    """Add the altitude (DF0/4/16/20) or identity code (DF5/21) and flight status of a surveillance reply."""
+    try:
+        if df in _DF_FLIGHT_STATUS:
+            # Flight status: 0/2 airborne, 1/3 on ground, 4/5 either; 4/5 raise SPI
+            status = int(raw_message[1], 16) & 0x7
+            if status <= 3:
+                decoded_data['on_ground'] = bool(status & 1)
+            decoded_data['spi'] = status == 4 or status == 5
+        if df == 5 or df == 21:
+            decoded_data['squawk'] = identity_code(int(raw_message[4:8], 16) & 0x1FFF)
+        else:
+            altitude = pms.common.altcode(raw_message)
+            if altitude is not None:
+                decoded_data['altitude'] = altitude
+    except Exception as e:
+        logger.debug(f"Error decoding surveillance reply {raw_message[:20]}: {e}")
+
+
+def decode_adsb_batch(raw_messages: List[str]) -> List[Optional[Dict[str, Any]]]:
+    """Decode a block of raw frames at once, matching decode_adsb_fields frame by frame.
+
+    Common fields (DF, address, typecode, altitude, callsign, ground speed
+    velocity) are extracted with vectorized NumPy bit operations; anything
+    rarer falls back to pyModeS for that frame.
+    """
+    if np is None or pms is None or len(raw_messages) < MIN_BATCH_SIZE:
+        return [decode_adsb_fields(message) for message in raw_messages]
+
+    results: List[Optional[Dict[str, Any]]] = [None] * len(raw_messages)
+    long_frames = []
+    short_frames = []
+    for index, message in enumerate(raw_messages):
+        length = len(message)
+        if length == 28:
+            long_frames.append(index)
+        elif length == 14:
+            short_frames.append(index)
+        else:
+            results[index] = decode_adsb_fields(message)
+
+    for indexes in (long_frames, short_frames):
+        if not indexes:
+            continue
+        messages = [raw_messages[index] for index in indexes]
+        try:
+            decoded = _decode_frame_block(messages)
+        except Exception as e:
+            logger.debug(f"Batch decode failed, decoding frame by frame: {e}")
+            decoded = [decode_adsb_fields(message) for message in messages]
+        for index, result in zip(indexes, decoded):
+            results[index] = result
+
+    return results
+
+
+def check_frames_crc(raw_messages: List[str], fix_single_bit: bool = True) -> Tuple[List[Optional[str]], int, int]:
+    """Check parity of raw frames before decoding.
+
+    Returns the frames with failures replaced by None and single-bit errors
+    repaired (when enabled), plus the corrected and failed counts.
+    Address/parity formats pass through unchecked.
+    """
+    if np is None or len(raw_messages) < MIN_BATCH_SIZE:
+        return _check_frames_crc_scalar(raw_messages, fix_single_bit)
+
+    checked: List[Optional[str]] = list(raw_messages)
+    corrected = 0
+    failed = 0
+    groups: Dict[int, List[int]] = {}
+    for index, message in enumerate(raw_messages):
+        groups.setdefault(len(message), []).append(index)
+
+    for length, indexes in groups.items():
+        if length not in (14, 28):
+            results, fixed, bad = _check_frames_crc_scalar([raw_messages[i] for i in indexes], fix_single_bit)
+            for index, result in zip(indexes, results):
+                checked[index] = result
+            corrected += fixed
+            failed += bad
+            continue
+
+        frames = np.frombuffer(bytes.fromhex("".join(raw_messages[i] for i in indexes)),
+                               dtype=np.uint8).reshape(len(indexes), length // 2)
+        df = frames[:, 0] >> 3
+        parity = ((frames[:, -3].astype(np.uint32) << 16) | (frames[:, -2].astype(np.uint32) << 8) |
+                  frames[:, -1].astype(np.uint32))
+        remainder = _crc24_rows(frames[:, :-3]) ^ parity
+
+        if length == 28:
+            bad_rows = np.flatnonzero(_DF_EXTENDED_MASK[np.minimum(df, 24)] & (remainder != 0))
+        else:
+            bad_rows = np.flatnonzero(((df == 11) & ((remainder & 0xFFFF80) != 0)) | (df == 17) | (df == 18))
+
+        for row, rem in zip(bad_rows.tolist(), remainder[bad_rows].tolist()):
+            index = indexes[row]
+            fixed_frame = correct_single_bit(frames[row].tobytes(), rem) if fix_single_bit and length == 28 else None
+            if fixed_frame is not None:
+                checked[index] = fixed_frame.hex().upper()
+                corrected += 1
+            else:
+                checked[index] = None
+                failed += 1
+
+    return checked, corrected, failed
+
+
+def _check_frames_crc_scalar(raw_messages: List[str], fix_single_bit: bool) -> Tuple[List[Optional[str]], int, int]:
+    """Check parity frame by frame."""
+    checked: List[Optional[str]] = []
+    corrected = 0
+    failed = 0
+    for message in raw_messages:
+        frame, outcome = check_frame(bytes.fromhex(message), fix_single_bit)
+        if outcome == CRC_FAILED:
+            checked.append(None)
+            failed += 1
+        elif outcome == CRC_CORRECTED:
+            checked.append(frame.hex().upper())
+            corrected += 1
+        else:
+            checked.append(message)
+    return checked, corrected, failed
+
+
+def _crc24_rows(data):
+    """Compute the CRC-24 remainder of every row of a uint8 array."""
+    crc = np.zeros(data.shape[0], dtype=np.uint32)
+    table = _CRC_TABLE_ARRAY
+    for column in range(data.shape[1]):
+        crc = ((crc << 8) & 0xFFFFFF) ^ table[(crc >> 16) ^ data[:, column]]
+    return crc
+
+
+def _decode_frame_block(messages: List[str]) -> List[Optional[Dict[str, Any]]]:
+    """Decode same-length frames held as one 2-D uint8 array."""
+    count = len(messages)
+    frame_bytes = len(messages[0]) // 2
+    frames = np.frombuffer(bytes.fromhex("".join(messages)), dtype=np.uint8).reshape(count, frame_bytes)
+
+    df = np.minimum(frames[:, 0] >> 3, 24)
+    clear = _DF_CLEAR_MASK[df]
+    overlaid = _DF_PARITY_MASK[df]
+    extended = _DF_EXTENDED_MASK[df]
+
+    results: List[Optional[Dict[str, Any]]] = [None] * count
+
+    if overlaid.any():
+        # Address/parity: the address is the CRC remainder XOR the parity field
+        rows = np.flatnonzero(overlaid)
+        block = frames[rows]
+        parity = ((block[:, -3].astype(np.int64) << 16) | (block[:, -2].astype(np.int64) << 8) |
+                  block[:, -1].astype(np.int64))
+        addresses = _crc24_rows(block[:, :-3]).astype(np.int64) ^ parity
+        for row, address, row_df in zip(rows.tolist(), addresses.tolist(), df[rows].tolist()):
+            message = messages[row]
+            decoded = {'icao': f"{address:06X}", 'address': address, 'df': row_df,
+                       'raw_message': message, 'message_type': None}
+            _add_surveillance_fields(decoded, message, row_df)
+            results[row] = decoded
+
+    if frame_bytes < 14:
+        for row in np.flatnonzero(clear).tolist():
+            message = messages[row]
+            if extended[row]:
+                # A short extended squitter is malformed; pyModeS decides what to make of it
+                results[row] = decode_adsb_fields(message)
+            else:
+                icao = message[2:8]
+                results[row] = {'icao': icao, 'address': int(icao, 16), 'df': int(df[row]),
+                                'raw_message': message, 'message_type': None}
+        return results
+
+    for row in np.flatnonzero(clear & ~extended).tolist():
+        message = messages[row]
+        icao = message[2:8]
+        results[row] = {'icao': icao, 'address': int(icao, 16), 'df': int(df[row]),
+                        'raw_message': message, 'message_type': None}
+
+    if not extended.any():
+        return results
+
+    # 56-bit ME field of extended squitters
+    rows = np.flatnonzero(extended)
+    block = frames[rows]
+    me = np.zeros(len(rows), dtype=np.uint64)
+    for column in range(4, 11):
+        me = (me << np.uint64(8)) | block[:, column].astype(np.uint64)
+    typecode = (block[:, 4] >> 3).astype(np.int64)
+    df_by_row = dict(zip(rows.tolist(), df[rows].tolist()))
+
+    def bits(shift: int, mask: int):
+        return ((me >> np.uint64(shift)) & np.uint64(mask)).astype(np.int64)
+
+    def fields(row: int, tc: int) -> Dict[str, Any]:
+        message = messages[row]
+        icao = message[2:8]
+        return {'icao': icao, 'address': int(icao, 16), 'df': df_by_row[row],
+                'raw_message': message, 'message_type': tc}
+
+    # Identification: eight 6-bit characters, looked up for the whole block at once
+    ident = (typecode >= 1) & (typecode <= 4)
+    if ident.any():
+        codes = np.stack([bits(42 - 6 * i, 0x3F)[ident] for i in range(8)], axis=1)
+        text = _CALLSIGN_CHARS_ARRAY[codes].tobytes().decode('ascii')
+        for i, (row, tc) in enumerate(zip(rows[ident].tolist(), typecode[ident].tolist())):
+            decoded = fields(row, tc)
+            callsign = text[i * 8:i * 8 + 8].replace("#", "")
+            if callsign:
+                decoded['callsign'] = callsign.strip('_ ')
+            results[row] = decoded
+
+    # Raw CPR coordinates of position messages, resolved by the caller
+    cpr_odd = bits(34, 1).tolist()
+    cpr_lat = bits(17, 0x1FFFF).tolist()
+    cpr_lon = bits(0, 0x1FFFF).tolist()
+
+    def position_fields(i: int, row: int, tc: int) -> Dict[str, Any]:
+        decoded = fields(row, tc)
+        decoded['position_pending'] = True
+        decoded['cpr_odd'] = cpr_odd[i]
+        decoded['cpr_lat'] = cpr_lat[i]
+        decoded['cpr_lon'] = cpr_lon[i]
+        return decoded
+
+    # Surface position
+    surface = (typecode >= 5) & (typecode <= 8)
+    for i, row, tc, surface_me in zip(np.flatnonzero(surface).tolist(), rows[surface].tolist(),
+                                      typecode[surface].tolist(), me[surface].tolist()):
+        decoded = position_fields(i, row, tc)
+        _add_surface_movement(decoded, surface_me)
+        results[row] = decoded
+
+    # Airborne position with barometric altitude
+    airborne = (typecode >= 9) & (typecode <= 18)
+    if airborne.any():
+        alt12 = bits(36, 0xFFF)[airborne]
+        altitude = (((alt12 >> 5) << 4) | (alt12 & 0xF)) * 25 - 1000
+        for i, row, tc, code, alt in zip(np.flatnonzero(airborne).tolist(), rows[airborne].tolist(),
+                                         typecode[airborne].tolist(), alt12.tolist(), altitude.tolist()):
+            if code and not code & 0x10:
+                # Gillham (100 ft) altitude, rare enough to leave to pyModeS
+                results[row] = decode_adsb_fields(messages[row])
+                continue
+            decoded = position_fields(i, row, tc)
+            if code:
+                decoded['altitude'] = alt
+            results[row] = decoded
+
+    # Airborne velocity, ground speed subtypes
+    velocity = typecode == 19
+    if velocity.any():
+        subtype = bits(48, 0x7)[velocity]
+        v_ew = bits(32, 0x3FF)[velocity]
+        v_ns = bits(21, 0x3FF)[velocity]
+        vr = bits(10, 0x1FF)[velocity]
+        scale = np.where(subtype == 2, 4, 1)
+        east = np.where(bits(42, 1)[velocity] == 1, -1, 1) * (v_ew - 1) * scale
+        north = np.where(bits(31, 1)[velocity] == 1, -1, 1) * (v_ns - 1) * scale
+        speed = np.floor(np.sqrt(east * east + north * north)).astype(np.int64)
+        track = np.degrees(np.arctan2(east, north))
+        track = np.where(track >= 0, track, track + 360).astype(np.int64)
+        vertical_rate = np.where(bits(19, 1)[velocity] == 1, -1, 1) * (vr - 1) * 64
+
+        for row, st, ew, ns, spd, trk, vr_code, rate in zip(
+                rows[velocity].tolist(), subtype.tolist(), v_ew.tolist(), v_ns.tolist(),
+                speed.tolist(), track.tolist(), vr.tolist(), vertical_rate.tolist()):
+            if st != 1 and st != 2:
+                # Airspeed/heading velocity
+                results[row] = decode_adsb_fields(messages[row])
+                continue
+            decoded = fields(row, 19)
+            if ew and ns:
+                decoded['speed'] = spd
+                decoded['track'] = trk
+            if vr_code:
+                decoded['vertical_rate'] = rate
+            results[row] = decoded
+
+    # Everything else (TC 0, GNSS altitude positions, status, ...) carries only its typecode,
+    # apart from emergency status
+    other = ~(ident | surface | airborne | velocity)
+    for row, tc, other_me in zip(rows[other].tolist(), typecode[other].tolist(), me[other].tolist()):
+        decoded = fields(row, tc)
+        if tc == 28:
+            _add_emergency_status(decoded, other_me)
+        results[row] = decoded
+
+    return results
@@ -0,0 +1,86 @@
+"""
+Emergency classification and priority alerts for Ursine Capture.
+
+An aircraft is in an emergency when it squawks 7500/7600/7700, reports an
+emergency state in an ADS-B emergency/priority status message (TC 28), or
+a BaseStation feed raises its emergency flag. Emergencies are alerted on a
+priority lane that skips the normal alert throttling.
+"""
+
+from dataclasses import dataclass
+from typing import Optional
+
+
+GENERAL = 'emergency'
+MEDICAL = 'medical'
+MINIMUM_FUEL = 'minimum_fuel'
+RADIO_FAILURE = 'radio_failure'
+HIJACK = 'hijack'
+DOWNED = 'downed'
+
+# Emergency squawk codes
+SQUAWK_EMERGENCIES = {
+    '7500': HIJACK,
+    '7600': RADIO_FAILURE,
+    '7700': GENERAL
+}
+
+# TC 28 subtype 1 emergency state values (7 is reserved)
+STATE_EMERGENCIES = {
+    1: GENERAL,
+    2: MEDICAL,
+    3: MINIMUM_FUEL,
+    4: RADIO_FAILURE,
+    5: HIJACK,
+    6: DOWNED
+}
+
+# Text used in alert messages
+_ALERT_LABELS = {
+    GENERAL: "EMERGENCY",
+    MEDICAL: "MEDICAL",
+    MINIMUM_FUEL: "MIN FUEL",
+    RADIO_FAILURE: "NORDO",
+    HIJACK: "HIJACK",
+    DOWNED: "DOWNED"
+}
+
+
+def identity_code(code: int) -> str:
+    """Convert a 13-bit Mode A identity field (C1 A1 C2 A2 C4 A4 X B1 D1 B2 D2 B4 D4) to a squawk."""
+    def digit(shift4: int, shift2: int, shift1: int) -> int:
+        return ((code >> shift4) & 1) << 2 | ((code >> shift2) & 1) << 1 | (code >> shift1) & 1
+
+    return f"{digit(7, 9, 11)}{digit(1, 3, 5)}{digit(8, 10, 12)}{digit(0, 2, 4)}"
+
+
+def classify_emergency(squawk: Optional[str], emergency_state: int = 0) -> Optional[str]:
+    """Get the emergency an aircraft declares, the most specific source winning."""
+    from_state = STATE_EMERGENCIES.get(emergency_state)
+    if from_state is not None and from_state != GENERAL:
+        return from_state
+    return SQUAWK_EMERGENCIES.get(squawk) or from_state
+
+
+@dataclass
+class EmergencyAlert:
+    """An aircraft declaring an emergency, sent ahead of other alerts."""
+    address: int
+    icao: str
+    emergency: str
+    squawk: Optional[str]
+    timestamp: float
+
+    # Skips alert throttling and jumps the alert queue
+    priority = True
+
+    @property
+    def alert_key(self) -> str:
+        """Key for de-duplicating queued alerts."""
+        return f"{self.icao}:{self.emergency}"
+
+    @property
+    def alert_type(self) -> str:
+        """Alert heading, e.g. "HIJACK 7500"."""
+        label = _ALERT_LABELS.get(self.emergency, self.emergency.upper())
+        return f"{label} {self.squawk}" if self.squawk in SQUAWK_EMERGENCIES else label
@@ -0,0 +1,311 @@
+"""
+Geofence zones with entry, exit and dwell alerts.
+
+Zones (polygons or circles) are rasterized once into a lat/lon grid: each
+cell lists the zones that cover it entirely and the zones whose edge runs
+through it. An aircraft's zone membership is only re-evaluated when it
+moves into another cell, or while it sits in a cell that needs an exact
+test (a zone edge or an altitude limit), so the per-update cost does not
+grow with the number of zones.
+
+Polygon edges are straight lines in lat/lon and must not cross the
+antimeridian.
+"""
+
+import logging
+import math
+from dataclasses import dataclass, field
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+from config import GeofenceZone
+from utils import calculate_distance
+
+
+logger = logging.getLogger(__name__)
+
+
+ENTRY = 'entry'
+EXIT = 'exit'
+DWELL = 'dwell'
+
+# Grid cell size in degrees (about 5.5 km of latitude)
+CELL_DEGREES = 0.05
+
+# Slack for treating a cell as clear of a circle's edge (km)
+_CIRCLE_MARGIN_KM = 0.5
+
+_OUTSIDE, _INSIDE, _BOUNDARY = 0, 1, 2
+
+Cell = Tuple[int, int]
+
+
+@dataclass
+class GeofenceEvent:
+    """An aircraft entering, leaving or dwelling in a zone."""
+    address: int
+    icao: str
+    zone: str
+    event: str
+    timestamp: float
+
+    # Zone alerts go through normal throttling
+    priority = False
+
+    @property
+    def alert_key(self) -> str:
+        """Key for de-duplicating and throttling this kind of alert."""
+        return f"{self.icao}:{self.zone}:{self.event}"
+
+    @property
+    def alert_type(self) -> str:
+        """Alert heading, e.g. "ENTRY approach"."""
+        return f"{self.event.upper()} {self.zone}"
+
+
+class _Zone:
+    """A zone compiled for point and cell tests."""
+
+    def __init__(self, config: GeofenceZone):
+        self.config = config
+        self.name = config.name
+        self.triggers = frozenset(config.alert_on)
+        self.dwell_seconds = config.dwell_seconds
+        self.min_altitude = config.min_altitude
+        self.max_altitude = config.max_altitude
+        self.has_altitude_limits = config.min_altitude is not None or config.max_altitude is not None
+
+        if config.radius_km:
+            self.center = (config.center_lat, config.center_lon)
+            self.radius_km = config.radius_km
+            self.polygon = None
+            lat_span = config.radius_km / 111.195
+            lon_span = lat_span / max(math.cos(math.radians(min(abs(config.center_lat) + lat_span, 89.9))), 1e-6)
+            self.bbox = (config.center_lat - lat_span, config.center_lon - lon_span,
+                         config.center_lat + lat_span, config.center_lon + lon_span)
+        else:
+            self.polygon = [(float(lat), float(lon)) for lat, lon in config.points]
+            lats = [lat for lat, _ in self.polygon]
+            lons = [lon for _, lon in self.polygon]
+            self.bbox = (min(lats), min(lons), max(lats), max(lons))
+
+    def altitude_ok(self, altitude: Optional[int]) -> bool:
+        """Check the zone's vertical limits; unknown altitude fails a limited zone."""
+        if not self.has_altitude_limits:
+            return True
+        if altitude is None:
+            return False
+        if self.min_altitude is not None and altitude < self.min_altitude:
+            return False
+        return self.max_altitude is None or altitude <= self.max_altitude
+
+    def contains(self, lat: float, lon: float) -> bool:
+        """Exact point-in-zone test."""
+        if self.polygon is None:
+            return calculate_distance(self.center[0], self.center[1], lat, lon) <= self.radius_km
+        return _point_in_polygon(self.polygon, lat, lon)
+
+    def classify(self, south: float, west: float, north: float, east: float) -> int:
+        """Tell whether a cell lies inside, outside or across the zone's edge."""
+        if self.polygon is None:
+            lat, lon = self.center
+            nearest = calculate_distance(lat, lon, min(max(lat, south), north), min(max(lon, west), east))
+            if nearest > self.radius_km + _CIRCLE_MARGIN_KM:
+                return _OUTSIDE
+            farthest = max(calculate_distance(lat, lon, corner_lat, corner_lon)
+                           for corner_lat in (south, north) for corner_lon in (west, east))
+            return _INSIDE if farthest <= self.radius_km - _CIRCLE_MARGIN_KM else _BOUNDARY
+
+        polygon = self.polygon
+        for i in range(len(polygon)):
+            if _segment_hits_box(polygon[i - 1], polygon[i], south, west, north, east):
+                return _BOUNDARY
+        # No edge crosses the cell, so it is wholly inside or wholly outside
+        return _INSIDE if _point_in_polygon(polygon, (south + north) / 2, (west + east) / 2) else _OUTSIDE
+
+
+def _point_in_polygon(polygon: Sequence[Tuple[float, float]], lat: float, lon: float) -> bool:
+    """Ray-casting test with lon as x and lat as y."""
+    inside = False
+    lat_j, lon_j = polygon[-1]
+    for lat_i, lon_i in polygon:
+        if (lat_i > lat) != (lat_j > lat):
+            crossing = lon_i + (lat - lat_i) * (lon_j - lon_i) / (lat_j - lat_i)
+            if lon < crossing:
+                inside = not inside
+        lat_j, lon_j = lat_i, lon_i
+    return inside
+
+
+def _segment_hits_box(a: Tuple[float, float], b: Tuple[float, float],
+                      south: float, west: float, north: float, east: float) -> bool:
+    """Check whether segment a-b touches a box (Liang-Barsky clipping)."""
+    t0, t1 = 0.0, 1.0
+    dlat = b[0] - a[0]
+    dlon = b[1] - a[1]
+    for p, q in ((-dlon, a[1] - west), (dlon, east - a[1]), (-dlat, a[0] - south), (dlat, north - a[0])):
+        if p == 0:
+            if q < 0:
+                return False
+            continue
+        t = q / p
+        if p < 0:
+            if t > t1:
+                return False
+            t0 = max(t0, t)
+        else:
+            if t < t0:
+                return False
+            t1 = min(t1, t)
+    return True
+
+
+@dataclass(slots=True)
+class _AircraftState:
+    """An aircraft's cell and the zones it is in."""
+    cell: Optional[Cell]  # None until the next update evaluates it
+    inside: Dict[int, float] = field(default_factory=dict)  # zone index -> entry time
+    dwelled: set = field(default_factory=set)  # zones whose dwell alert already fired
+    last_update: float = 0.0
+
+
+class GeofenceEngine:
+    """Tracks aircraft against configured zones and reports transitions."""
+
+    def __init__(self, zones: Sequence[GeofenceZone] = (), cell_degrees: float = CELL_DEGREES):
+        self.cell_degrees = cell_degrees
+        self.zones: List[_Zone] = []
+        for config in zones:
+            try:
+                self.zones.append(_Zone(config))
+            except Exception as e:
+                logger.error(f"Invalid geofence zone {config.name}: {e}")
+
+        # cell -> ((zone index, needs exact test), ...) and whether membership can
+        # change without leaving the cell
+        self.grid: Dict[Cell, Tuple[Tuple[Tuple[int, bool], ...], bool]] = {}
+        self._build_grid()
+
+        self.states: Dict[int, _AircraftState] = {}
+
+        # Statistics
+        self.evaluations = 0
+        self.events = 0
+
+    def __len__(self) -> int:
+        return len(self.zones)
+
+    def update(self, address: int, icao: str, lat: float, lon: float,
+               altitude: Optional[int], now: float) -> List[GeofenceEvent]:
+        """Feed an aircraft position and return the zone events it caused."""
+        cell = (int(math.floor(lat / self.cell_degrees)), int(math.floor(lon / self.cell_degrees)))
+        state = self.states.get(address)
+        entry = self.grid.get(cell)
+
+        if state is None:
+            if entry is None:
+                # Nowhere near a zone and not in one: nothing to remember
+                return []
+            state = self.states[address] = _AircraftState(cell)
+        elif state.cell == cell and (entry is None or not entry[1]):
+            # Same cell and no edge or altitude limit here: membership is unchanged
+            state.last_update = now
+            return self._check_dwell(state, address, icao, now) if state.inside else []
+
+        state.cell = cell
+        state.last_update = now
+        self.evaluations += 1
+
+        current = set()
+        for index, exact in (entry[0] if entry else ()):
+            zone = self.zones[index]
+            if zone.altitude_ok(altitude) and (not exact or zone.contains(lat, lon)):
+                current.add(index)
+
+        events = []
+        for index in [index for index in state.inside if index not in current]:
+            del state.inside[index]
+            state.dwelled.discard(index)
+            if EXIT in self.zones[index].triggers:
+                events.append(GeofenceEvent(address, icao, self.zones[index].name, EXIT, now))
+        for index in current:
+            if index not in state.inside:
+                state.inside[index] = now
+                if ENTRY in self.zones[index].triggers:
+                    events.append(GeofenceEvent(address, icao, self.zones[index].name, ENTRY, now))
+
+        self.events += len(events)
+        if state.inside:
+            events.extend(self._check_dwell(state, address, icao, now))
+        elif entry is None:
+            del self.states[address]
+        return events
+
+    def inherit(self, previous: "GeofenceEngine") -> None:
+        """Carry over which aircraft are inside (and have dwelled in) zones that did not change."""
+        previous_index = {zone.name: index for index, zone in enumerate(previous.zones)}
+        mapping = {}
+        for index, zone in enumerate(self.zones):
+            old = previous_index.get(zone.name)
+            if old is not None and previous.zones[old].config == zone.config:
+                mapping[old] = index
+
+        for address, state in previous.states.items():
+            inside = {mapping[index]: entered for index, entered in state.inside.items() if index in mapping}
+            if inside:
+                # Re-evaluated on the next update, which may find zones that are new
+                self.states[address] = _AircraftState(
+                    None, inside, {mapping[index] for index in state.dwelled if index in mapping},
+                    state.last_update)
+
+    def forget(self, address: int) -> None:
+        """Drop an aircraft without reporting exits."""
+        self.states.pop(address, None)
+
+    def prune(self, max_age: float, now: float) -> int:
+        """Drop aircraft not updated within max_age seconds."""
+        stale = [address for address, state in self.states.items() if now - state.last_update > max_age]
+        for address in stale:
+            del self.states[address]
+        return len(stale)
+
+    def get_statistics(self) -> Dict[str, Any]:
+        """Get geofence statistics."""
+        return {
+            "zones": len(self.zones),
+            "grid_cells": len(self.grid),
+            "tracked_aircraft": len(self.states),
+            "aircraft_in_zones": sum(1 for state in self.states.values() if state.inside),
+            "evaluations": self.evaluations,
+            "events": self.events
+        }
+
+    def _check_dwell(self, state: _AircraftState, address: int, icao: str, now: float) -> List[GeofenceEvent]:
+        """Report zones the aircraft has now been inside for their dwell time."""
+        events = []
+        for index, entered in state.inside.items():
+            zone = self.zones[index]
+            if DWELL in zone.triggers and index not in state.dwelled and now - entered >= zone.dwell_seconds:
+                state.dwelled.add(index)
+                events.append(GeofenceEvent(address, icao, zone.name, DWELL, now))
+        self.events += len(events)
+        return events
+
+    def _build_grid(self) -> None:
+        """Rasterize every zone into the cells its bounding box covers."""
+        size = self.cell_degrees
+        cells: Dict[Cell, List[Tuple[int, bool]]] = {}
+        for index, zone in enumerate(self.zones):
+            south, west, north, east = zone.bbox
+            for row in range(int(math.floor(south / size)), int(math.floor(north / size)) + 1):
+                for column in range(int(math.floor(west / size)), int(math.floor(east / size)) + 1):
+                    kind = zone.classify(row * size, column * size, (row + 1) * size, (column + 1) * size)
+                    if kind != _OUTSIDE:
+                        cells.setdefault((row, column), []).append((index, kind == _BOUNDARY))
+
+        self.grid = {
+            cell: (tuple(entries),
+                   any(exact or self.zones[index].has_altitude_limits for index, exact in entries))
+            for cell, entries in cells.items()
+        }
+        if self.zones:
+            logger.info(f"Geofences: {len(self.zones)} zones over {len(self.grid)} grid cells")
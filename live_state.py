@@ -0,0 +1,192 @@
+"""
+Shared-memory live state channel from the receiver to the dashboard.
+
+The receiver publishes its aircraft and status documents into a
+memory-mapped file guarded by a sequence counter (a seqlock): the counter is
+odd while a write is in progress and even once it completes. The dashboard
+checks the counter on every poll and only copies and parses the payload
+when it has changed, instead of re-reading aircraft.json and status.json.
+
+Layout (little endian):
+
+    magic[4] | layout version u32 | sequence u64 | updated_at f64 | length u32 | pad | payload
+"""
+
+import json
+import logging
+import mmap
+import os
+import struct
+import time
+from typing import Any, Dict, Optional
+
+
+logger = logging.getLogger(__name__)
+
+
+MAGIC = b'URSL'
+LAYOUT_VERSION = 1
+
+_HEADER = struct.Struct('<4sIQdI')
+HEADER_SIZE = 32
+SEQUENCE_OFFSET = 8
+UPDATED_AT_OFFSET = 16
+LENGTH_OFFSET = 24
+
+INITIAL_CAPACITY = 256 * 1024
+
+
+class LiveStateWriter:
+    """Publishes receiver state into the shared memory-mapped file."""
+
+    def __init__(self, path: str, capacity: int = INITIAL_CAPACITY):
+        self.path = path
+        self.sequence = 0
+        self.publish_count = 0
+
+        # Create a fresh file and swap it in, so readers still mapping a
+        # previous receiver's file never see it truncated underneath them
+        temp_path = f"{path}.{os.getpid()}.tmp"
+        fd = os.open(temp_path, os.O_RDWR | os.O_CREAT | os.O_TRUNC, 0o644)
+        try:
+            os.ftruncate(fd, HEADER_SIZE + capacity)
+            self.mm = mmap.mmap(fd, HEADER_SIZE + capacity)
+        finally:
+            os.close(fd)
+        _HEADER.pack_into(self.mm, 0, MAGIC, LAYOUT_VERSION, 0, 0.0, 0)
+        os.replace(temp_path, path)
+
+    def publish(self, payload: bytes) -> None:
+        """Publish a new payload and advance the sequence counter."""
+        needed = HEADER_SIZE + len(payload)
+        if needed > len(self.mm):
+            self._grow(needed)
+
+        mm = self.mm
+        sequence = self.sequence + 1
+        struct.pack_into('<Q', mm, SEQUENCE_OFFSET, sequence)  # odd: write in progress
+
+        mm[HEADER_SIZE:needed] = payload
+        struct.pack_into('<d', mm, UPDATED_AT_OFFSET, time.time())
+        struct.pack_into('<I', mm, LENGTH_OFFSET, len(payload))
+
+        self.sequence = sequence + 1
+        struct.pack_into('<Q', mm, SEQUENCE_OFFSET, self.sequence)  # even: complete
+        self.publish_count += 1
+
+    def publish_json(self, payload_json: str) -> None:
+        """Publish an already serialized JSON document."""
+        self.publish(payload_json.encode('utf-8'))
+
+    def _grow(self, needed: int) -> None:
+        """Enlarge the mapping; the file only ever grows while readers have it mapped."""
+        size = len(self.mm)
+        while size < needed:
+            size *= 2
+        with open(self.path, 'r+b') as f:
+            f.truncate(size)
+        self.mm.resize(size)
+        logger.debug(f"Live state area grown to {size} bytes")
+
+    def close(self) -> None:
+        """Unmap the live state file."""
+        try:
+            self.mm.close()
+        except Exception:
+            pass
+
+
+class LiveStateReader:
+    """Polls the shared live state, copying and parsing only when it changed."""
+
+    def __init__(self, path: str):
+        self.path = path
+        self.mm: Optional[mmap.mmap] = None
+        self.inode = None
+        self.last_sequence = None
+        self.updated_at = 0.0
+
+    def poll(self) -> Optional[Dict[str, Any]]:
+        """Get the latest payload if it changed since the last poll, else None."""
+        try:
+            if not self._ensure_mapped():
+                return None
+
+            mm = self.mm
+            sequence = struct.unpack_from('<Q', mm, SEQUENCE_OFFSET)[0]
+            if sequence == self.last_sequence or sequence & 1:
+                return None
+
+            length = struct.unpack_from('<I', mm, LENGTH_OFFSET)[0]
+            if HEADER_SIZE + length > len(mm):
+                # Writer grew the file since we mapped it
+                self._remap()
+                mm = self.mm
+                if mm is None or HEADER_SIZE + length > len(mm):
+                    return None
+
+            updated_at = struct.unpack_from('<d', mm, UPDATED_AT_OFFSET)[0]
+            payload = mm[HEADER_SIZE:HEADER_SIZE + length]
+            if struct.unpack_from('<Q', mm, SEQUENCE_OFFSET)[0] != sequence:
+                return None  # Torn read, try again next poll
+
+            try:
+                state = json.loads(payload)
+            except ValueError:
+                return None  # Treat as torn
+
+            self.last_sequence = sequence
+            self.updated_at = updated_at
+            return state
+
+        except Exception as e:
+            logger.debug(f"Error reading live state: {e}")
+            self.close()
+            return None
+
+    def age(self) -> float:
+        """Get seconds since the receiver last published (inf if never)."""
+        if not self.updated_at:
+            return float('inf')
+        return time.time() - self.updated_at
+
+    def _ensure_mapped(self) -> bool:
+        """Map the file, remapping if the receiver replaced it."""
+        try:
+            inode = os.stat(self.path).st_ino
+        except OSError:
+            self.close()
+            return False
+
+        if self.mm is None or inode != self.inode:
+            self._remap()
+        return self.mm is not None
+
+    def _remap(self) -> None:
+        """(Re)open and map the live state file read-only."""
+        self.close()
+        try:
+            with open(self.path, 'rb') as f:
+                inode = os.fstat(f.fileno()).st_ino
+                mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        except (OSError, ValueError):
+            return
+
+        magic, layout_version = struct.unpack_from('<4sI', mm, 0)
+        if magic != MAGIC or layout_version != LAYOUT_VERSION:
+            mm.close()
+            return
+
+        self.mm = mm
+        self.inode = inode
+        self.last_sequence = None
+
+    def close(self) -> None:
+        """Unmap the live state file."""
+        if self.mm is not None:
+            try:
+                self.mm.close()
+            except Exception:
+                pass
+        self.mm = None
+        self.inode = None
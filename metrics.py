@@ -0,0 +1,95 @@
+"""
+Lightweight runtime metrics for the Ursine Capture receiver.
+"""
+
+import threading
+import time
+from typing import Callable, Dict, Tuple
+
+
+# Rate windows reported by RateMeter.get_rates(), in seconds
+RATE_WINDOWS: Tuple[Tuple[str, int], ...] = (
+    ("current", 5),
+    ("1min", 60),
+    ("5min", 300),
+    ("15min", 900),
+)
+
+
+class RateMeter:
+    """Constant-time event rate meter backed by a ring of per-second buckets.
+
+    Each window keeps a running sum that is adjusted as seconds roll out of
+    it, so marking an event and reading a rate never scan the buckets.
+    """
+
+    def __init__(self, windows: Tuple[Tuple[str, int], ...] = RATE_WINDOWS,
+                 clock: Callable[[], float] = time.monotonic):
+        self.windows = windows
+        self.horizon = max(seconds for _, seconds in windows)
+        self.total = 0
+
+        self._clock = clock
+        self._buckets = [0] * self.horizon
+        self._sums = [0] * len(windows)
+        self._spans = [seconds for _, seconds in windows]
+        self._second = int(clock())
+        self._start_second = self._second
+        self._lock = threading.Lock()
+
+    def mark(self, count: int = 1) -> None:
+        """Record count events at the current time."""
+        now = int(self._clock())
+        with self._lock:
+            if now != self._second:
+                self._advance(now)
+            self._buckets[now % self.horizon] += count
+            sums = self._sums
+            for i in range(len(sums)):
+                sums[i] += count
+            self.total += count
+
+    def _advance(self, now: int) -> None:
+        """Roll the ring forward to the given second."""
+        horizon = self.horizon
+        if now - self._second >= horizon:
+            self._buckets = [0] * horizon
+            self._sums = [0] * len(self._sums)
+        else:
+            buckets = self._buckets
+            sums = self._sums
+            spans = self._spans
+            for second in range(self._second + 1, now + 1):
+                # Drop the second that just left each window
+                for i, span in enumerate(spans):
+                    sums[i] -= buckets[(second - span) % horizon]
+                buckets[second % horizon] = 0
+        self._second = now
+
+    def rate(self, seconds: int) -> float:
+        """Get average events per second over one of the configured windows."""
+        now = int(self._clock())
+        with self._lock:
+            if now != self._second:
+                self._advance(now)
+            window_sum = self._sums[self._spans.index(seconds)]
+            completed = now - self._start_second
+            if completed == 0:
+                return float(window_sum)
+            # Report over completed seconds only, and don't dilute the
+            # rate before the window has filled up
+            in_progress = self._buckets[now % self.horizon]
+            return (window_sum - in_progress) / min(seconds - 1, completed)
+
+    def get_rates(self) -> Dict[str, float]:
+        """Get rounded rates for all configured windows."""
+        return {name: round(self.rate(seconds), 1) for name, seconds in self.windows}
+
+    def reset(self) -> None:
+        """Clear all counts."""
+        with self._lock:
+            self.total = 0
+            self._buckets = [0] * self.horizon
+            self._sums = [0] * len(self._sums)
+            self._second = int(self._clock())
+            self._start_second = self._second
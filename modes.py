@@ -0,0 +1,185 @@
+"""
+Mode S / ADS-B frame helpers: CRC-24 parity and DF17 message encoding.
+
+Used by the traffic generator to build frames that real decoders accept
+(pyModeS, dump1090), and by the receiver for parity checks.
+"""
+
+import math
+from bisect import bisect_left
+from typing import Dict, List, Optional, Tuple
+
+
+# CRC-24 generator polynomial for Mode S parity
+CRC24_POLY = 0xFFF409
+
+# ADS-B identification character set (6 bits per character)
+CALLSIGN_CHARSET = "#ABCDEFGHIJKLMNOPQRSTUVWXYZ##### ###############0123456789######"
+
+CPR_BITS = 17
+_CPR_SCALE = 1 << CPR_BITS
+
+# Number of CPR latitude zones between the equator and a pole
+CPR_NZ = 15
+
+
+def _build_crc_table() -> Tuple[int, ...]:
+    """Build the byte-wise CRC-24 lookup table."""
+    table = []
+    for byte in range(256):
+        crc = byte << 16
+        for _ in range(8):
+            crc <<= 1
+            if crc & 0x1000000:
+                crc ^= 0x1000000 | CRC24_POLY
+        table.append(crc & 0xFFFFFF)
+    return tuple(table)
+
+
+CRC24_TABLE = _build_crc_table()
+
+
+def crc24(data: bytes) -> int:
+    """Compute the Mode S CRC-24 remainder of a byte string."""
+    crc = 0
+    table = CRC24_TABLE
+    for byte in data:
+        crc = ((crc << 8) & 0xFFFFFF) ^ table[(crc >> 16) ^ byte]
+    return crc
+
+
+def _build_nl_table() -> List[float]:
+    """Latitudes at which the number of longitude zones drops, ascending."""
+    a = 1 - math.cos(math.pi / (2 * CPR_NZ))
+    return [math.degrees(math.acos(math.sqrt(a / (1 - math.cos(2 * math.pi / nl)))))
+            for nl in range(59, 1, -1)]
+
+
+_NL_TABLE = _build_nl_table()
+
+
+def cpr_nl(lat: float) -> int:
+    """Get the number of CPR longitude zones at a latitude (table lookup)."""
+    return 59 - bisect_left(_NL_TABLE, abs(lat))
+
+
+def cpr_encode(lat: float, lon: float, odd: bool) -> Tuple[int, int]:
+    """Encode an airborne position as 17-bit even or odd CPR coordinates."""
+    i = 1 if odd else 0
+    dlat = 360.0 / (60 - i)
+    yz = math.floor(_CPR_SCALE * ((lat % dlat) / dlat) + 0.5)
+    rlat = dlat * (yz / _CPR_SCALE + math.floor(lat / dlat))
+
+    dlon = 360.0 / max(cpr_nl(rlat) - i, 1)
+    xz = math.floor(_CPR_SCALE * ((lon % dlon) / dlon) + 0.5)
+    return yz % _CPR_SCALE, xz % _CPR_SCALE
+
+
+def encode_altitude(altitude: int) -> int:
+    """Encode a barometric altitude in feet as a 12-bit field with 25 ft (Q bit) resolution."""
+    n = max(0, min(0x7FF, (altitude + 1000) // 25))
+    return ((n >> 4) << 5) | 0x10 | (n & 0xF)
+
+
+def df17(icao: int, me: int) -> bytes:
+    """Build a 14-byte DF17 extended squitter with correct parity."""
+    body = bytes([0x8D]) + icao.to_bytes(3, 'big') + me.to_bytes(7, 'big')
+    return body + crc24(body).to_bytes(3, 'big')
+
+
+def encode_identification(icao: int, callsign: str, category: int = 0) -> bytes:
+    """Encode a TC 4 aircraft identification message."""
+    me = (4 << 51) | ((category & 0x7) << 48)
+    callsign = callsign.upper().ljust(8)[:8]
+    for position, char in enumerate(callsign):
+        index = CALLSIGN_CHARSET.find(char)
+        code = index if index > 0 else 32  # unknown characters become spaces
+        me |= code << (42 - 6 * position)
+    return df17(icao, me)
+
+
+def encode_airborne_position(icao: int, lat: float, lon: float, altitude: int, odd: bool) -> bytes:
+    """Encode a TC 11 airborne position message (barometric altitude)."""
+    lat_cpr, lon_cpr = cpr_encode(lat, lon, odd)
+    me = (11 << 51) | (encode_altitude(altitude) << 36) | ((1 if odd else 0) << 34)
+    me |= (lat_cpr << 17) | lon_cpr
+    return df17(icao, me)
+
+
+def encode_velocity(icao: int, speed: float, track: float, vertical_rate: int) -> bytes:
+    """Encode a TC 19 subtype 1 (ground speed) velocity message."""
+    east = speed * math.sin(math.radians(track))
+    north = speed * math.cos(math.radians(track))
+    v_ew = min(1022, int(round(abs(east)))) + 1
+    v_ns = min(1022, int(round(abs(north)))) + 1
+    v_rate = min(510, int(round(abs(vertical_rate) / 64))) + 1
+
+    me = (19 << 51) | (1 << 48)
+    me |= (1 if east < 0 else 0) << 42 | v_ew << 32
+    me |= (1 if north < 0 else 0) << 31 | v_ns << 21
+    me |= (1 if vertical_rate < 0 else 0) << 19 | v_rate << 10
+    return df17(icao, me)
+
+
+# Outcomes of a parity check
+CRC_OK = 0
+CRC_CORRECTED = 1
+CRC_FAILED = 2
+CRC_UNCHECKED = 3  # address/parity formats, checkable only against known aircraft
+
+# Bits before this index hold the downlink format and are never "corrected"
+_MIN_CORRECTABLE_BIT = 5
+
+
+def _build_syndrome_table(frame_bits: int) -> Dict[int, int]:
+    """Map the CRC syndrome of every single-bit error to its bit index."""
+    frame_bytes = frame_bits // 8
+    table = {}
+    for bit in range(frame_bits):
+        error = bytearray(frame_bytes)
+        error[bit // 8] = 0x80 >> (bit % 8)
+        syndrome = crc24(bytes(error[:-3])) ^ int.from_bytes(error[-3:], 'big')
+        table[syndrome] = bit
+    return table
+
+
+SYNDROMES_LONG = _build_syndrome_table(112)
+
+
+def parity_remainder(frame: bytes) -> int:
+    """Get CRC remainder XOR the transmitted parity (0 for an intact DF17)."""
+    return crc24(frame[:-3]) ^ int.from_bytes(frame[-3:], 'big')
+
+
+def correct_single_bit(frame: bytes, remainder: int) -> Optional[bytes]:
+    """Repair a 112-bit frame whose remainder matches a single-bit error."""
+    bit = SYNDROMES_LONG.get(remainder)
+    if bit is None or bit < _MIN_CORRECTABLE_BIT or len(frame) != 14:
+        return None
+    fixed = bytearray(frame)
+    fixed[bit // 8] ^= 0x80 >> (bit % 8)
+    return bytes(fixed)
+
+
+def check_frame(frame: bytes, fix_single_bit: bool = True) -> Tuple[Optional[bytes], int]:
+    """Check a frame's parity, returning the (possibly corrected) frame and outcome."""
+    df = frame[0] >> 3
+    if df in (17, 18):
+        if len(frame) != 14:
+            return None, CRC_FAILED
+        remainder = parity_remainder(frame)
+        if remainder == 0:
+            return frame, CRC_OK
+        if fix_single_bit:
+            fixed = correct_single_bit(frame, remainder)
+            if fixed is not None:
+                return fixed, CRC_CORRECTED
+        return None, CRC_FAILED
+
+    if df == 11:
+        # All-call replies carry the interrogator code in the low 7 bits
+        if parity_remainder(frame) & 0xFFFF80:
+            return None, CRC_FAILED
+        return frame, CRC_OK
+
+    return frame, CRC_UNCHECKED
@@ -0,0 +1,375 @@
+"""
+Multi-stage threaded ingest pipeline for the Ursine Capture receiver.
+
+    socket reader --raw queue--> decode stage --apply queue--> tracker stage
+                                                                    |
+                                                alert queue <-------+
+                                                     |
+                                                alert stage (Meshtastic)
+
+The socket reader only ever does a non-blocking put, so slow decoding,
+tracking or serial writes can never stall reads from dump1090; when the
+raw queue is full the chunk is dropped and counted instead. Emergency
+alerts use a separate priority queue that the alert stage always serves
+first.
+"""
+
+import logging
+import queue
+import time
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass
+from functools import partial
+from threading import Thread, Event
+from typing import Any, Callable, Dict, List, Optional
+
+from decoder import decode_adsb_batch, MESSAGE_RAW
+
+
+logger = logging.getLogger(__name__)
+
+
+# Queue marker telling the decode stage to reset its stream parser
+_RESET = object()
+
+# Longest the alert stage waits on the normal alert queue before checking
+# for priority (emergency) alerts again, in seconds
+PRIORITY_POLL_INTERVAL = 0.1
+
+
+@dataclass
+class StageStats:
+    """Throughput and back-pressure counters for one pipeline stage."""
+    name: str
+    capacity: int
+    processed: int = 0
+    dropped: int = 0
+    high_watermark: int = 0
+    busy_seconds: float = 0.0
+    blocked_seconds: float = 0.0  # time spent waiting on a full downstream queue
+
+    def to_dict(self, depth: int, elapsed: float) -> Dict[str, Any]:
+        """Convert stats to dictionary for JSON serialization."""
+        return {
+            "queue_depth": depth,
+            "queue_capacity": self.capacity,
+            "high_watermark": self.high_watermark,
+            "processed": self.processed,
+            "dropped": self.dropped,
+            "busy_seconds": round(self.busy_seconds, 2),
+            "blocked_seconds": round(self.blocked_seconds, 2),
+            "utilization": round(self.busy_seconds / elapsed * 100, 1) if elapsed > 0 else 0.0
+        }
+
+
+class IngestPipeline:
+    """Reader/decoder/tracker pipeline connected by bounded queues."""
+
+    def __init__(self, receiver, queue_size: int = 2000, decode_processes: int = 0,
+                 alert_queue_size: int = 100):
+        self.receiver = receiver
+        self.decode_processes = decode_processes
+
+        self.raw_queue = queue.Queue(maxsize=queue_size)
+        self.apply_queue = queue.Queue(maxsize=queue_size)
+        self.alert_queue = queue.Queue(maxsize=alert_queue_size)
+        self.priority_queue = queue.Queue()  # emergencies, unbounded and served first
+
+        self.decode_stats = StageStats("decode", queue_size)
+        self.apply_stats = StageStats("apply", queue_size)
+        self.alert_stats = StageStats("alert", alert_queue_size)
+
+        self.executor: Optional[ProcessPoolExecutor] = None
+        self.threads: List[Thread] = []
+        self.stop_event = Event()
+        self.decode_done = Event()  # decode stage drained, tracker stage may finish
+        self.abort_event = Event()  # drain timed out, stages give up on full queues
+        self.cleanup_requested = Event()  # tracker stage runs receiver cleanup when set
+
+        # Work other stages hand back to the tracker stage, e.g. marking aircraft alerted
+        self.apply_callbacks: queue.SimpleQueue = queue.SimpleQueue()
+        self.start_time = time.monotonic()
+
+        # Alert keys with an alert already queued, to avoid duplicate sends
+        self._pending_alerts = set()
+
+    def start(self) -> None:
+        """Start the decode, tracker and alert stage threads."""
+        if self.is_running():
+            return
+
+        self.stop_event.clear()
+        self.decode_done.clear()
+        self.abort_event.clear()
+        self.start_time = time.monotonic()
+
+        if self.decode_processes > 0:
+            try:
+                self.executor = ProcessPoolExecutor(max_workers=self.decode_processes)
+                logger.info(f"Decoding with a pool of {self.decode_processes} processes")
+            except Exception as e:
+                logger.error(f"Failed to create decoder process pool, decoding in thread: {e}")
+                self.executor = None
+
+        self.threads = [
+            Thread(target=self._decode_loop, name="ingest-decode", daemon=True),
+            Thread(target=self._apply_loop, name="ingest-apply", daemon=True),
+            Thread(target=self._alert_loop, name="ingest-alert", daemon=True),
+        ]
+        for thread in self.threads:
+            thread.start()
+
+        logger.info("Ingest pipeline started")
+
+    def stop(self, timeout: float = 5.0) -> None:
+        """Stop all stages, giving them a chance to drain their queues."""
+        if not self.threads:
+            return
+
+        # Drain stage by stage so nothing decoded is lost in between
+        decode_thread, apply_thread, alert_thread = self.threads
+        self.stop_event.set()
+        decode_thread.join(timeout=timeout)
+        self.decode_done.set()
+        apply_thread.join(timeout=timeout)
+        self.abort_event.set()
+        for thread in self.threads:
+            thread.join(timeout=1.0)
+        self.threads = []
+
+        if self.executor:
+            self.executor.shutdown(wait=False, cancel_futures=True)
+            self.executor = None
+
+        logger.info("Ingest pipeline stopped")
+
+    def is_running(self) -> bool:
+        """Check if the pipeline stages are running."""
+        return bool(self.threads) and not self.stop_event.is_set()
+
+    def submit(self, data: bytes) -> bool:
+        """Queue a chunk from the socket reader. Never blocks."""
+        try:
+            self.raw_queue.put_nowait(data)
+        except queue.Full:
+            self.decode_stats.dropped += 1
+            return False
+
+        depth = self.raw_queue.qsize()
+        if depth > self.decode_stats.high_watermark:
+            self.decode_stats.high_watermark = depth
+        return True
+
+    def submit_wait(self, data: bytes) -> bool:
+        """Queue a chunk, waiting for space instead of dropping it (offline replay)."""
+        while not self.stop_event.is_set():
+            try:
+                self.raw_queue.put(data, timeout=0.5)
+                return True
+            except queue.Full:
+                continue
+        return False
+
+    def submit_reset(self, discard: bool = True) -> None:
+        """Discard queued data from the old connection and reset the parser."""
+        if not discard:
+            # Replay: data queued before the reset is still valid, keep it in order
+            self.submit_wait(_RESET)
+            return
+
+        try:
+            while True:
+                self.raw_queue.get_nowait()
+                self.decode_stats.dropped += 1
+        except queue.Empty:
+            pass
+
+        try:
+            self.raw_queue.put(_RESET, timeout=1.0)
+        except queue.Full:
+            logger.warning("Could not queue stream reset, decode stage is stalled")
+
+    def submit_alert(self, aircraft) -> bool:
+        """Queue a watchlist or geofence alert for the alert stage."""
+        icao = aircraft.icao
+        key = aircraft.alert_key
+        if key in self._pending_alerts:
+            return False
+
+        try:
+            self.alert_queue.put_nowait(aircraft)
+        except queue.Full:
+            self.alert_stats.dropped += 1
+            logger.warning(f"Alert queue full, dropping alert for {icao}")
+            return False
+
+        self._pending_alerts.add(key)
+        depth = self.alert_queue.qsize()
+        if depth > self.alert_stats.high_watermark:
+            self.alert_stats.high_watermark = depth
+        return True
+
+    def run_on_apply(self, callback: Callable[[], None]) -> None:
+        """Have the tracker stage run callback before its next update. Safe to call from any thread."""
+        self.apply_callbacks.put(callback)
+
+    def request_cleanup(self) -> None:
+        """Have the tracker stage run receiver cleanup before its next update."""
+        self.cleanup_requested.set()
+
+    def submit_priority_alert(self, alert) -> None:
+        """Queue an alert to be sent before any queued watchlist or geofence alerts."""
+        self.priority_queue.put_nowait(alert)
+
+    def _put(self, target: queue.Queue, item: Any, stats: StageStats) -> bool:
+        """Put to a downstream queue, blocking (with back-pressure accounting) when full."""
+        try:
+            target.put_nowait(item)
+            return True
+        except queue.Full:
+            pass
+
+        blocked_start = time.perf_counter()
+        try:
+            while not self.abort_event.is_set():
+                try:
+                    target.put(item, timeout=0.5)
+                    return True
+                except queue.Full:
+                    continue
+            return False
+        finally:
+            stats.blocked_seconds += time.perf_counter() - blocked_start
+
+    def _decode_loop(self) -> None:
+        """Decode stage: split stream chunks into messages and decode them."""
+        while not (self.stop_event.is_set() and self.raw_queue.empty()):
+            try:
+                item = self.raw_queue.get(timeout=0.5)
+            except queue.Empty:
+                continue
+
+            try:
+                if item is _RESET:
+                    self.receiver.reset_stream_parser()
+                    continue
+
+                start = time.perf_counter()
+                messages = self.receiver.parse_stream_data(item)
+                updates = self._decode_messages(messages)
+                self.decode_stats.busy_seconds += time.perf_counter() - start
+                self.decode_stats.processed += len(messages)
+
+                for update in updates:
+                    if not self._put(self.apply_queue, update, self.decode_stats):
+                        break
+
+                depth = self.apply_queue.qsize()
+                if depth > self.apply_stats.high_watermark:
+                    self.apply_stats.high_watermark = depth
+
+            except Exception as e:
+                logger.error(f"Error in decode stage: {e}")
+
+    def _decode_messages(self, messages: List[tuple]) -> List[Dict[str, Any]]:
+        """Decode parsed messages, spreading raw frame batches over the process pool if enabled."""
+        receiver = self.receiver
+
+        if not self.executor:
+            return receiver.decode_stream_messages(messages)
+
+        updates = []
+        raw_messages = []
+        for kind, payload in messages:
+            if kind != MESSAGE_RAW:
+                update = receiver.decode_stream_message(kind, payload)
+                if update:
+                    updates.append(update)
+            elif receiver._validate_raw_message(payload):
+                raw_messages.append(payload)
+            else:
+                receiver._record_error()
+
+        raw_messages = receiver._check_raw_messages(raw_messages)
+        if raw_messages:
+            size = max(1, -(-len(raw_messages) // self.decode_processes))
+            batches = [raw_messages[i:i + size] for i in range(0, len(raw_messages), size)]
+            try:
+                for results in self.executor.map(decode_adsb_batch, batches):
+                    receiver._collect_raw_updates(results, updates)
+            except Exception as e:
+                logger.error(f"Decoder process pool failed, decoding in thread: {e}")
+                self.executor.shutdown(wait=False, cancel_futures=True)
+                self.executor = None
+                updates.extend(receiver.decode_stream_messages([(MESSAGE_RAW, payload) for payload in raw_messages]))
+
+        return updates
+
+    def _apply_loop(self) -> None:
+        """Tracker stage: the only thread that mutates aircraft state."""
+        while not (self.decode_done.is_set() and self.apply_queue.empty()):
+            self._run_apply_callbacks()
+            if self.cleanup_requested.is_set():
+                # Expiry mutates the same state as updates, so it runs here too
+                self.cleanup_requested.clear()
+                self.receiver.run_cleanup()
+
+            try:
+                update = self.apply_queue.get(timeout=0.5)
+            except queue.Empty:
+                continue
+
+            start = time.perf_counter()
+            self.receiver.apply_update(update)
+            self.apply_stats.busy_seconds += time.perf_counter() - start
+            self.apply_stats.processed += 1
+        self._run_apply_callbacks()
+
+    def _run_apply_callbacks(self) -> None:
+        """Run work handed back by other stages, on the tracker stage."""
+        while True:
+            try:
+                callback = self.apply_callbacks.get_nowait()
+            except queue.Empty:
+                return
+            try:
+                callback()
+            except Exception as e:
+                logger.error(f"Error in tracker stage callback: {e}")
+
+    def _alert_loop(self) -> None:
+        """Alert stage: Meshtastic serial writes run here, off the ingest path."""
+        while not self.stop_event.is_set():
+            # Priority alerts first; the short wait on the normal queue bounds their latency
+            try:
+                aircraft = self.priority_queue.get_nowait()
+            except queue.Empty:
+                try:
+                    aircraft = self.alert_queue.get(timeout=PRIORITY_POLL_INTERVAL)
+                except queue.Empty:
+                    continue
+
+            start = time.perf_counter()
+            try:
+                self.receiver.send_meshtastic_alert(aircraft)
+            except Exception as e:
+                logger.error(f"Error in alert stage: {e}")
+            finally:
+                # Cleared by the tracker stage after it has applied the alert's result,
+                # so the same alert is not queued again in between
+                self.run_on_apply(partial(self._pending_alerts.discard, aircraft.alert_key))
+                self.alert_stats.busy_seconds += time.perf_counter() - start
+                self.alert_stats.processed += 1
+
+    def get_statistics(self) -> Dict[str, Any]:
+        """Get per-stage throughput and back-pressure statistics."""
+        elapsed = time.monotonic() - self.start_time
+        return {
+            "running": self.is_running(),
+            "decode_processes": self.decode_processes if self.executor else 0,
+            "stages": {
+                "decode": self.decode_stats.to_dict(self.raw_queue.qsize(), elapsed),
+                "apply": self.apply_stats.to_dict(self.apply_queue.qsize(), elapsed),
+                "alert": self.alert_stats.to_dict(self.alert_queue.qsize(), elapsed)
+            }
+        }
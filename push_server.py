@@ -0,0 +1,379 @@
+"""
+Local push API for the Ursine Capture receiver.
+
+Streams newline-delimited JSON to any number of subscribers over TCP and/or
+a Unix socket. Each new client first receives a snapshot of all tracked
+aircraft, then one delta line per update carrying the fields it changed:
+
+    {"type":"snapshot","aircraft":[{...}, ...]}
+    {"type":"update","icao":"4840D6","ts":1718000000.1,"altitude":38000}
+    {"type":"remove","icao":"4840D6","ts":1718000300.0}
+
+Every client has a bounded queue; a client that falls a full queue behind
+is disconnected rather than slowing down the receiver or other clients.
+
+With a snapshot provider, new clients only start receiving deltas when
+attach_subscribers() runs on the thread that publishes them, which queues
+the snapshot first, so no update falls between the snapshot and the deltas.
+"""
+
+import json
+import logging
+import os
+import selectors
+import socket
+import time
+from collections import deque
+from threading import Thread, Event, Lock
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+
+logger = logging.getLogger(__name__)
+
+
+# Aircraft fields included in update deltas
+DELTA_FIELDS = ('callsign', 'altitude', 'speed', 'track', 'latitude', 'longitude',
+                'squawk', 'vertical_rate')
+
+_SEND_CHUNK = 65536
+
+
+class PushClient:
+    """A connected subscriber and its pending output."""
+
+    def __init__(self, sock: socket.socket, address: str, queue_size: int):
+        self.sock = sock
+        self.address = address
+        self.queue = deque()
+        self.queue_size = queue_size
+        self.pending = b''
+        self.overflowed = False
+        self.writing = False
+        self.messages_sent = 0
+        self.subscribed = False  # receiving deltas (after its snapshot)
+
+
+class PushServer:
+    """Selector-based NDJSON push server running in its own thread."""
+
+    def __init__(self, host: str = "127.0.0.1", port: int = 0, unix_path: str = "",
+                 queue_size: int = 1000, max_clients: int = 32,
+                 snapshot_provider: Optional[Callable[[], List[Dict[str, Any]]]] = None):
+        self.host = host
+        self.port = port
+        self.unix_path = unix_path
+        self.queue_size = queue_size
+        self.max_clients = max_clients
+        self.snapshot_provider = snapshot_provider
+
+        self.selector: Optional[selectors.BaseSelector] = None
+        self.listeners: List[socket.socket] = []
+        self.clients: Dict[int, PushClient] = {}
+        self._client_list: Tuple[PushClient, ...] = ()  # subscribed clients; replaced, never mutated, so publishers can iterate it
+        self._clients_lock = Lock()  # clients and _client_list change on both the server and the publishing thread
+        self._subscribers_waiting = False
+
+        self._wake_r: Optional[socket.socket] = None
+        self._wake_w: Optional[socket.socket] = None
+        self._wake_pending = False
+
+        self.thread: Optional[Thread] = None
+        self.stop_event = Event()
+
+        # Statistics
+        self.messages_published = 0
+        self.clients_accepted = 0
+        self.clients_dropped = 0
+
+    def start(self) -> bool:
+        """Open the listening sockets and start the server thread."""
+        try:
+            self.selector = selectors.DefaultSelector()
+            self._wake_r, self._wake_w = socket.socketpair()
+            self._wake_r.setblocking(False)
+            self._wake_w.setblocking(False)
+            self.selector.register(self._wake_r, selectors.EVENT_READ, "wake")
+
+            if self.port:
+                listener = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+                listener.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+                listener.bind((self.host, self.port))
+                self._add_listener(listener)
+                logger.info(f"Push API listening on {self.host}:{self.port}")
+
+            if self.unix_path:
+                if os.path.exists(self.unix_path):
+                    os.unlink(self.unix_path)
+                listener = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+                listener.bind(self.unix_path)
+                self._add_listener(listener)
+                logger.info(f"Push API listening on {self.unix_path}")
+
+            if not self.listeners:
+                logger.info("Push API disabled (no port or socket configured)")
+                self._close_all()
+                return False
+
+            self.stop_event.clear()
+            self.thread = Thread(target=self._serve, name="push-server", daemon=True)
+            self.thread.start()
+            return True
+
+        except Exception as e:
+            logger.error(f"Failed to start push API: {e}")
+            self._close_all()
+            return False
+
+    def stop(self) -> None:
+        """Disconnect all clients and stop the server thread."""
+        if not self.thread:
+            return
+        self.stop_event.set()
+        self._wake()
+        self.thread.join(timeout=5)
+        self.thread = None
+        self._close_all()
+        logger.info("Push API stopped")
+
+    def is_running(self) -> bool:
+        """Check if the server thread is running."""
+        return self.thread is not None and self.thread.is_alive()
+
+    def has_clients(self) -> bool:
+        """Check if anyone is subscribed (lets callers skip building deltas)."""
+        return bool(self._client_list)
+
+    def publish(self, message: Dict[str, Any]) -> None:
+        """Queue a message for every subscriber. Safe to call from any thread."""
+        clients = self._client_list
+        if not clients:
+            return
+
+        line = (json.dumps(message, separators=(',', ':')) + "\n").encode('utf-8')
+        for client in clients:
+            if len(client.queue) >= client.queue_size:
+                client.overflowed = True
+            else:
+                client.queue.append(line)
+
+        self.messages_published += 1
+        self._wake()
+
+    def attach_subscribers(self) -> None:
+        """Queue a snapshot for new clients and start their deltas. Call from the thread that publishes."""
+        if not self._subscribers_waiting:
+            return
+
+        with self._clients_lock:
+            self._subscribers_waiting = False
+            waiting = [client for client in self.clients.values() if not client.subscribed]
+            if not waiting:
+                return
+
+            line = None
+            try:
+                snapshot = {"type": "snapshot", "aircraft": self.snapshot_provider()}
+                line = (json.dumps(snapshot, separators=(',', ':')) + "\n").encode('utf-8')
+            except Exception as e:
+                logger.error(f"Error building push API snapshot: {e}")
+
+            for client in waiting:
+                if line:
+                    client.queue.append(line)
+                client.subscribed = True
+            self._client_list = tuple(client for client in self.clients.values() if client.subscribed)
+        self._wake()
+
+    def publish_aircraft_update(self, aircraft, changed) -> None:
+        """Publish the fields an update changed as a delta, skipping updates that changed none."""
+        if not self._client_list:
+            return
+
+        delta = {field: getattr(aircraft, field) for field in DELTA_FIELDS if field in changed}
+        if not delta:
+            return
+        message = {"type": "update", "icao": aircraft.icao, "ts": round(time.time(), 3)}
+        message.update(delta)
+        self.publish(message)
+
+    def publish_aircraft_removed(self, icao: str) -> None:
+        """Publish that an aircraft is no longer tracked."""
+        self.publish({"type": "remove", "icao": icao, "ts": round(time.time(), 3)})
+
+    def get_statistics(self) -> Dict[str, Any]:
+        """Get push API statistics."""
+        return {
+            "clients": len(self._client_list),
+            "clients_accepted": self.clients_accepted,
+            "clients_dropped": self.clients_dropped,
+            "messages_published": self.messages_published,
+            "queued": sum(len(client.queue) for client in self._client_list)
+        }
+
+    def _add_listener(self, listener: socket.socket) -> None:
+        """Start listening on a bound socket."""
+        listener.listen(16)
+        listener.setblocking(False)
+        self.listeners.append(listener)
+        self.selector.register(listener, selectors.EVENT_READ, "listener")
+
+    def _wake(self) -> None:
+        """Wake the server thread so it flushes queued messages."""
+        if self._wake_pending or not self._wake_w:
+            return
+        self._wake_pending = True
+        try:
+            self._wake_w.send(b'\0')
+        except (BlockingIOError, OSError):
+            pass
+
+    def _serve(self) -> None:
+        """Server loop: accept clients and flush their queues."""
+        while not self.stop_event.is_set():
+            try:
+                events = self.selector.select(timeout=1.0)
+                for key, mask in events:
+                    if key.data == "wake":
+                        self._drain_wake()
+                    elif key.data == "listener":
+                        self._accept(key.fileobj)
+                    else:
+                        client = key.data
+                        if mask & selectors.EVENT_READ:
+                            self._read_client(client)
+                        if mask & selectors.EVENT_WRITE and client.sock.fileno() in self.clients:
+                            self._flush(client)
+
+                for client in self._client_list:
+                    if client.overflowed:
+                        logger.warning(f"Push client {client.address} too slow, disconnecting")
+                        self.clients_dropped += 1
+                        self._disconnect(client)
+                    elif (client.queue or client.pending) and not client.writing:
+                        self._flush(client)
+
+            except Exception as e:
+                logger.error(f"Error in push API loop: {e}")
+                time.sleep(0.1)
+
+    def _drain_wake(self) -> None:
+        """Consume wake-up bytes."""
+        self._wake_pending = False
+        try:
+            while self._wake_r.recv(4096):
+                pass
+        except (BlockingIOError, OSError):
+            pass
+
+    def _accept(self, listener: socket.socket) -> None:
+        """Accept a new subscriber; attach_subscribers queues its snapshot."""
+        try:
+            sock, address = listener.accept()
+        except (BlockingIOError, OSError):
+            return
+
+        if len(self.clients) >= self.max_clients:
+            logger.warning("Push API client limit reached, rejecting connection")
+            sock.close()
+            return
+
+        sock.setblocking(False)
+        address = f"{address[0]}:{address[1]}" if isinstance(address, tuple) else (address or "unix")
+        client = PushClient(sock, address, self.queue_size)
+
+        with self._clients_lock:
+            self.clients[sock.fileno()] = client
+            if self.snapshot_provider:
+                # Subscribed by attach_subscribers on the publishing thread, snapshot first
+                self._subscribers_waiting = True
+            else:
+                client.subscribed = True
+                self._client_list = tuple(client for client in self.clients.values() if client.subscribed)
+        self.selector.register(sock, selectors.EVENT_READ, client)
+        self.clients_accepted += 1
+        logger.info(f"Push API client connected: {address}")
+
+    def _read_client(self, client: PushClient) -> None:
+        """Discard anything clients send and notice disconnects."""
+        try:
+            if not client.sock.recv(4096):
+                self._disconnect(client)
+        except (BlockingIOError, InterruptedError):
+            pass
+        except OSError:
+            self._disconnect(client)
+
+    def _flush(self, client: PushClient) -> None:
+        """Send as much queued data as the socket accepts without blocking."""
+        try:
+            while True:
+                if not client.pending:
+                    if not client.queue:
+                        break
+                    chunk = []
+                    size = 0
+                    while client.queue and size < _SEND_CHUNK:
+                        line = client.queue.popleft()
+                        chunk.append(line)
+                        size += len(line)
+                    client.pending = b''.join(chunk)
+                    client.messages_sent += len(chunk)
+
+                sent = client.sock.send(client.pending)
+                client.pending = client.pending[sent:]
+
+            self._set_writing(client, False)
+
+        except (BlockingIOError, InterruptedError):
+            # Socket buffer full, wait for writability
+            self._set_writing(client, True)
+        except OSError:
+            self._disconnect(client)
+
+    def _set_writing(self, client: PushClient, writing: bool) -> None:
+        """Toggle write interest for a client."""
+        if client.writing == writing:
+            return
+        client.writing = writing
+        events = selectors.EVENT_READ | (selectors.EVENT_WRITE if writing else 0)
+        self.selector.modify(client.sock, events, client)
+
+    def _disconnect(self, client: PushClient) -> None:
+        """Remove a client."""
+        fileno = client.sock.fileno()
+        if fileno in self.clients:
+            try:
+                self.selector.unregister(client.sock)
+            except Exception:
+                pass
+            with self._clients_lock:
+                del self.clients[fileno]
+                self._client_list = tuple(client for client in self.clients.values() if client.subscribed)
+            logger.info(f"Push API client disconnected: {client.address}")
+        try:
+            client.sock.close()
+        except OSError:
+            pass
+
+    def _close_all(self) -> None:
+        """Close clients, listeners and the wake-up pair."""
+        for client in list(self.clients.values()):
+            self._disconnect(client)
+        for listener in self.listeners:
+            try:
+                listener.close()
+            except OSError:
+                pass
+        self.listeners = []
+        if self.unix_path and os.path.exists(self.unix_path):
+            try:
+                os.unlink(self.unix_path)
+            except OSError:
+                pass
+        for sock in (self._wake_r, self._wake_w):
+            if sock:
+                sock.close()
+        self._wake_r = self._wake_w = None
+        if self.selector:
+            self.selector.close()
+            self.selector = None
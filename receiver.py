@@ -3,26 +3,51 @@
 Core ADS-B reception, decoding, and Meshtastic integration for Ursine Capture.
 """
 
+import asyncio
 import json
 import logging
+import os
 import signal
 import socket
 import subprocess
 import sys
 import time
-from datetime import datetime, timedelta
+from datetime import datetime
+from functools import partial
 from threading import Thread, Event
-from typing import Dict, Any, Optional
+from typing import Dict, Any, List, Optional, Tuple
 
 from utils import (setup_logging, check_process_running, kill_process, run_command,
-                  error_handler, ErrorSeverity, ComponentType, handle_exception, safe_execute)
+                  error_handler, ErrorSeverity, ComponentType, handle_exception, safe_execute,
+                  atomic_write)
 from config import Config, RadioConfig, ReceiverConfig
 from aircraft import AircraftTracker
+from beast import BeastDecoder, BeastFrame, BEAST_ESCAPE
+from decoder import decode_adsb_fields, decode_adsb_batch, check_frames_crc, MESSAGE_RAW, MESSAGE_SBS
+from metrics import RateMeter
+from pipeline import IngestPipeline
+from async_engine import AsyncReceiverEngine
+from live_state import LiveStateWriter
+from push_server import PushServer
+from recorder import StreamRecorder
+from address_filter import KnownAddressFilter
+from cpr import CPRDecoder
+from airports import AirportIndex, surface_references
+from geofence import GeofenceEngine, GeofenceEvent
+from emergency import EmergencyAlert
+from rules import RuleEngine, RuleMatch
 
 
 logger = logging.getLogger(__name__)
 
 
+# SBS (BaseStation) flag values meaning "set"
+_SBS_FLAG_SET = ('-1', '1')
+
+# Alerts about an event rather than a watchlist aircraft
+_EVENT_ALERTS = (GeofenceEvent, EmergencyAlert, RuleMatch)
+
+
 class Dump1090Manager:
     """Manages dump1090 process and HackRF configuration."""
     
@@ -461,6 +486,7 @@ class MeshtasticManager:
         self.meshtastic_config = config.get_meshtastic_config()
         self.serial_connection = None
         self.connected = False
+        self.write_timeout = 2.0  # seconds
         self.last_connection_attempt = 0
         self.connection_retry_delay = 5  # seconds
         self.max_retry_delay = 60  # seconds
@@ -477,7 +503,7 @@ class MeshtasticManager:
         self.last_successful_send = 0
         
         # Alert throttling
-        self.last_alert_times = {}  # icao -> timestamp
+        self.last_alert_times = {}  # alert key (ICAO, or ICAO:zone:event / ICAO:rule:name for events) -> timestamp
         self.alert_cooldown = 300  # 5 minutes between alerts for same aircraft
         
     def connect(self, port: str = None) -> bool:
@@ -515,7 +541,7 @@ class MeshtasticManager:
                     port=port,
                     baudrate=self.meshtastic_config.baud,
                     timeout=2.0,
-                    write_timeout=2.0
+                    write_timeout=self.write_timeout
                 )
                 
                 # Test connection with a simple command
@@ -635,21 +661,70 @@ class MeshtasticManager:
         """Send watchlist aircraft alert with throttling."""
         try:
             icao = aircraft_data.get('icao', 'UNKNOWN')
+            alert_key = aircraft_data.get('alert_key', icao)
             current_time = time.time()
             
-            # Check alert throttling
-            if icao in self.last_alert_times:
-                time_since_last = current_time - self.last_alert_times[icao]
-                if time_since_last < self.alert_cooldown:
-                    logger.debug(f"Alert for {icao} throttled (last sent {time_since_last:.0f}s ago)")
-                    return False
+            # Check alert throttling (priority alerts always go out)
+            if not aircraft_data.get('priority') and self._is_alert_throttled(alert_key, current_time):
+                return False
             
             # Format alert message
             alert_message = self._format_alert_message(aircraft_data)
             
             # Send alert
             if self.send_message(alert_message):
-                self.last_alert_times[icao] = current_time
+                self.last_alert_times[alert_key] = current_time
+                logger.info(f"Watchlist alert sent for {icao}")
+                return True
+            else:
+                logger.warning(f"Failed to send watchlist alert for {icao}")
+                return False
+                
+        except Exception as e:
+            logger.error(f"Error sending alert: {e}")
+            return False
+    
+    async def send_message_async(self, message: str, channel: int = None) -> bool:
+        """Send message to Meshtastic network without blocking the event loop."""
+        try:
+            if not self.connected or not self.serial_connection:
+                # Queue message for later if offline
+                self._queue_message(message)
+                logger.warning("Meshtastic not connected, message queued")
+                return False
+                
+            channel = channel or self.meshtastic_config.channel
+            formatted_message = self._format_message(message)
+            
+            if await self._send_serial_message_async(formatted_message, channel):
+                self.last_successful_send = time.time()
+                logger.info(f"Meshtastic message sent to channel {channel}: {message}")
+                return True
+            else:
+                self._queue_message(message)
+                self.connected = False
+                logger.warning("Meshtastic send failed, message queued")
+                return False
+                
+        except Exception as e:
+            logger.error(f"Error sending Meshtastic message: {e}")
+            self._queue_message(message)
+            return False
+    
+    async def send_alert_async(self, aircraft_data: dict) -> bool:
+        """Send watchlist aircraft alert with throttling from the event loop."""
+        try:
+            icao = aircraft_data.get('icao', 'UNKNOWN')
+            alert_key = aircraft_data.get('alert_key', icao)
+            current_time = time.time()
+            
+            if not aircraft_data.get('priority') and self._is_alert_throttled(alert_key, current_time):
+                return False
+            
+            alert_message = self._format_alert_message(aircraft_data)
+            
+            if await self.send_message_async(alert_message):
+                self.last_alert_times[alert_key] = current_time
                 logger.info(f"Watchlist alert sent for {icao}")
                 return True
             else:
@@ -660,6 +735,15 @@ class MeshtasticManager:
             logger.error(f"Error sending alert: {e}")
             return False
     
+    def _is_alert_throttled(self, icao: str, current_time: float) -> bool:
+        """Check if an alert for this aircraft is still within the cooldown."""
+        if icao in self.last_alert_times:
+            time_since_last = current_time - self.last_alert_times[icao]
+            if time_since_last < self.alert_cooldown:
+                logger.debug(f"Alert for {icao} throttled (last sent {time_since_last:.0f}s ago)")
+                return True
+        return False
+    
     def send_boot_message(self) -> bool:
         """Send boot notification message."""
         try:
@@ -760,11 +844,7 @@ class MeshtasticManager:
             if not self.serial_connection or not self.serial_connection.is_open:
                 return False
             
-            # Format command for Meshtastic device
-            # This is a simplified implementation - actual Meshtastic protocol may differ
-            command = f"--ch {channel} --sendtext \"{message}\"\n"
-            
-            self.serial_connection.write(command.encode('utf-8'))
+            self.serial_connection.write(self._build_command(message, channel))
             self.serial_connection.flush()
             
             # Wait for acknowledgment (simplified)
@@ -776,6 +856,56 @@ class MeshtasticManager:
             logger.error(f"Serial send error: {e}")
             return False
     
+    async def _send_serial_message_async(self, message: str, channel: int) -> bool:
+        """Send message via serial connection using event loop writability."""
+        try:
+            if not self.serial_connection or not self.serial_connection.is_open:
+                return False
+            
+            command = self._build_command(message, channel)
+            
+            try:
+                fd = self.serial_connection.fileno()
+            except (AttributeError, OSError):
+                # No pollable descriptor (e.g. Windows), write from a worker thread
+                return await asyncio.to_thread(self._send_serial_message, message, channel)
+            
+            # pyserial opens POSIX ports non-blocking, so write directly and
+            # wait for writability whenever the driver buffer is full
+            loop = asyncio.get_running_loop()
+            pending = memoryview(command)
+            while pending:
+                try:
+                    written = os.write(fd, pending)
+                    pending = pending[written:]
+                except BlockingIOError:
+                    await self._wait_writable(loop, fd)
+            
+            # Wait for acknowledgment (simplified)
+            await asyncio.sleep(0.1)
+            
+            return True
+            
+        except Exception as e:
+            logger.error(f"Serial send error: {e}")
+            return False
+    
+    async def _wait_writable(self, loop: asyncio.AbstractEventLoop, fd: int) -> None:
+        """Wait until the serial descriptor can accept more data."""
+        ready = loop.create_future()
+        loop.add_writer(fd, lambda: ready.done() or ready.set_result(None))
+        try:
+            await asyncio.wait_for(ready, timeout=self.write_timeout)
+        finally:
+            loop.remove_writer(fd)
+    
+    def _build_command(self, message: str, channel: int) -> bytes:
+        """Build the serial command for a text message."""
+        # Format command for Meshtastic device
+        # This is a simplified implementation - actual Meshtastic protocol may differ
+        command = f"--ch {channel} --sendtext \"{message}\"\n"
+        return command.encode('utf-8')
+    
     def _format_message(self, message: str) -> str:
         """Format message for Meshtastic transmission."""
         try:
@@ -918,7 +1048,10 @@ class ADSBReceiver:
     
     def __init__(self, config_path: str = "config.json"):
         self.config = Config(config_path)
-        self.aircraft_tracker = AircraftTracker()
+        self.aircraft_tracker = AircraftTracker(self.config.snapshot.receiver.track_history_size,
+                                                self.config.snapshot.receiver.track_history_max_samples)
+        self.aircraft_tracker.airborne_timeout = self.config.snapshot.receiver.aircraft_timeout
+        self.aircraft_tracker.surface_timeout = self.config.snapshot.receiver.surface_aircraft_timeout
         self.dump1090_manager = Dump1090Manager(self.config)
         
         # Initialize Meshtastic manager with error handling
@@ -931,25 +1064,77 @@ class ADSBReceiver:
         self.running = False
         self.stop_event = Event()
         
+        # Set when inline processing should run cleanup between reads
+        self._cleanup_requested = Event()
+        
         # Statistics
         self.message_count = 0
         self.valid_message_count = 0
         self.error_count = 0
+        self.crc_failures = 0
+        self.crc_corrected = 0
         self.start_time = datetime.now()
         self.last_message_time = datetime.now()
         
-        # Message rate tracking
-        self.message_rate_window = []
-        self.rate_window_size = 60  # Track rate over 60 seconds
+        # Message rate tracking (O(1) per-second bucket meters)
+        self.message_meter = RateMeter()
+        self.valid_meter = RateMeter()
+        self.error_meter = RateMeter()
+        
+        # Addresses confirmed by parity-checked frames, for trusting address/parity replies
+        self.known_addresses = KnownAddressFilter(self.config.snapshot.receiver.known_icao_timeout)
+        
+        # Per-aircraft CPR state for position decoding
+        self.cpr = CPRDecoder(position_timeout=self.config.snapshot.receiver.cpr_timeout)
         
-        # Position message cache for CPR decoding
-        self.position_cache = {}  # icao -> [even_msg, odd_msg]
-        self.position_cache_timeout = 10  # seconds
+        # Surface decoding references (receiver and nearby airports), rebuilt if the receiver moves
+        self.airports = AirportIndex.load(self.config.snapshot.receiver.airports_file)
+        self._surface_references: List[Tuple[float, float]] = []
+        self._surface_reference_origin: Optional[Tuple[float, float]] = None
+        self._get_surface_references(self.config.snapshot.receiver.reference_lat,
+                                     self.config.snapshot.receiver.reference_lon)
+        
+        # Geofence zones and the watchlist from a config reload are applied by the
+        # next cleanup, on the thread applying updates
+        self._geofence_zones = self.config.snapshot.geofences
+        self._built_geofence_zones = self._geofence_zones
+        self.geofences = GeofenceEngine(self._geofence_zones)
+        self._watchlist = self.config.snapshot.watchlist
+        self._applied_watchlist = self._watchlist
+        
+        # Alert rules, evaluated by the tracker for the fields each update changed; rules
+        # from a config reload are compiled by the next cleanup, on the thread applying updates
+        self._alert_rules = self.config.snapshot.rules
+        self._compiled_rules = self._alert_rules
+        self.rules = RuleEngine()
+        self._build_rule_engine(self._alert_rules)
+        self.aircraft_tracker.on_changed = self._on_aircraft_changed
+        self.aircraft_tracker.on_removed = self._on_aircraft_removed
         
         # TCP connection attributes (needed by error recovery)
         self.tcp_socket = None
         self.processing_thread = None
         
+        # Stream parsing state ('beast' or 'text', detected per connection)
+        self.stream_format = None
+        self.line_buffer = bytearray()
+        self.beast_decoder = BeastDecoder()
+        
+        # Reader -> decode -> tracker pipeline (created on start)
+        self.pipeline = None
+        
+        # Event loop engine, used instead of I/O threads when receiver.engine is "asyncio"
+        self.async_engine = None
+        
+        # Shared-memory channel to the dashboard (created on first publish)
+        self.live_state = None
+        
+        # NDJSON aircraft delta stream for local subscribers (created on start)
+        self.push_server = None
+        
+        # Raw dump1090 stream capture (created on start when record_dir is set)
+        self.recorder = None
+        
         # Error tracking
         self.consecutive_errors = 0
         self.max_consecutive_errors = 10
@@ -997,6 +1182,9 @@ class ADSBReceiver:
             
             # Start processing
             self.running = True
+            self._start_pipeline()
+            self._start_push_server()
+            self._start_recorder()
             
             # Start background threads
             processing_thread = Thread(target=self.process_messages, daemon=True)
@@ -1034,6 +1222,16 @@ class ADSBReceiver:
         self.config.unregister_reload_callback(self._on_config_reload)
         self.config.stop_watching()
         
+        if self.async_engine:
+            self.async_engine.request_stop()
+        
+        # Drain and stop the ingest pipeline
+        if self.pipeline:
+            self.pipeline.stop()
+        
+        self._stop_push_server()
+        self._stop_recorder()
+        
         # Stop dump1090
         self.dump1090_manager.stop_dump1090()
         
@@ -1041,8 +1239,85 @@ class ADSBReceiver:
         if self.meshtastic_manager:
             self.meshtastic_manager.disconnect()
         
+        self._close_live_state()
+        
         logger.info("Receiver stopped")
     
+    def _start_pipeline(self) -> None:
+        """Start the multi-stage ingest pipeline if enabled in configuration."""
+        try:
+            receiver_config = self.config.snapshot.receiver
+            if not receiver_config.ingest_pipeline:
+                logger.info("Ingest pipeline disabled, processing messages inline")
+                return
+            
+            if self.pipeline is None:
+                self.pipeline = IngestPipeline(
+                    self,
+                    queue_size=receiver_config.ingest_queue_size,
+                    decode_processes=receiver_config.decode_processes
+                )
+            self.pipeline.start()
+            
+        except Exception as e:
+            logger.error(f"Failed to start ingest pipeline, processing inline: {e}")
+            self.pipeline = None
+    
+    def _start_push_server(self) -> None:
+        """Start the local push API if a port or socket is configured."""
+        try:
+            receiver_config = self.config.snapshot.receiver
+            if not receiver_config.push_port and not receiver_config.push_socket:
+                return
+            
+            if self.push_server is None:
+                self.push_server = PushServer(
+                    host=receiver_config.push_host,
+                    port=receiver_config.push_port,
+                    unix_path=receiver_config.push_socket,
+                    queue_size=receiver_config.push_queue_size,
+                    snapshot_provider=self.aircraft_tracker.get_aircraft_list
+                )
+            if not self.push_server.start():
+                self.push_server = None
+            
+        except Exception as e:
+            logger.error(f"Failed to start push API: {e}")
+            self.push_server = None
+    
+    def _stop_push_server(self) -> None:
+        """Disconnect push API subscribers and close its sockets."""
+        if self.push_server:
+            self.push_server.stop()
+            self.push_server = None
+    
+    def _start_recorder(self) -> None:
+        """Start recording the raw dump1090 stream if a capture directory is configured."""
+        try:
+            receiver_config = self.config.snapshot.receiver
+            if not receiver_config.record_dir:
+                return
+            
+            recorder = StreamRecorder(
+                receiver_config.record_dir,
+                segment_seconds=receiver_config.record_segment_seconds,
+                max_segments=receiver_config.record_max_segments,
+                compression=receiver_config.record_compression
+            )
+            if recorder.start():
+                self.recorder = recorder
+            
+        except Exception as e:
+            logger.error(f"Failed to start stream recorder: {e}")
+            self.recorder = None
+    
+    def _stop_recorder(self) -> None:
+        """Flush and close the current capture segment."""
+        if self.recorder:
+            recorder = self.recorder
+            self.recorder = None
+            recorder.stop()
+    
     def process_messages(self) -> None:
         """Process ADS-B messages from dump1090."""
         logger.info("Starting message processing...")
@@ -1064,8 +1339,7 @@ class ADSBReceiver:
                 
                 # Connect to dump1090 TCP stream
                 # Get configured port
-                config_data = self.config.load()
-                dump1090_port = config_data.get('dump1090_port', 30005)
+                dump1090_port = self.config.snapshot.dump1090_port
                 
                 with socket.socket(socket.AF_INET, socket.SOCK_STREAM) as sock:
                     sock.settimeout(10.0)  # Longer timeout for connection
@@ -1077,24 +1351,18 @@ class ADSBReceiver:
                     # Set socket to non-blocking for better control
                     sock.settimeout(1.0)
                     
-                    buffer = ""
+                    self._reset_stream_state()
                     last_data_time = datetime.now()
                     
                     while self.running and not self.stop_event.is_set():
                         try:
-                            data = sock.recv(4096).decode('utf-8', errors='ignore')
+                            data = sock.recv(4096)
                             if not data:
                                 logger.warning("No data received from dump1090, connection closed")
                                 break
                                 
                             last_data_time = datetime.now()
-                            buffer += data
-                            lines = buffer.split('\n')
-                            buffer = lines[-1]  # Keep incomplete line
-                            
-                            for line in lines[:-1]:
-                                if line.strip():
-                                    self.process_message_line(line.strip())
+                            self._handle_stream_data(data)
                                     
                         except socket.timeout:
                             # Check if we haven't received data for too long
@@ -1110,8 +1378,7 @@ class ADSBReceiver:
                             break
                             
             except ConnectionRefusedError:
-                config_data = self.config.load()
-                dump1090_port = config_data.get('dump1090_port', 30005)
+                dump1090_port = self.config.snapshot.dump1090_port
                 logger.error(f"Connection refused by dump1090 (port {dump1090_port})")
                 if connection_attempts >= max_connection_attempts:
                     logger.error(f"Failed to connect after {max_connection_attempts} attempts")
@@ -1127,73 +1394,39 @@ class ADSBReceiver:
         
         logger.info("Message processing stopped")
     
-    def _decode_position(self, raw_message: str, icao: str, ref_lat: float, ref_lon: float) -> Optional[tuple]:
-        """Decode position using multiple methods for better accuracy."""
-        try:
-            import pyModeS as pms
-            
-            # Method 1: Use reference position (local decoding)
-            try:
-                position = pms.adsb.position_with_ref(raw_message, ref_lat, ref_lon)
-                if position and len(position) >= 2:
-                    lat, lon = position[0], position[1]
-                    # Validate coordinates
-                    if -90 <= lat <= 90 and -180 <= lon <= 180:
-                        return (lat, lon)
-            except Exception as e:
-                logger.debug(f"Reference position decoding failed: {e}")
-            
-            # Method 2: Try CPR decoding with cached messages
-            try:
-                # Get CPR format (even/odd)
-                cpr_format = pms.adsb.oe_flag(raw_message)
-                current_time = datetime.now()
-                
-                # Initialize cache for this aircraft if needed
-                if icao not in self.position_cache:
-                    self.position_cache[icao] = {'even': None, 'odd': None, 'time': current_time}
-                
-                # Store message in appropriate slot
-                if cpr_format == 0:  # Even
-                    self.position_cache[icao]['even'] = raw_message
-                else:  # Odd
-                    self.position_cache[icao]['odd'] = raw_message
-                
-                self.position_cache[icao]['time'] = current_time
-                
-                # Try to decode if we have both even and odd messages
-                cache_entry = self.position_cache[icao]
-                if (cache_entry['even'] and cache_entry['odd'] and
-                    (current_time - cache_entry['time']).total_seconds() < self.position_cache_timeout):
-                    
-                    position = pms.adsb.position(cache_entry['even'], cache_entry['odd'], 0, 1)
-                    if position and len(position) >= 2:
-                        lat, lon = position[0], position[1]
-                        if -90 <= lat <= 90 and -180 <= lon <= 180:
-                            return (lat, lon)
-                            
-            except Exception as e:
-                logger.debug(f"CPR position decoding failed: {e}")
-            
-            return None
-            
-        except Exception as e:
-            logger.debug(f"Position decoding error: {e}")
-            return None
+    def _reset_stream_state(self) -> None:
+        """Reset stream parsing state for a new dump1090 connection."""
+        if self.recorder:
+            self.recorder.new_segment()
+        
+        if self.pipeline and self.pipeline.is_running():
+            # Parsing state belongs to the decode stage, reset it in order
+            self.pipeline.submit_reset()
+            return
+        self.reset_stream_parser()
+    
+    def reset_stream_parser(self) -> None:
+        """Clear partial lines/frames and re-detect the stream format."""
+        self.stream_format = None
+        self.line_buffer.clear()
+        self.beast_decoder.reset()
+    
+    def _handle_stream_data(self, data: bytes) -> None:
+        """Hand raw bytes from dump1090 to the ingest pipeline or process inline."""
+        if self.recorder:
+            self.recorder.write(data)
+        
+        if self.pipeline and self.pipeline.is_running():
+            self.pipeline.submit(data)
+            return
+        
+        for update in self.decode_stream_messages(self.parse_stream_data(data)):
+            self.apply_update(update)
     
     def _cleanup_position_cache(self) -> None:
-        """Clean up old entries from position cache."""
+        """Drop CPR state of aircraft that stopped sending positions."""
         try:
-            current_time = datetime.now()
-            expired_icaos = []
-            
-            for icao, cache_entry in self.position_cache.items():
-                if (current_time - cache_entry['time']).total_seconds() > self.position_cache_timeout:
-                    expired_icaos.append(icao)
-            
-            for icao in expired_icaos:
-                del self.position_cache[icao]
-                
+            self.cpr.expire()
         except Exception as e:
             logger.error(f"Error cleaning position cache: {e}")
 
@@ -1226,235 +1459,335 @@ class ADSBReceiver:
 
     def decode_adsb_message(self, raw_message: str) -> Optional[Dict[str, Any]]:
         """Decode ADS-B message using pyModeS and extract aircraft data."""
+        decoded_data = decode_adsb_fields(raw_message)
+        if decoded_data and decoded_data.get('position_pending'):
+            self._resolve_position(decoded_data)
+        return decoded_data
+    
+    def _resolve_position(self, decoded_data: Dict[str, Any]) -> None:
+        """Fill in latitude/longitude for a decoded position message."""
         try:
-            # Import pyModeS for message decoding
-            try:
-                import pyModeS as pms
-            except ImportError:
-                logger.error("pyModeS not installed. Run: pip install pyModeS")
-                return None
-            
-            # Validate message format
-            if not pms.adsb.icao(raw_message):
-                return None
-                
-            # Extract ICAO address
-            icao = pms.adsb.icao(raw_message)
-            if not icao:
-                return None
-                
-            # Initialize decoded data
-            decoded_data = {
-                'icao': icao,
-                'raw_message': raw_message,
-                'message_type': None
-            }
-            
-            # Determine message type
-            typecode = pms.adsb.typecode(raw_message)
-            decoded_data['message_type'] = typecode
-            
-            # Decode based on message type
-            if 1 <= typecode <= 4:
-                # Aircraft identification
-                callsign = pms.adsb.callsign(raw_message)
-                if callsign:
-                    decoded_data['callsign'] = callsign.strip()
-                    
-            elif 5 <= typecode <= 8:
-                # Surface position
-                try:
-                    # Need reference position for surface decoding
-                    receiver_config = self.config.get_receiver_config()
-                    ref_lat = receiver_config.reference_lat
-                    ref_lon = receiver_config.reference_lon
-                    
-                    position = pms.adsb.position_with_ref(raw_message, ref_lat, ref_lon)
-                    if position and len(position) >= 2:
-                        lat, lon = position[0], position[1]
-                        # Validate coordinates
-                        if -90 <= lat <= 90 and -180 <= lon <= 180:
-                            decoded_data['latitude'] = lat
-                            decoded_data['longitude'] = lon
-                            # Surface aircraft have altitude 0
-                            decoded_data['altitude'] = 0
-                        else:
-                            logger.debug(f"Invalid surface coordinates: {lat}, {lon}")
-                        
-                except Exception as e:
-                    logger.debug(f"Error decoding surface position: {e}")
-                    
-            elif 9 <= typecode <= 18:
-                # Airborne position
-                try:
-                    # Decode altitude first (always available)
-                    altitude = pms.adsb.altitude(raw_message)
-                    if altitude is not None:
-                        decoded_data['altitude'] = altitude
-                    
-                    # Try to decode position with reference
-                    receiver_config = self.config.get_receiver_config()
-                    ref_lat = receiver_config.reference_lat
-                    ref_lon = receiver_config.reference_lon
-                    
-                    # Try multiple position decoding methods
-                    position = self._decode_position(raw_message, icao, ref_lat, ref_lon)
-                    if position:
-                        decoded_data['latitude'] = position[0]
-                        decoded_data['longitude'] = position[1]
-                            
-                except Exception as e:
-                    logger.debug(f"Error decoding airborne position: {e}")
-                    
-            elif typecode == 19:
-                # Airborne velocity
-                try:
-                    velocity = pms.adsb.velocity(raw_message)
-                    if velocity:
-                        speed, track, vertical_rate, _ = velocity
-                        if speed is not None:
-                            decoded_data['speed'] = int(speed)
-                        if track is not None:
-                            decoded_data['track'] = int(track)
-                        if vertical_rate is not None:
-                            decoded_data['vertical_rate'] = int(vertical_rate)
-                            
-                except Exception as e:
-                    logger.debug(f"Error decoding velocity: {e}")
+            decoded_data.pop('position_pending', None)
+            typecode = decoded_data['message_type']
+            
+            decoded_data['on_ground'] = 5 <= typecode <= 8
+            if 5 <= typecode <= 8:
+                # Surface position, relative to the aircraft's last fix or a nearby airport
+                receiver_config = self.config.snapshot.receiver
+                position = self.cpr.decode_surface(
+                    decoded_data['address'], decoded_data['cpr_odd'], decoded_data['cpr_lat'],
+                    decoded_data['cpr_lon'],
+                    self._get_surface_references(receiver_config.reference_lat, receiver_config.reference_lon))
+                if position:
+                    decoded_data['latitude'] = position[0]
+                    decoded_data['longitude'] = position[1]
+                    # Surface aircraft have altitude 0
+                    decoded_data['altitude'] = 0
+            else:
+                # Airborne position: global decode to acquire, then local to the aircraft's last fix
+                position = self.cpr.decode(decoded_data['address'], decoded_data['cpr_odd'],
+                                           decoded_data['cpr_lat'], decoded_data['cpr_lon'])
+                if position:
+                    decoded_data['latitude'] = position[0]
+                    decoded_data['longitude'] = position[1]
                     
-            # Try to decode squawk code if available
-            try:
-                # Note: Squawk is typically in Mode A/C messages, not ADS-B
-                # But we'll check if pyModeS can extract it
-                if hasattr(pms, 'commb') and hasattr(pms.commb, 'selalt40mcp'):
-                    # This is a placeholder - actual squawk decoding depends on message type
-                    pass
-            except Exception:
-                pass
-                
-            return decoded_data
-            
         except Exception as e:
-            logger.debug(f"Error decoding message {raw_message[:20]}...: {e}")
-            return None
+            logger.debug(f"Error decoding position: {e}")
+    
+    def _get_surface_references(self, ref_lat: float, ref_lon: float) -> List[Tuple[float, float]]:
+        """Get surface decoding references, computed once per receiver location."""
+        if self._surface_reference_origin != (ref_lat, ref_lon):
+            self._surface_references = surface_references(self.airports, ref_lat, ref_lon)
+            self._surface_reference_origin = (ref_lat, ref_lon)
+        return self._surface_references
 
     def process_message_line(self, line: str) -> None:
         """Process a single message line from dump1090."""
+        message = self._parse_message_line(line)
+        if message:
+            self._dispatch_message(*message)
+    
+    def process_beast_frame(self, frame: BeastFrame) -> None:
+        """Process a single binary Beast frame from dump1090."""
+        message = self._parse_beast_frame(frame)
+        if message:
+            self._dispatch_message(*message)
+    
+    def parse_stream_data(self, data: bytes) -> List[Tuple[str, str]]:
+        """Split raw bytes from dump1090 into (kind, payload) messages."""
+        if self.stream_format is None:
+            # Beast output always starts with the 0x1A frame marker
+            self.stream_format = 'beast' if data[0] == BEAST_ESCAPE else 'text'
+            logger.info(f"Detected dump1090 stream format: {self.stream_format}")
+        
+        messages = []
+        if self.stream_format == 'beast':
+            for frame in self.beast_decoder.feed(data):
+                message = self._parse_beast_frame(frame)
+                if message:
+                    messages.append(message)
+            return messages
+        
+        buffer = self.line_buffer
+        buffer += data
+        end = buffer.rfind(b'\n')
+        if end < 0:
+            return messages
+        
+        for raw_line in bytes(buffer[:end]).split(b'\n'):
+            line = raw_line.strip()
+            if line:
+                message = self._parse_message_line(line.decode('ascii', errors='ignore'))
+                if message:
+                    messages.append(message)
+        del buffer[:end + 1]
+        return messages
+    
+    def _count_message(self) -> None:
+        """Count an incoming message of any format."""
+        self.message_count += 1
+        self.last_message_time = datetime.now()
+        
+        # Update message rate tracking
+        self._update_message_rate()
+        
+        # Log message rate periodically
+        if self.message_count % 1000 == 0:
+            rate = self.get_message_rate()
+            valid_rate = self.get_valid_message_rate()
+            aircraft_count = self.aircraft_tracker.get_aircraft_count()
+            logger.info(f"Processed {self.message_count} messages "
+                       f"(rate: {rate}/sec, valid: {valid_rate}/sec, "
+                       f"errors: {self.error_count}, aircraft: {aircraft_count})")
+    
+    def _parse_message_line(self, line: str) -> Optional[Tuple[str, str]]:
+        """Classify a text line from dump1090 as a raw or SBS message."""
         try:
             # Skip empty lines
             if not line.strip():
-                return
+                return None
                 
-            self.message_count += 1
-            self.last_message_time = datetime.now()
-            
-            # Update message rate tracking
-            self._update_message_rate()
+            self._count_message()
             
             # Debug: Log first few messages to see format
             if self.message_count <= 5:
                 logger.info(f"Raw message {self.message_count}: {line[:100]}")
             
             # Parse the message from dump1090
-            # Handle both Beast format (*8D...) and SBS format (MSG,...)
+            # Handle both raw AVR format (*8D...;) and SBS format (MSG,...)
             if line.startswith('*'):
-                # Beast format: *8D<ICAO><DATA>;<timestamp>
+                # AVR format: *8D<ICAO><DATA>;
                 if ';' not in line:
                     if self.message_count <= 10:
-                        logger.debug(f"Skipping Beast message without semicolon: {line[:50]}")
-                    return
-                # Process Beast format (existing code would go here)
-                logger.debug(f"Beast format not implemented yet: {line[:50]}")
-                return
+                        logger.debug(f"Skipping raw message without semicolon: {line[:50]}")
+                    return None
+                return (MESSAGE_RAW, line[1:line.index(';')])
             elif line.startswith('MSG'):
                 # SBS format: MSG,type,session,aircraft,icao,flight,date,time,date,time,callsign,altitude,speed,track,lat,lon,vertical_rate,squawk,alert,emergency,spi,on_ground
-                self._process_sbs_message(line)
-                return
+                return (MESSAGE_SBS, line)
             else:
                 if self.message_count <= 10:
                     logger.debug(f"Skipping unknown format message: {line[:50]}")
-                return
+                return None
                 
-            # Extract message and timestamp
-            parts = line.split(';')
-            raw_message = parts[0]
-            
-            # Remove the '*' prefix
-            if raw_message.startswith('*'):
-                raw_message = raw_message[1:]
+        except Exception as e:
+            self._record_error()
+            logger.error(f"Error processing message line '{line[:50]}...': {e}")
+            return None
+    
+    def _parse_beast_frame(self, frame: BeastFrame) -> Optional[Tuple[str, str]]:
+        """Convert a Beast frame into a raw hex message."""
+        self._count_message()
+        
+        if not frame.is_mode_s:
+            # Mode A/C replies carry no address, nothing to track
+            return None
+        
+        if self.message_count <= 5:
+            logger.info(f"Beast frame {self.message_count}: {frame.hex} (signal {frame.signal})")
+        
+        return (MESSAGE_RAW, frame.hex)
+    
+    def _dispatch_message(self, kind: str, payload: str) -> None:
+        """Decode and apply a parsed message on the calling thread."""
+        update = self.decode_stream_message(kind, payload)
+        if update:
+            self.apply_update(update)
+    
+    def decode_stream_messages(self, messages: List[Tuple[str, str]]) -> List[Dict[str, Any]]:
+        """Decode one chunk's parsed messages, raw frames as a single vectorized batch."""
+        updates = []
+        raw_messages = []
+        for kind, payload in messages:
+            if kind != MESSAGE_RAW:
+                update = self.decode_stream_message(kind, payload)
+                if update:
+                    updates.append(update)
+            elif self._validate_raw_message(payload):
+                raw_messages.append(payload)
+            else:
+                self._record_error()
+        
+        raw_messages = self._check_raw_messages(raw_messages)
+        if raw_messages:
+            self._collect_raw_updates(decode_adsb_batch(raw_messages), updates)
+        return updates
+    
+    def _collect_raw_updates(self, decoded_messages: List[Optional[Dict[str, Any]]],
+                             updates: List[Dict[str, Any]]) -> None:
+        """Append decoded raw frames to updates, dropping address/parity replies from unknown aircraft."""
+        receiver_config = self.config.snapshot.receiver
+        known = self.known_addresses if receiver_config.crc_check and receiver_config.address_parity_filter else None
+        now = time.monotonic()
+        for decoded in decoded_messages:
+            if not decoded:
+                self._record_error()
+            elif known is None or known.admit(decoded.get('df'), decoded['address'], now):
+                updates.append(decoded)
+    
+    def _check_raw_messages(self, raw_messages: List[str]) -> List[str]:
+        """Drop raw frames that fail the parity check, repairing single-bit errors if enabled."""
+        receiver_config = self.config.snapshot.receiver
+        if not raw_messages or not receiver_config.crc_check:
+            return raw_messages
+        
+        checked, corrected, failed = check_frames_crc(raw_messages, receiver_config.crc_fix_single_bit)
+        self.crc_corrected += corrected
+        if not failed:
+            return checked
+        
+        self.crc_failures += failed
+        for _ in range(failed):
+            self._record_error()
+        return [message for message in checked if message is not None]
+    
+    def decode_stream_message(self, kind: str, payload: str) -> Optional[Dict[str, Any]]:
+        """Decode a parsed message into aircraft update data (no tracker access)."""
+        try:
+            if kind == MESSAGE_SBS:
+                return self._parse_sbs_message(payload)
             
             # Validate message format and length
-            if not self._validate_raw_message(raw_message):
-                self.error_count += 1
-                return
-                
-            # Decode the message using pyModeS
-            decoded_data = self.decode_adsb_message(raw_message)
-            if decoded_data:
-                self.valid_message_count += 1
-                
-                # Update aircraft tracking
-                aircraft = self.aircraft_tracker.update_aircraft(decoded_data['icao'], decoded_data)
-                if aircraft:
-                    # Check watchlist and send alerts if needed
-                    self.check_watchlist(aircraft)
-            else:
-                self.error_count += 1
+            if not self._validate_raw_message(payload):
+                self._record_error()
+                return None
+            
+            checked = self._check_raw_messages([payload])
+            if not checked:
+                return None
+            payload = checked[0]
             
-            # Log message rate periodically
-            if self.message_count % 1000 == 0:
-                rate = self.get_message_rate()
-                valid_rate = self.get_valid_message_rate()
-                aircraft_count = self.aircraft_tracker.get_aircraft_count()
-                logger.info(f"Processed {self.message_count} messages "
-                           f"(rate: {rate}/sec, valid: {valid_rate}/sec, "
-                           f"errors: {self.error_count}, aircraft: {aircraft_count})")
+            # Decode the message using pyModeS; positions are resolved later
+            updates = []
+            self._collect_raw_updates([decode_adsb_fields(payload)], updates)
+            return updates[0] if updates else None
+            
+        except Exception as e:
+            self._record_error()
+            logger.error(f"Error decoding message '{payload[:50]}': {e}")
+            return None
+    
+    def apply_update(self, update: Dict[str, Any]) -> None:
+        """Apply decoded message data to the aircraft tracker."""
+        try:
+            if update.get('position_pending'):
+                self._resolve_position(update)
+            
+            # Update aircraft tracking, by integer address when the decoder supplied one
+            address = update.get('address')
+            if address is not None:
+                aircraft = self.aircraft_tracker.update_aircraft_fast(address, update)
+            else:
+                aircraft = self.aircraft_tracker.update_aircraft(update['icao'], update)
+            if aircraft:
+                self._record_valid()
+                # Check emergencies, watchlist and zones and send alerts if needed
+                if aircraft.emergency != aircraft.emergency_alerted:
+                    self.check_emergency(aircraft)
+                self.check_watchlist(aircraft)
+                if 'latitude' in update and self.geofences.zones and aircraft.has_position():
+                    self.check_geofences(aircraft)
+            else:
+                self._record_error()
                 
         except Exception as e:
-            self.error_count += 1
-            logger.error(f"Error processing message line '{line[:50]}...': {e}")
+            self._record_error()
+            logger.error(f"Error applying aircraft update: {e}")
+    
+    def _process_raw_message(self, raw_message: str) -> None:
+        """Validate, decode and apply a raw Mode S hex message."""
+        self._dispatch_message(MESSAGE_RAW, raw_message)
     
     def _process_sbs_message(self, line: str) -> None:
         """Process SBS (BaseStation) format message."""
+        self._dispatch_message(MESSAGE_SBS, line)
+    
+    def _parse_sbs_message(self, line: str) -> Optional[Dict[str, Any]]:
+        """Parse SBS (BaseStation) format message into aircraft data."""
         try:
             # SBS format: MSG,type,session,aircraft,icao,flight,date,time,date,time,callsign,altitude,speed,track,lat,lon,vertical_rate,squawk,alert,emergency,spi,on_ground
-            parts = line.split(',')
+            parts = [part.strip() for part in line.split(',')]
             
             if len(parts) < 22:
-                return
+                return None
             
             # Extract fields
-            icao = parts[4].strip()
+            icao = parts[4]
             if not icao:
-                return
-                
-            # Build aircraft data from SBS message
-            aircraft_data = {
-                'icao': icao,
-                'callsign': parts[10].strip() if parts[10].strip() else None,
-                'altitude': int(parts[11]) if parts[11].strip() else None,
-                'speed': int(parts[12]) if parts[12].strip() else None,
-                'track': int(parts[13]) if parts[13].strip() else None,
-                'latitude': float(parts[14]) if parts[14].strip() else None,
-                'longitude': float(parts[15]) if parts[15].strip() else None,
-                'vertical_rate': int(parts[16]) if parts[16].strip() else None,
-                'squawk': parts[17].strip() if parts[17].strip() else None
-            }
+                return None
             
-            # Update aircraft tracking
-            aircraft = self.aircraft_tracker.update_aircraft(icao, aircraft_data)
-            if aircraft:
-                self.valid_message_count += 1
-                # Check watchlist and send alerts if needed
-                self.check_watchlist(aircraft)
-                
-                # Log first few successful aircraft updates
-                if self.valid_message_count <= 5:
-                    logger.info(f"Successfully processed aircraft {icao}: {aircraft_data}")
+            # Validate ICAO once here so the tracker can take the integer fast path
+            try:
+                address = int(icao, 16) if len(icao) == 6 and icao.isalnum() else -1
+            except ValueError:
+                address = -1
+            if address < 0:
+                self._record_error()
+                logger.debug(f"Invalid ICAO in SBS message: {icao}")
+                return None
+            
+            # Build aircraft data from SBS message, leaving out empty fields so
+            # they don't overwrite values from other message types
+            aircraft_data = {'icao': icao.upper(), 'address': address}
+            callsign, altitude, speed, track, latitude, longitude, vertical_rate, squawk = parts[10:18]
+            if callsign:
+                aircraft_data['callsign'] = callsign
+            if altitude:
+                aircraft_data['altitude'] = int(altitude)
+            if speed:
+                aircraft_data['speed'] = int(speed)
+            if track:
+                aircraft_data['track'] = int(track)
+            if latitude:
+                aircraft_data['latitude'] = float(latitude)
+            if longitude:
+                aircraft_data['longitude'] = float(longitude)
+            if vertical_rate:
+                aircraft_data['vertical_rate'] = int(vertical_rate)
+            if squawk:
+                aircraft_data['squawk'] = squawk
+            
+            # Flags are "-1" (set) or "0"; the emergency flag stands for a general emergency
+            # unless the squawk says more
+            _, emergency, spi, on_ground = parts[18:22]
+            if emergency:
+                aircraft_data['emergency_state'] = 1 if emergency in _SBS_FLAG_SET else 0
+            if spi:
+                aircraft_data['spi'] = spi in _SBS_FLAG_SET
+            if on_ground:
+                aircraft_data['on_ground'] = on_ground in _SBS_FLAG_SET
+            
+            # Log first few successful aircraft updates
+            if self.valid_message_count < 5:
+                logger.info(f"Parsed SBS message for aircraft {icao}: {aircraft_data}")
+            
+            return aircraft_data
             
         except Exception as e:
+            self._record_error()
             logger.error(f"Error processing SBS message: {e}")
             logger.debug(f"SBS message: {line}")
+            return None
     
     def check_watchlist(self, aircraft) -> None:
         """Check aircraft against watchlist and send alerts with smart throttling."""
@@ -1465,73 +1798,217 @@ class ADSBReceiver:
             # Check if this is a new detection
             if aircraft.is_new_watchlist_detection():
                 logger.info(f"NEW watchlist aircraft detected: {aircraft.get_display_name()} ({aircraft.icao})")
-                self.send_meshtastic_alert(aircraft)
+                self._dispatch_alert(aircraft)
                 return
             
             # Check if we should send a periodic alert
-            receiver_config = self.config.get_receiver_config()
-            alert_interval = receiver_config.alert_interval
+            alert_interval = self.config.snapshot.receiver.alert_interval
             
             if aircraft.should_send_watchlist_alert(alert_interval):
                 logger.info(f"Periodic watchlist alert for: {aircraft.get_display_name()} ({aircraft.icao})")
-                self.send_meshtastic_alert(aircraft)
+                self._dispatch_alert(aircraft)
                 
         except Exception as e:
             logger.error(f"Error checking watchlist: {e}")
     
-    def send_meshtastic_alert(self, aircraft) -> None:
-        """Send enhanced Meshtastic alert for watchlist aircraft."""
+    def check_emergency(self, aircraft) -> None:
+        """Send a priority alert when an aircraft declares or changes an emergency."""
         try:
-            # Calculate distance and bearing if position is available
-            distance_info = ""
-            bearing_info = ""
+            emergency = aircraft.emergency
+            aircraft.emergency_alerted = emergency
+            if emergency is None:
+                logger.info(f"Emergency cleared: {aircraft.get_display_name()} ({aircraft.icao}) squawk {aircraft.squawk}")
+                return
+            
+            logger.warning(f"EMERGENCY {emergency}: {aircraft.get_display_name()} ({aircraft.icao}) squawk {aircraft.squawk}")
+            self._dispatch_priority_alert(EmergencyAlert(aircraft.address, aircraft.icao, emergency,
+                                                         aircraft.squawk, aircraft.last_seen_mono))
             
-            if aircraft.has_position():
-                receiver_config = self.config.get_receiver_config()
-                ref_lat = receiver_config.reference_lat
-                ref_lon = receiver_config.reference_lon
+        except Exception as e:
+            logger.error(f"Error checking emergency: {e}")
+    
+    def check_geofences(self, aircraft) -> None:
+        """Check an aircraft's new position against the geofence zones and alert on transitions."""
+        try:
+            events = self.geofences.update(aircraft.address, aircraft.icao, aircraft.latitude,
+                                           aircraft.longitude, aircraft.altitude, aircraft.last_seen_mono)
+            for event in events:
+                logger.info(f"Geofence {event.event}: {aircraft.get_display_name()} ({aircraft.icao}) zone {event.zone}")
+                self._dispatch_alert(event)
                 
-                try:
-                    from utils import calculate_distance, calculate_bearing
-                    distance = calculate_distance(ref_lat, ref_lon, aircraft.latitude, aircraft.longitude)
-                    bearing = calculate_bearing(ref_lat, ref_lon, aircraft.latitude, aircraft.longitude)
-                    distance_info = f" {distance:.1f}km"
-                    bearing_info = f" {bearing:.0f}°"
-                except:
-                    pass  # Fall back to basic alert if distance calculation fails
-            
-            # Determine alert type
-            alert_type = "NEW" if aircraft.is_new_watchlist_detection() else "UPDATE"
-            
-            # Build enhanced aircraft data for alert
-            aircraft_data = {
-                'icao': aircraft.icao,
-                'callsign': aircraft.callsign,
-                'altitude': aircraft.altitude,
-                'latitude': aircraft.latitude,
-                'longitude': aircraft.longitude,
-                'speed': aircraft.speed,
-                'track': aircraft.track,
-                'watchlist_name': aircraft.watchlist_name,
-                'alert_type': alert_type,
-                'distance_info': distance_info,
-                'bearing_info': bearing_info,
-                'first_detected': aircraft.watchlist_first_detected,
-                'alert_count': aircraft.watchlist_alert_count + 1
-            }
+        except Exception as e:
+            logger.error(f"Error checking geofences: {e}")
+    
+    def check_rules(self, aircraft, changed: List[str]) -> None:
+        """Evaluate the alert rules affected by an aircraft's changed fields and alert on matches."""
+        try:
+            for match in self.rules.evaluate(aircraft, changed, aircraft.last_seen_mono):
+                logger.info(f"Rule {match.rule} matched: {aircraft.get_display_name()} ({aircraft.icao})")
+                self._dispatch_alert(match)
+                
+        except Exception as e:
+            logger.error(f"Error checking alert rules: {e}")
+    
+    def _build_rule_engine(self, rules) -> None:
+        """Compile alert rules, keeping the match state of rules that did not change."""
+        receiver_config = self.config.snapshot.receiver
+        engine = RuleEngine(rules, (receiver_config.reference_lat, receiver_config.reference_lon))
+        engine.inherit(self.rules)
+        self.rules = engine
+    
+    def _on_aircraft_changed(self, aircraft, changed: List[str]) -> None:
+        """Publish the fields an update changed and evaluate the alert rules reading them."""
+        if self.push_server:
+            self.push_server.publish_aircraft_update(aircraft, changed)
+        if self.rules.rules:
+            self.check_rules(aircraft, changed)
+    
+    def _on_aircraft_removed(self, icao: str) -> None:
+        """Drop the per-aircraft state of an expired aircraft and publish its removal."""
+        address = int(icao, 16)
+        self.cpr.forget(address)
+        self.geofences.forget(address)
+        if self.push_server:
+            self.push_server.publish_aircraft_removed(icao)
+    
+    def _dispatch_alert(self, aircraft) -> None:
+        """Send an alert, off the ingest path when the pipeline is running."""
+        if self.async_engine and self.async_engine.is_running():
+            self.async_engine.submit_alert(aircraft)
+        elif self.pipeline and self.pipeline.is_running():
+            self.pipeline.submit_alert(aircraft)
+        else:
+            self.send_meshtastic_alert(aircraft)
+    
+    def _dispatch_priority_alert(self, alert) -> None:
+        """Send an alert ahead of any queued ones, off the ingest path when the pipeline is running."""
+        if self.async_engine and self.async_engine.is_running():
+            self.async_engine.submit_priority_alert(alert)
+        elif self.pipeline and self.pipeline.is_running():
+            self.pipeline.submit_priority_alert(alert)
+        else:
+            self.send_meshtastic_alert(alert)
+    
+    def send_meshtastic_alert(self, aircraft) -> None:
+        """Send enhanced Meshtastic alert for a watchlist aircraft, geofence event, emergency or rule match."""
+        try:
+            if isinstance(aircraft, _EVENT_ALERTS):
+                self._send_event_alert(aircraft)
+                return
+            aircraft_data = self._build_alert_data(aircraft)
+            sent = bool(self.meshtastic_manager and self.meshtastic_manager.send_alert(aircraft_data))
+            self._finish_alert(aircraft, sent)
             
-            # Send alert and mark as alerted if successful
-            if self.meshtastic_manager and self.meshtastic_manager.send_alert(aircraft_data):
-                aircraft.mark_watchlist_alerted()
-                logger.info(f"Watchlist alert sent for {aircraft.icao} (alert #{aircraft.watchlist_alert_count})")
-            elif not self.meshtastic_manager:
-                logger.debug(f"Meshtastic not available, skipping alert for {aircraft.icao}")
-            else:
-                logger.warning(f"Failed to send watchlist alert for {aircraft.icao}")
+        except Exception as e:
+            logger.error(f"Error sending Meshtastic alert: {e}")
+    
+    async def send_meshtastic_alert_async(self, aircraft) -> None:
+        """Send enhanced Meshtastic alert for a watchlist aircraft, geofence event, emergency or rule match from the event loop."""
+        try:
+            if isinstance(aircraft, _EVENT_ALERTS):
+                alert_data = self._build_event_alert_data(aircraft)
+                sent = bool(alert_data and self.meshtastic_manager and
+                            await self.meshtastic_manager.send_alert_async(alert_data))
+                self._finish_event_alert(aircraft, sent)
+                return
+            aircraft_data = self._build_alert_data(aircraft)
+            sent = bool(self.meshtastic_manager and await self.meshtastic_manager.send_alert_async(aircraft_data))
+            self._finish_alert(aircraft, sent)
             
         except Exception as e:
             logger.error(f"Error sending Meshtastic alert: {e}")
     
+    def _build_alert_data(self, aircraft) -> Dict[str, Any]:
+        """Build enhanced alert data for a watchlist aircraft."""
+        # Calculate distance and bearing if position is available
+        distance_info = ""
+        bearing_info = ""
+        
+        if aircraft.has_position():
+            receiver_config = self.config.snapshot.receiver
+            ref_lat = receiver_config.reference_lat
+            ref_lon = receiver_config.reference_lon
+            
+            try:
+                from utils import calculate_distance, calculate_bearing
+                distance = calculate_distance(ref_lat, ref_lon, aircraft.latitude, aircraft.longitude)
+                bearing = calculate_bearing(ref_lat, ref_lon, aircraft.latitude, aircraft.longitude)
+                distance_info = f" {distance:.1f}km"
+                bearing_info = f" {bearing:.0f}°"
+            except:
+                pass  # Fall back to basic alert if distance calculation fails
+        
+        # Determine alert type
+        alert_type = "NEW" if aircraft.is_new_watchlist_detection() else "UPDATE"
+        
+        # Build enhanced aircraft data for alert
+        return {
+            'icao': aircraft.icao,
+            'callsign': aircraft.callsign,
+            'altitude': aircraft.altitude,
+            'latitude': aircraft.latitude,
+            'longitude': aircraft.longitude,
+            'speed': aircraft.speed,
+            'track': aircraft.track,
+            'watchlist_name': aircraft.watchlist_name,
+            'alert_type': alert_type,
+            'course_change': self.aircraft_tracker.get_course_change(aircraft.icao),
+            'distance_info': distance_info,
+            'bearing_info': bearing_info,
+            'first_detected': aircraft.watchlist_first_detected,
+            'alert_count': aircraft.watchlist_alert_count + 1
+        }
+    
+    def _send_event_alert(self, event) -> None:
+        """Send a geofence, emergency or rule alert through the Meshtastic alert path."""
+        alert_data = self._build_event_alert_data(event)
+        sent = bool(alert_data and self.meshtastic_manager and self.meshtastic_manager.send_alert(alert_data))
+        self._finish_event_alert(event, sent)
+    
+    def _build_event_alert_data(self, event) -> Optional[Dict[str, Any]]:
+        """Build alert data for a geofence, emergency or rule event from the aircraft's current state."""
+        aircraft = self.aircraft_tracker.get_aircraft_by_address(event.address)
+        if aircraft is None:
+            return None
+        alert_data = self._build_alert_data(aircraft)
+        alert_data.update({
+            'alert_type': event.alert_type,
+            'alert_key': event.alert_key,
+            'priority': event.priority,
+            'alert_count': 1
+        })
+        return alert_data
+    
+    def _finish_event_alert(self, event, sent: bool) -> None:
+        """Log the result of a geofence, emergency or rule alert."""
+        if sent:
+            logger.info(f"{event.alert_type} alert sent for {event.icao}")
+        elif not self.meshtastic_manager:
+            logger.debug(f"Meshtastic not available, skipping {event.alert_type} alert for {event.icao}")
+        else:
+            logger.warning(f"Failed to send {event.alert_type} alert for {event.icao}")
+    
+    def _finish_alert(self, aircraft, sent: bool) -> None:
+        """Mark aircraft as alerted if the alert went out and log the result."""
+        if sent:
+            if self.pipeline and self.pipeline.is_running():
+                # Aircraft state belongs to the tracker stage, not the alert stage
+                self.pipeline.run_on_apply(partial(self._mark_watchlist_alerted, aircraft))
+            else:
+                self._mark_watchlist_alerted(aircraft)
+        elif not self.meshtastic_manager:
+            logger.debug(f"Meshtastic not available, skipping alert for {aircraft.icao}")
+        else:
+            logger.warning(f"Failed to send watchlist alert for {aircraft.icao}")
+    
+    def _mark_watchlist_alerted(self, aircraft) -> None:
+        """Record a sent watchlist alert on an aircraft that is still tracked."""
+        if self.aircraft_tracker.get_aircraft_by_address(aircraft.address) is not aircraft:
+            return
+        aircraft.mark_watchlist_alerted()
+        self.aircraft_tracker.mark_dirty(aircraft.icao)
+        logger.info(f"Watchlist alert sent for {aircraft.icao} (alert #{aircraft.watchlist_alert_count})")
+    
     def update_status(self) -> None:
         """Update status JSON file periodically."""
         while self.running and not self.stop_event.is_set():
@@ -1557,7 +2034,7 @@ class ADSBReceiver:
                     "current_message_rate": message_stats["current_rate"],
                     "valid_message_rate": message_stats["valid_rate"],
                     "aircraft_count": self.aircraft_tracker.get_aircraft_count(),
-                    "watchlist_count": len(self.config.get_watchlist()),
+                    "watchlist_count": len(self.config.snapshot.watchlist),
                     "uptime": str(datetime.now() - self.start_time),
                     "message_statistics": message_stats,
                     "aircraft_statistics": self.aircraft_tracker.get_statistics(),
@@ -1572,8 +2049,8 @@ class ADSBReceiver:
                     "last_health_check": health_status.get('last_health_check', 0)
                 }
                 
-                with open("status.json", 'w') as f:
-                    json.dump(status, f, indent=2)
+                atomic_write("status.json", json.dumps(status, indent=2))
+                self._publish_live_state(status)
                     
             except Exception as e:
                 logger.error(f"Error updating status: {e}")
@@ -1581,28 +2058,43 @@ class ADSBReceiver:
             # Wait 5 seconds before next update
             self.stop_event.wait(5)
     
-    def _on_config_reload(self, new_config: dict) -> None:
-        """Handle configuration reload events, particularly watchlist updates."""
+    def _publish_live_state(self, status: Dict[str, Any]) -> None:
+        """Publish aircraft and status data to the dashboard's shared-memory channel."""
         try:
-            logger.info("Configuration reloaded, updating watchlist...")
-            
-            # Update watchlist from new configuration
-            watchlist_data = new_config.get('watchlist', [])
+            path = self.config.snapshot.receiver.live_state_path
+            if not path:
+                return
             
-            # Convert to watchlist entries format
-            from config import WatchlistEntry
-            watchlist_entries = []
-            for entry in watchlist_data:
-                if isinstance(entry, dict):
-                    watchlist_entries.append(WatchlistEntry(
-                        icao=entry.get('icao', ''),
-                        name=entry.get('name', '')
-                    ))
+            if self.live_state is None or self.live_state.path != path:
+                self._close_live_state()
+                self.live_state = LiveStateWriter(path)
             
-            # Update aircraft tracker with new watchlist
-            self.aircraft_tracker.update_watchlist(watchlist_entries)
+            self.live_state.publish_json('{"aircraft_data":%s,"status":%s}' % (
+                self.aircraft_tracker.get_export_json(), json.dumps(status)))
             
-            logger.info(f"Watchlist updated with {len(watchlist_entries)} entries")
+        except Exception as e:
+            logger.error(f"Error publishing live state: {e}")
+    
+    def _close_live_state(self) -> None:
+        """Unmap the shared-memory live state channel."""
+        if self.live_state:
+            self.live_state.close()
+            self.live_state = None
+    
+    def _on_config_reload(self, new_config: dict) -> None:
+        """Handle configuration reload events: record what changed for the next cleanup to apply."""
+        try:
+            logger.info("Configuration reloaded")
+            snapshot = self.config.snapshot
+            
+            # Runs on the config watcher thread, so only hand the new settings over;
+            # run_cleanup applies them on the thread that owns the aircraft state
+            if snapshot.watchlist != self._watchlist:
+                self._watchlist = snapshot.watchlist
+            if snapshot.geofences != self._geofence_zones:
+                self._geofence_zones = snapshot.geofences
+            if snapshot.rules != self._alert_rules:
+                self._alert_rules = snapshot.rules
             
         except Exception as e:
             logger.error(f"Error handling config reload: {e}")
@@ -1610,54 +2102,99 @@ class ADSBReceiver:
     def cleanup_loop(self) -> None:
         """Periodic cleanup of stale aircraft and position cache."""
         while self.running and not self.stop_event.is_set():
-            try:
-                # Clean up stale aircraft
-                self.aircraft_tracker.cleanup_stale(300)  # 5 minute timeout
-                
-                # Clean up position cache
-                self._cleanup_position_cache()
-                
-            except Exception as e:
-                logger.error(f"Error during cleanup: {e}")
-                
-            # Wait 60 seconds before next cleanup
-            self.stop_event.wait(60)
+            self.request_cleanup()
+                
+            # Expiry only touches what is due, so run it every second
+            self.stop_event.wait(1)
+    
+    def request_cleanup(self) -> None:
+        """Run cleanup on the thread that applies updates, which owns the aircraft state."""
+        if self.pipeline and self.pipeline.is_running():
+            self.pipeline.request_cleanup()
+        elif self.processing_thread and self.processing_thread.is_alive():
+            self._cleanup_requested.set()
+        else:
+            # Updates are applied inline on this thread (asyncio engine without the pipeline)
+            self.run_cleanup()
+    
+    def run_cleanup(self) -> None:
+        """Expire stale aircraft and CPR state that have come due, and apply reloaded settings."""
+        try:
+            # Runs on the thread publishing deltas, so new subscribers' snapshots stay in order
+            if self.push_server:
+                self.push_server.attach_subscribers()
+
+            receiver_config = self.config.snapshot.receiver
+            tracker = self.aircraft_tracker
+            tracker.airborne_timeout = receiver_config.aircraft_timeout
+            tracker.surface_timeout = receiver_config.surface_aircraft_timeout
+            self.cpr.position_timeout = receiver_config.cpr_timeout
+            
+            # Expire stale aircraft
+            tracker.expire()
+            self.geofences.prune(receiver_config.aircraft_timeout, time.monotonic())
+            
+            # Apply a reloaded watchlist, zones and rules, keeping the state of what did not change
+            watchlist = self._watchlist
+            if watchlist is not self._applied_watchlist:
+                self._applied_watchlist = watchlist
+                tracker.update_watchlist(list(watchlist))
+            zones = self._geofence_zones
+            if zones is not self._built_geofence_zones:
+                self._built_geofence_zones = zones
+                geofences = GeofenceEngine(zones)
+                geofences.inherit(self.geofences)
+                self.geofences = geofences
+                logger.info(f"Geofences updated with {len(geofences)} zones")
+            rules = self._alert_rules
+            if rules is not self._compiled_rules:
+                self._compiled_rules = rules
+                self._build_rule_engine(rules)
+                logger.info(f"Alert rules updated with {len(self.rules)} rules")
+            self.rules.set_reference(receiver_config.reference_lat, receiver_config.reference_lon)
+            self.rules.prune(lambda address: tracker.get_aircraft_by_address(address) is not None)
+            
+            # Clean up position cache
+            self._cleanup_position_cache()
+            
+        except Exception as e:
+            logger.error(f"Error during cleanup: {e}")
     
     def health_monitor_loop(self) -> None:
         """Monitor system health and restart components if needed."""
         while self.running and not self.stop_event.is_set():
-            try:
-                # Check and restart dump1090/HackRF if needed
-                if not self.dump1090_manager.restart_if_needed():
-                    logger.warning("Failed to restart dump1090/HackRF")
-                
-                # Check and reconnect Meshtastic if needed
-                if self.meshtastic_manager and not self.meshtastic_manager.reconnect_if_needed():
-                    logger.debug("Meshtastic reconnection not needed or failed")
-                    
-            except Exception as e:
-                logger.error(f"Error in health monitor: {e}")
+            self.run_health_checks()
                 
             # Wait 30 seconds before next health check
             self.stop_event.wait(30)
     
-    def _update_message_rate(self) -> None:
-        """Update message rate tracking window."""
+    def run_health_checks(self) -> None:
+        """Restart dump1090/HackRF and reconnect Meshtastic if needed."""
         try:
-            current_time = datetime.now()
-            
-            # Add current message to rate window
-            self.message_rate_window.append(current_time)
-            
-            # Remove messages older than window size
-            cutoff_time = current_time - timedelta(seconds=self.rate_window_size)
-            self.message_rate_window = [
-                msg_time for msg_time in self.message_rate_window 
-                if msg_time > cutoff_time
-            ]
+            # Check and restart dump1090/HackRF if needed
+            if not self.dump1090_manager.restart_if_needed():
+                logger.warning("Failed to restart dump1090/HackRF")
             
+            # Check and reconnect Meshtastic if needed
+            if self.meshtastic_manager and not self.meshtastic_manager.reconnect_if_needed():
+                logger.debug("Meshtastic reconnection not needed or failed")
+                
         except Exception as e:
-            logger.error(f"Error updating message rate: {e}")
+            logger.error(f"Error in health monitor: {e}")
+    
+    def _update_message_rate(self) -> None:
+        """Update message rate tracking."""
+        self.message_meter.mark()
+    
+    def _record_valid(self) -> None:
+        """Count a successfully decoded message."""
+        self.valid_message_count += 1
+        self.valid_meter.mark()
+    
+    def _record_error(self) -> None:
+        """Count a message that failed validation or decoding."""
+        self.error_count += 1
+        self.error_meter.mark()
     
     def get_message_rate(self) -> float:
         """Calculate current message rate per second (overall average)."""
@@ -1669,11 +2206,7 @@ class ADSBReceiver:
     def get_current_message_rate(self) -> float:
         """Calculate current message rate per second (recent window)."""
         try:
-            if len(self.message_rate_window) < 2:
-                return 0.0
-                
-            # Calculate rate based on messages in the current window
-            return round(len(self.message_rate_window) / self.rate_window_size, 1)
+            return round(self.message_meter.rate(60), 1)
             
         except Exception as e:
             logger.error(f"Error calculating current message rate: {e}")
@@ -1701,7 +2234,27 @@ class ADSBReceiver:
             "success_percentage": round((self.valid_message_count / max(self.message_count, 1)) * 100, 1),
             "uptime_seconds": round(uptime, 1),
             "last_message_age": round((datetime.now() - self.last_message_time).total_seconds(), 1),
-            "position_cache_size": len(self.position_cache)
+            "position_cache_size": len(self.cpr),
+            "cpr": self.cpr.get_statistics(),
+            "crc_failures": self.crc_failures,
+            "crc_corrected": self.crc_corrected,
+            "address_filter": self.known_addresses.get_statistics(),
+            "geofences": self.geofences.get_statistics(),
+            "rules": self.rules.get_statistics(),
+            "track_history": (self.aircraft_tracker.history.get_statistics()
+                              if self.aircraft_tracker.history else None),
+            "rates": self._get_rates(),
+            "pipeline": self.pipeline.get_statistics() if self.pipeline else None,
+            "push_api": self.push_server.get_statistics() if self.push_server else None,
+            "recorder": self.recorder.get_statistics() if self.recorder else None
+        }
+    
+    def _get_rates(self) -> Dict[str, Any]:
+        """Get 1/5/15-minute total, valid and error message rates."""
+        return {
+            "total": self.message_meter.get_rates(),
+            "valid": self.valid_meter.get_rates(),
+            "error": self.error_meter.get_rates()
         }
     
     def update_radio_settings(self, frequency: int = None, lna_gain: int = None, 
@@ -1789,15 +2342,15 @@ class ADSBReceiver:
                 "hackrf_connected": self.dump1090_manager.hackrf_connected,
                 "meshtastic_connected": meshtastic_health.get('connected', False),
                 "aircraft_count": self.aircraft_tracker.get_aircraft_count(),
-                "watchlist_count": len(self.config.get_watchlist()),
+                "watchlist_count": len(self.config.snapshot.watchlist),
                 "uptime": str(datetime.now() - self.start_time),
                 "message_rate": self.get_message_rate(),
                 "total_messages": self.message_count,
                 "last_update": datetime.now().isoformat()
             }
             
-            with open("status.json", 'w') as f:
-                json.dump(status_data, f, indent=2)
+            atomic_write("status.json", json.dumps(status_data, indent=2))
+            self._publish_live_state(status_data)
                 
         except Exception as e:
             logger.error(f"Error updating status files: {e}")
@@ -1832,12 +2385,19 @@ class ADSBReceiver:
             # Connect to Meshtastic
             self._initialize_meshtastic()
             
+            if self.config.snapshot.receiver.engine == "asyncio":
+                return self._run_async_engine()
+            
             # Start message processing
+            self._start_pipeline()
+            self._start_push_server()
+            self._start_recorder()
             if not self._start_message_processing():
                 return False
             
-            # Start configuration watching
+            # Start configuration watching, applying reloaded watchlist, zones and rules
             self.config.start_watching()
+            self.config.register_reload_callback(self._on_config_reload)
             
             self.running = True
             self.start_time = datetime.now()
@@ -1869,9 +2429,18 @@ class ADSBReceiver:
             self.stop_event.set()
             
             # Stop message processing
+            if self.async_engine:
+                self.async_engine.request_stop()
             if self.processing_thread and self.processing_thread.is_alive():
                 self.processing_thread.join(timeout=5)
             
+            # Drain and stop the ingest pipeline
+            if self.pipeline:
+                self.pipeline.stop()
+            
+            self._stop_push_server()
+            self._stop_recorder()
+            
             # Close TCP connection
             if self.tcp_socket:
                 self.tcp_socket.close()
@@ -1882,8 +2451,11 @@ class ADSBReceiver:
                 self.meshtastic_manager.disconnect()
             
             # Stop configuration watching
+            self.config.unregister_reload_callback(self._on_config_reload)
             self.config.stop_watching()
             
+            self._close_live_state()
+            
             logger.info("ADS-B receiver stopped")
             
         except Exception as e:
@@ -1984,6 +2556,34 @@ class ADSBReceiver:
                 error_code="MESHTASTIC_INIT_ERROR"
             )
     
+    def _run_async_engine(self) -> bool:
+        """Run dump1090, Meshtastic and status I/O on a single asyncio event loop."""
+        try:
+            self._start_pipeline()
+            self._start_push_server()
+            self._start_recorder()
+            self.config.start_watching()
+            self.config.register_reload_callback(self._on_config_reload)
+            
+            self.running = True
+            self.start_time = datetime.now()
+            logger.info("ADS-B receiver started successfully (asyncio engine)")
+            
+            self.async_engine = AsyncReceiverEngine(self)
+            self.async_engine.run()
+            return True
+            
+        except Exception as e:
+            error_handler.handle_error(
+                ComponentType.RECEIVER,
+                ErrorSeverity.CRITICAL,
+                f"Error in asyncio engine: {str(e)}",
+                error_code="ASYNC_ENGINE_ERROR"
+            )
+            return False
+        finally:
+            self.stop()
+    
     def _start_message_processing(self) -> bool:
         """Start TCP connection and message processing thread."""
         try:
@@ -2014,8 +2614,7 @@ class ADSBReceiver:
                 self.tcp_socket.close()
             
             # Get configured port
-            config_data = self.config.load()
-            dump1090_port = config_data.get('dump1090_port', 30005)
+            dump1090_port = self.config.snapshot.dump1090_port
             
             self.tcp_socket = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
             self.tcp_socket.settimeout(5.0)
@@ -2053,6 +2652,9 @@ class ADSBReceiver:
                     self._update_status_files()
                     last_status_update = current_time
                 
+                # Expire stale aircraft, CPR, zone and rule state
+                self.request_cleanup()
+                
                 # Sleep briefly
                 time.sleep(1)
                 
@@ -2194,12 +2796,16 @@ class ADSBReceiver:
     def _message_processing_loop(self) -> None:
         """Message processing loop with error handling."""
         try:
-            buffer = ""
+            self._reset_stream_state()
             
             while not self.stop_event.is_set():
+                if self._cleanup_requested.is_set():
+                    self._cleanup_requested.clear()
+                    self.run_cleanup()
+                
                 try:
                     # Read data from TCP socket
-                    data = self.tcp_socket.recv(1024).decode('utf-8', errors='ignore')
+                    data = self.tcp_socket.recv(4096)
                     if not data:
                         error_handler.handle_error(
                             ComponentType.RECEIVER,
@@ -2209,14 +2815,8 @@ class ADSBReceiver:
                         )
                         break
                     
-                    buffer += data
-                    
-                    # Process complete messages
-                    while '\n' in buffer:
-                        line, buffer = buffer.split('\n', 1)
-                        if line.strip():
-                            self._process_message(line.strip())
-                            self.last_successful_message = datetime.now()
+                    self._handle_stream_data(data)
+                    self.last_successful_message = datetime.now()
                     
                 except socket.timeout:
                     # Timeout is normal, continue
@@ -2321,10 +2921,12 @@ class ADSBReceiver:
                 "hackrf_connected": self.dump1090_manager.hackrf_connected,
                 "meshtastic_connected": self.meshtastic_manager.is_connected() if self.meshtastic_manager else False,
                 "aircraft_count": self.aircraft_tracker.get_aircraft_count(),
-                "watchlist_count": len(self.config.get_watchlist()),
+                "watchlist_count": len(self.config.snapshot.watchlist),
                 "uptime": str(datetime.now() - self.start_time),
-                "message_rate": 0.0,  # Would be calculated from message processor
-                "total_messages": 0,  # Would be from message processor
+                "message_rate": self.get_current_message_rate(),
+                "total_messages": self.message_count,
+                "rates": self._get_rates(),
+                "message_statistics": self.get_message_statistics(),
                 "consecutive_errors": self.consecutive_errors,
                 "recovery_attempts": self.recovery_attempts,
                 "last_successful_message": self.last_successful_message.isoformat(),
@@ -2337,8 +2939,8 @@ class ADSBReceiver:
                 "last_update": datetime.now().isoformat()
             }
             
-            with open("status.json", 'w') as f:
-                json.dump(status_data, f, indent=2)
+            atomic_write("status.json", json.dumps(status_data, indent=2))
+            self._publish_live_state(status_data)
                 
         except Exception as e:
             error_handler.handle_error(
@@ -0,0 +1,276 @@
+"""
+Raw dump1090 stream recorder for the Ursine Capture receiver.
+
+Tees the byte stream received from dump1090, before any decoding, into
+rotating compressed capture segments (zstd when the zstandard package is
+installed, gzip otherwise). Compression and disk writes happen on a writer
+thread; the receiver only does a non-blocking queue put, and chunks are
+dropped and counted if the writer falls behind.
+
+Each closed segment is appended to index.jsonl in the capture directory:
+
+    {"file": "capture-20240101-120000.raw.gz", "started": 1704110400.0,
+     "ended": 1704110700.0, "bytes": 1234567, "chunks": 4321,
+     "stream_start": true, "offsets": [[0.0, 0], [0.1, 2048], ...]}
+
+where offsets map seconds since the segment started to uncompressed byte
+offsets, so replay.py can reproduce the original timing of any stream, and
+stream_start marks segments that begin a new dump1090 connection.
+"""
+
+import gzip
+import json
+import logging
+import os
+import queue
+import time
+from threading import Thread, Event
+from typing import Any, Dict, List, Optional
+
+from utils import atomic_write
+
+try:
+    import zstandard
+except ImportError:
+    zstandard = None
+
+
+logger = logging.getLogger(__name__)
+
+
+INDEX_FILENAME = "index.jsonl"
+
+# Resolution of the time -> byte offset index
+INDEX_INTERVAL = 0.1
+
+# Queue marker: the stream restarted (new dump1090 connection), start a new segment
+_NEW_SEGMENT = object()
+
+
+def load_index(directory: str) -> List[Dict[str, Any]]:
+    """Load the segment index of a capture directory, oldest first."""
+    entries = []
+    try:
+        with open(os.path.join(directory, INDEX_FILENAME), 'r') as f:
+            for line in f:
+                line = line.strip()
+                if line:
+                    try:
+                        entries.append(json.loads(line))
+                    except ValueError:
+                        logger.warning(f"Skipping corrupt capture index line in {directory}")
+    except FileNotFoundError:
+        pass
+    return entries
+
+
+class StreamRecorder:
+    """Buffers raw stream chunks and writes them to rotating compressed segments."""
+
+    def __init__(self, directory: str, segment_seconds: int = 300, segment_bytes: int = 64 * 1024 * 1024,
+                 max_segments: int = 288, compression: str = "zstd", queue_size: int = 10000):
+        self.directory = directory
+        self.segment_seconds = segment_seconds
+        self.segment_bytes = segment_bytes
+        self.max_segments = max_segments
+
+        if compression == "zstd" and zstandard is None:
+            logger.info("zstandard not installed, recording with gzip")
+            compression = "gzip"
+        self.compression = compression
+
+        self.queue = queue.Queue(maxsize=queue_size)
+        self.thread: Optional[Thread] = None
+        self.stop_event = Event()
+
+        # Current segment (writer thread only)
+        self._file = None
+        self._raw_file = None
+        self._path: Optional[str] = None
+        self._started = 0.0
+        self._last = 0.0
+        self._bytes = 0
+        self._chunks = 0
+        self._offsets: List[List[float]] = []
+        self._next_index_time = 0.0
+        self._stream_start = True  # next segment begins a new dump1090 connection
+        self._segment_stream_start = True
+
+        self.index: List[Dict[str, Any]] = []
+
+        # Statistics
+        self.chunks_recorded = 0
+        self.bytes_recorded = 0
+        self.chunks_dropped = 0
+        self.segments_written = 0
+
+    def start(self) -> bool:
+        """Create the capture directory and start the writer thread."""
+        try:
+            os.makedirs(self.directory, exist_ok=True)
+            self.index = load_index(self.directory)
+
+            self.stop_event.clear()
+            self.thread = Thread(target=self._writer_loop, name="stream-recorder", daemon=True)
+            self.thread.start()
+            logger.info(f"Recording dump1090 stream to {self.directory} ({self.compression})")
+            return True
+
+        except Exception as e:
+            logger.error(f"Failed to start stream recorder: {e}")
+            return False
+
+    def stop(self) -> None:
+        """Flush queued data, close the open segment and stop the writer thread."""
+        if not self.thread:
+            return
+        self.stop_event.set()
+        self.thread.join(timeout=10)
+        self.thread = None
+        logger.info("Stream recorder stopped")
+
+    def is_running(self) -> bool:
+        """Check if the writer thread is running."""
+        return self.thread is not None and self.thread.is_alive()
+
+    def write(self, data: bytes) -> None:
+        """Queue a chunk received from dump1090. Never blocks."""
+        try:
+            self.queue.put_nowait((time.time(), data))
+        except queue.Full:
+            self.chunks_dropped += 1
+
+    def new_segment(self) -> None:
+        """Start a new segment at the next chunk (called on reconnect)."""
+        try:
+            self.queue.put_nowait(_NEW_SEGMENT)
+        except queue.Full:
+            pass
+
+    def get_statistics(self) -> Dict[str, Any]:
+        """Get recorder statistics."""
+        return {
+            "directory": self.directory,
+            "compression": self.compression,
+            "chunks_recorded": self.chunks_recorded,
+            "bytes_recorded": self.bytes_recorded,
+            "chunks_dropped": self.chunks_dropped,
+            "segments_written": self.segments_written,
+            "queue_depth": self.queue.qsize()
+        }
+
+    def _writer_loop(self) -> None:
+        """Writer thread: compress queued chunks into the current segment."""
+        while not (self.stop_event.is_set() and self.queue.empty()):
+            try:
+                item = self.queue.get(timeout=0.5)
+            except queue.Empty:
+                if self._file and time.time() - self._started >= self.segment_seconds:
+                    self._close_segment()
+                continue
+
+            try:
+                if item is _NEW_SEGMENT:
+                    self._close_segment()
+                    self._stream_start = True
+                    continue
+
+                timestamp, data = item
+                if self._file and (timestamp - self._started >= self.segment_seconds or
+                                   self._bytes >= self.segment_bytes):
+                    self._close_segment()
+                if self._file is None:
+                    self._open_segment(timestamp)
+
+                if timestamp >= self._next_index_time:
+                    self._offsets.append([round(timestamp - self._started, 3), self._bytes])
+                    self._next_index_time = timestamp + INDEX_INTERVAL
+
+                self._file.write(data)
+                self._last = timestamp
+                self._bytes += len(data)
+                self._chunks += 1
+                self.chunks_recorded += 1
+                self.bytes_recorded += len(data)
+
+            except Exception as e:
+                logger.error(f"Error writing capture segment: {e}")
+                self._close_segment()
+
+        self._close_segment()
+
+    def _open_segment(self, timestamp: float) -> None:
+        """Open a new compressed segment file."""
+        suffix = ".raw.zst" if self.compression == "zstd" else ".raw.gz"
+        name = time.strftime("capture-%Y%m%d-%H%M%S", time.localtime(timestamp)) + suffix
+        path = os.path.join(self.directory, name)
+        if os.path.exists(path) or any(entry.get('file') == name for entry in self.index[-5:]):
+            name = name.replace(suffix, f"-{int(timestamp * 1000) % 1000:03d}{suffix}")
+            path = os.path.join(self.directory, name)
+
+        # Written under a .part name until the index entry exists
+        self._raw_file = open(path + ".part", 'wb')
+        if self.compression == "zstd":
+            self._file = zstandard.ZstdCompressor(level=3).stream_writer(self._raw_file)
+        else:
+            self._file = gzip.GzipFile(filename=name, mode='wb', compresslevel=6, fileobj=self._raw_file)
+
+        self._path = path
+        self._started = self._last = timestamp
+        self._segment_stream_start = self._stream_start
+        self._stream_start = False
+        self._bytes = 0
+        self._chunks = 0
+        self._offsets = []
+        self._next_index_time = timestamp
+
+    def _close_segment(self) -> None:
+        """Finish the current segment and record it in the index."""
+        if self._file is None:
+            return
+        try:
+            self._file.close()
+            if not self._raw_file.closed:
+                self._raw_file.close()
+            os.replace(self._path + ".part", self._path)
+
+            entry = {
+                "file": os.path.basename(self._path),
+                "started": round(self._started, 3),
+                "ended": round(self._last, 3),
+                "bytes": self._bytes,
+                "chunks": self._chunks,
+                "stream_start": self._segment_stream_start,
+                "offsets": self._offsets
+            }
+            self.index.append(entry)
+            with open(os.path.join(self.directory, INDEX_FILENAME), 'a') as f:
+                f.write(json.dumps(entry, separators=(',', ':')) + "\n")
+            self.segments_written += 1
+            logger.debug(f"Closed capture segment {entry['file']} ({self._bytes} bytes)")
+
+            self._apply_retention()
+
+        except Exception as e:
+            logger.error(f"Error closing capture segment: {e}")
+        finally:
+            self._file = None
+            self._raw_file = None
+            self._path = None
+
+    def _apply_retention(self) -> None:
+        """Delete the oldest segments beyond max_segments."""
+        if self.max_segments <= 0 or len(self.index) <= self.max_segments:
+            return
+
+        expired = self.index[:-self.max_segments]
+        self.index = self.index[-self.max_segments:]
+        for entry in expired:
+            try:
+                os.remove(os.path.join(self.directory, entry['file']))
+            except OSError:
+                pass
+
+        atomic_write(os.path.join(self.directory, INDEX_FILENAME),
+                     "".join(json.dumps(entry, separators=(',', ':')) + "\n" for entry in self.index))
+        logger.info(f"Removed {len(expired)} expired capture segments")
@@ -0,0 +1,333 @@
+#!/usr/bin/env python3
+"""
+Replay recorded dump1090 streams into the receiver without a HackRF.
+
+Captures are fed through ADSBReceiver._handle_stream_data, the same entry
+point the dump1090 socket uses, so parsing, decoding, the ingest pipeline and
+the tracker all run exactly as they do live. Supported captures (optionally
+gzip-compressed):
+
+    Beast binary (dump1090 --net-bo-port), timed by the 12 MHz MLAT clock
+    SBS/BaseStation text, timed by the generated date/time fields
+    AVR raw text (*8D...;), untimed, so replayed as fast as possible
+    A recorder.py capture directory, timed by its segment index
+
+Usage: python replay.py <capture file or directory> [speed|max] [config.json]
+"""
+
+import gzip
+import json
+import logging
+import os
+import sys
+import time
+from datetime import datetime
+from threading import Event
+from typing import Any, BinaryIO, Dict, Iterator, Optional, Tuple
+
+from beast import BeastDecoder, encode_frame, BEAST_ESCAPE
+from recorder import load_index
+
+try:
+    import zstandard
+except ImportError:
+    zstandard = None
+
+
+logger = logging.getLogger(__name__)
+
+
+# Matches the socket read size in the receiver, so chunks look like live reads
+CHUNK_SIZE = 4096
+
+# Capture-time jumps larger than this (or backwards) are replayed as no gap
+MAX_GAP_SECONDS = 60.0
+
+
+ZSTD_MAGIC = b'\x28\xb5\x2f\xfd'
+
+# Empty record marking a new dump1090 connection in a recording
+STREAM_RESET = b''
+
+
+def open_capture(path: str) -> BinaryIO:
+    """Open a capture file, transparently decompressing gzip or zstd."""
+    with open(path, 'rb') as f:
+        magic = f.read(4)
+    if magic[:2] == b'\x1f\x8b':
+        return gzip.open(path, 'rb')
+    if magic == ZSTD_MAGIC:
+        if zstandard is None:
+            raise RuntimeError(f"{path} is zstd compressed, install zstandard to replay it")
+        return zstandard.ZstdDecompressor().stream_reader(open(path, 'rb'), closefd=True)
+    return open(path, 'rb')
+
+
+def _sbs_timestamp(line: bytes) -> Optional[float]:
+    """Get the generated timestamp of an SBS line in epoch seconds."""
+    parts = line.split(b',', 8)
+    if len(parts) < 8 or not parts[6] or not parts[7]:
+        return None
+    try:
+        text = (parts[6] + b' ' + parts[7]).decode('ascii')
+        return datetime.strptime(text, '%Y/%m/%d %H:%M:%S.%f').timestamp()
+    except ValueError:
+        return None
+
+
+class CaptureReader:
+    """Iterates a capture as (capture time in seconds or None, bytes) records."""
+
+    def __init__(self, path: str, timed: bool = True):
+        self.path = path
+        self.timed = timed
+        self.format: Optional[str] = None
+
+    def __iter__(self) -> Iterator[Tuple[Optional[float], bytes]]:
+        if os.path.isdir(self.path):
+            self.format = 'recording'
+            yield from self._read_recording(self.path)
+            return
+
+        with open_capture(self.path) as f:
+            first = f.read(CHUNK_SIZE)
+            if not first:
+                return
+
+            self.format = 'beast' if first[0] == BEAST_ESCAPE else 'text'
+            logger.info(f"Replaying {self.format} capture {self.path}")
+
+            if self.format == 'beast':
+                yield from self._read_beast(f, first)
+            else:
+                yield from self._read_text(f, first)
+
+    def _read_recording(self, directory: str) -> Iterator[Tuple[Optional[float], bytes]]:
+        """Replay recorder segments, timed by their index offsets."""
+        entries = load_index(directory)
+        if not entries:
+            logger.warning(f"No indexed capture segments in {directory}")
+        logger.info(f"Replaying {len(entries)} recorded segments from {directory}")
+
+        for entry in entries:
+            if entry.get('stream_start'):
+                yield (None, STREAM_RESET)
+
+            offsets = entry.get('offsets') or [[0.0, 0]]
+            started = entry['started']
+            try:
+                f = open_capture(os.path.join(directory, entry['file']))
+            except OSError as e:
+                logger.warning(f"Skipping capture segment {entry['file']}: {e}")
+                continue
+
+            with f:
+                for i, (offset_seconds, position) in enumerate(offsets):
+                    end = offsets[i + 1][1] if i + 1 < len(offsets) else None
+                    capture_time = started + offset_seconds if self.timed else None
+                    remaining = end - position if end is not None else None
+                    while remaining is None or remaining > 0:
+                        size = CHUNK_SIZE if remaining is None else min(CHUNK_SIZE, remaining)
+                        data = f.read(size)
+                        if not data:
+                            break
+                        if remaining is not None:
+                            remaining -= len(data)
+                        yield (capture_time, data)
+
+    def _read_beast(self, f: BinaryIO, data: bytes) -> Iterator[Tuple[Optional[float], bytes]]:
+        """Split a Beast capture into frames timed by their MLAT timestamps."""
+        decoder = BeastDecoder()
+        while data:
+            for frame in decoder.feed(data):
+                # Re-encoding gives back the exact escaped bytes dump1090 sent
+                yield (frame.seconds if self.timed else None,
+                       encode_frame(frame.frame_type, frame.message, frame.timestamp, frame.signal))
+            data = f.read(CHUNK_SIZE)
+
+    def _read_text(self, f: BinaryIO, data: bytes) -> Iterator[Tuple[Optional[float], bytes]]:
+        """Split a text capture into lines, timing SBS lines by their generated time."""
+        partial = b''
+        while data:
+            lines = (partial + data).split(b'\n')
+            partial = lines.pop()
+            for line in lines:
+                timestamp = _sbs_timestamp(line) if self.timed and line.startswith(b'MSG') else None
+                yield (timestamp, line + b'\n')
+            data = f.read(CHUNK_SIZE)
+        if partial:
+            yield (None, partial + b'\n')
+
+
+class ReplayEngine:
+    """Feeds a capture into a receiver at 1x, Nx or maximum speed."""
+
+    def __init__(self, receiver, path: str, speed: float = 1.0):
+        self.receiver = receiver
+        self.path = path
+        self.speed = speed  # <= 0 replays as fast as possible
+        self.stop_event = Event()
+
+        self._buffer = bytearray()
+        self._capture_base: Optional[float] = None
+        self._last_capture: Optional[float] = None
+        self._wall_start = 0.0
+
+        # Statistics
+        self.records = 0
+        self.chunks = 0
+        self.bytes_sent = 0
+        self.max_lag = 0.0
+        self.elapsed = 0.0
+        self.capture_seconds = 0.0
+
+    def run(self) -> Dict[str, Any]:
+        """Replay the whole capture and return statistics."""
+        reader = CaptureReader(self.path, timed=self.speed > 0)
+        self.receiver.reset_stream_parser()
+
+        start = time.perf_counter()
+        self._wall_start = time.monotonic()
+        try:
+            for capture_time, data in reader:
+                if self.stop_event.is_set():
+                    break
+                if capture_time is not None:
+                    self._pace(capture_time)
+
+                if not data:
+                    # Recorded reconnect: hand over what we have, then reset as a new connection would
+                    self._flush()
+                    self._reset_stream()
+                    continue
+
+                self._buffer += data
+                self.records += 1
+                if len(self._buffer) >= CHUNK_SIZE:
+                    self._flush()
+
+            self._flush()
+        finally:
+            self.elapsed = time.perf_counter() - start
+
+        return self.get_statistics()
+
+    def stop(self) -> None:
+        """Stop replaying after the current record."""
+        self.stop_event.set()
+
+    def _pace(self, capture_time: float) -> None:
+        """Sleep until a record's capture time comes round at the replay speed."""
+        if self._capture_base is None:
+            self._capture_base = self._last_capture = capture_time
+            return
+
+        gap = capture_time - self._last_capture
+        if gap < 0 or gap > MAX_GAP_SECONDS:
+            # Clock reset or long silence in the capture: carry on without a pause
+            self._capture_base += gap
+        self._last_capture = capture_time
+
+        offset = capture_time - self._capture_base
+        self.capture_seconds = offset
+        wait = self._wall_start + offset / self.speed - time.monotonic()
+        if wait > 0:
+            # Deliver everything due before sleeping, as the socket would
+            self._flush()
+            self.stop_event.wait(wait)
+        elif -wait > self.max_lag:
+            self.max_lag = -wait
+
+    def _reset_stream(self) -> None:
+        """Reset the receiver's stream parser in order with the data already handed over."""
+        pipeline = self.receiver.pipeline
+        if pipeline and pipeline.is_running():
+            pipeline.submit_reset(discard=False)
+        else:
+            self.receiver.reset_stream_parser()
+
+    def _flush(self) -> None:
+        """Hand buffered bytes to the receiver like a socket read."""
+        if not self._buffer:
+            return
+        data = bytes(self._buffer)
+        self._buffer.clear()
+
+        pipeline = self.receiver.pipeline
+        if self.speed <= 0 and pipeline and pipeline.is_running():
+            # Measuring throughput: wait for the pipeline instead of dropping
+            pipeline.submit_wait(data)
+        else:
+            self.receiver._handle_stream_data(data)
+
+        self.chunks += 1
+        self.bytes_sent += len(data)
+
+    def get_statistics(self) -> Dict[str, Any]:
+        """Get replay statistics."""
+        return {
+            "capture": self.path,
+            "speed": self.speed if self.speed > 0 else "max",
+            "records": self.records,
+            "chunks": self.chunks,
+            "bytes": self.bytes_sent,
+            "elapsed_seconds": round(self.elapsed, 3),
+            "capture_seconds": round(self.capture_seconds, 3),
+            "records_per_sec": round(self.records / self.elapsed, 1) if self.elapsed > 0 else 0.0,
+            "max_lag_seconds": round(self.max_lag, 3)
+        }
+
+
+def replay_capture(path: str, speed: float = 1.0, config_path: str = "config.json") -> Dict[str, Any]:
+    """Replay a capture into a fresh receiver (no dump1090, no Meshtastic)."""
+    from receiver import ADSBReceiver
+
+    receiver = ADSBReceiver(config_path)
+    receiver.aircraft_tracker.update_watchlist(receiver.config.get_watchlist())
+    receiver.running = True
+    receiver._start_pipeline()
+
+    engine = ReplayEngine(receiver, path, speed)
+    try:
+        stats = engine.run()
+    except KeyboardInterrupt:
+        stats = engine.get_statistics()
+    finally:
+        # Stopping drains the pipeline queues into the tracker before counting
+        if receiver.pipeline:
+            receiver.pipeline.stop()
+        receiver.running = False
+
+    stats.update({
+        "messages": receiver.message_count,
+        "valid_messages": receiver.valid_message_count,
+        "errors": receiver.error_count,
+        "aircraft": receiver.aircraft_tracker.get_aircraft_count(),
+        "pipeline": receiver.pipeline.get_statistics() if receiver.pipeline else None
+    })
+    return stats
+
+
+def main():
+    """Replay a capture and print statistics as JSON."""
+    logging.basicConfig(level=logging.WARNING)
+
+    if len(sys.argv) < 2:
+        print("Usage: python replay.py <capture> [speed|max] [config.json]")
+        sys.exit(1)
+
+    path = sys.argv[1]
+    speed_arg = sys.argv[2] if len(sys.argv) > 2 else "1"
+    config_path = sys.argv[3] if len(sys.argv) > 3 else "config.json"
+
+    try:
+        speed = 0.0 if speed_arg == "max" else float(speed_arg.rstrip('x'))
+    except ValueError:
+        print(f"Invalid speed: {speed_arg}")
+        sys.exit(1)
+
+    print(json.dumps(replay_capture(path, speed, config_path), indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,422 @@
+"""
+Rule-based alerts over aircraft state.
+
+A rule is a boolean expression in a small Python subset over aircraft
+fields, for example:
+
+    callsign.startswith(("RCH", "CNV"))
+    altitude < 3000 and distance < 20
+    changed(squawk)
+
+Expressions are parsed with ast and compiled once into nested closures.
+The engine indexes rules by the fields they read and, for each update,
+evaluates only the rules reading a field that changed (collected as a
+bitmask over rule indices), so message cost follows the number of affected
+rules rather than the number of configured rules.
+
+A rule alerts when it becomes true for an aircraft and re-arms once it is
+false again. Rules using changed() describe events and alert every time
+they hold.
+"""
+
+import ast
+import logging
+import operator
+from dataclasses import dataclass
+from typing import Any, Callable, Dict, FrozenSet, List, Optional, Sequence, Tuple
+
+from utils import calculate_distance
+
+
+logger = logging.getLogger(__name__)
+
+
+# Aircraft fields a rule may read
+FIELDS = frozenset(('icao', 'callsign', 'altitude', 'speed', 'track', 'latitude', 'longitude',
+                    'squawk', 'vertical_rate', 'on_ground', 'spi', 'emergency', 'on_watchlist'))
+
+# Fields that never change through messages, so cannot trigger an evaluation
+STATIC_FIELDS = frozenset(('icao', 'on_watchlist'))
+
+# Derived names and the fields they read
+DERIVED = {'distance': ('latitude', 'longitude')}
+
+_COMPARISONS = {
+    ast.Lt: operator.lt,
+    ast.LtE: operator.le,
+    ast.Gt: operator.gt,
+    ast.GtE: operator.ge,
+    ast.Eq: operator.eq,
+    ast.NotEq: operator.ne,
+    ast.In: lambda left, right: left in right,
+    ast.NotIn: lambda left, right: left not in right,
+}
+
+# Comparison with its operands swapped, for putting a constant on the right
+_REFLECTED = {ast.Lt: ast.Gt, ast.LtE: ast.GtE, ast.Gt: ast.Lt, ast.GtE: ast.LtE,
+              ast.Eq: ast.Eq, ast.NotEq: ast.NotEq}
+
+_STRING_METHODS = ('startswith', 'endswith')
+
+_NAMED_CONSTANTS = {'True': True, 'False': False, 'None': None}
+
+# A predicate takes the aircraft and the names of the fields that changed
+Predicate = Callable[[Any, Sequence[str]], Any]
+
+# A value takes the aircraft
+Value = Callable[[Any], Any]
+
+
+def _no_distance(aircraft) -> Optional[float]:
+    """Distance stand-in for compiling without a reference point, e.g. to validate."""
+    return None
+
+
+class _Constant:
+    """Marker for a value known at compile time."""
+
+    def __init__(self, value: Any):
+        self.value = value
+
+
+class _Compiler:
+    """Turns one parsed expression into closures, recording the fields it reads."""
+
+    def __init__(self, distance: Value):
+        self.distance = distance
+        self.fields = set()
+        self.event = False
+
+    def predicate(self, node: ast.AST) -> Predicate:
+        """Compile a node used as a condition."""
+        if isinstance(node, ast.BoolOp):
+            operands = [self.predicate(value) for value in node.values]
+            combined = operands[-1]
+            for operand in reversed(operands[:-1]):
+                combined = self._combine(node.op, operand, combined)
+            return combined
+
+        if isinstance(node, ast.UnaryOp) and isinstance(node.op, ast.Not):
+            operand = self.predicate(node.operand)
+            return lambda aircraft, changed: not operand(aircraft, changed)
+
+        if isinstance(node, ast.Compare):
+            operands = [node.left] + node.comparators
+            tests = [self._compare(op, left, right)
+                     for op, left, right in zip(node.ops, operands[:-1], operands[1:])]
+            combined = tests[-1]
+            for test in reversed(tests[:-1]):
+                combined = self._combine(ast.And(), test, combined)
+            return combined
+
+        if isinstance(node, ast.Call):
+            return self._call(node)
+
+        # A bare value is tested for truth, e.g. "on_ground"
+        value = self.value(node)
+        if isinstance(value, _Constant):
+            constant = bool(value.value)
+            return lambda aircraft, changed: constant
+        return lambda aircraft, changed: value(aircraft)
+
+    def value(self, node: ast.AST):
+        """Compile a node used as an operand, returning a Value or a _Constant."""
+        if isinstance(node, ast.Constant):
+            return _Constant(node.value)
+
+        if isinstance(node, (ast.Set, ast.List, ast.Tuple)):
+            try:
+                items = ast.literal_eval(node)
+            except ValueError:
+                raise ValueError("collections may only hold constants")
+            return _Constant(frozenset(items) if isinstance(node, ast.Set) else tuple(items))
+
+        if isinstance(node, ast.Name):
+            name = node.id
+            if name in _NAMED_CONSTANTS:
+                return _Constant(_NAMED_CONSTANTS[name])
+            if name in DERIVED:
+                self.fields.update(DERIVED[name])
+                return self.distance
+            if name not in FIELDS:
+                raise ValueError(f"unknown field: {name}")
+            self.fields.add(name)
+            return operator.attrgetter(name)
+
+        if isinstance(node, ast.UnaryOp) and isinstance(node.op, ast.USub):
+            operand = self.value(node.operand)
+            if isinstance(operand, _Constant):
+                return _Constant(-operand.value)
+
+            def negate(aircraft):
+                value = operand(aircraft)
+                return None if value is None else -value
+            return negate
+
+        raise ValueError(f"unsupported syntax: {type(node).__name__}")
+
+    @staticmethod
+    def _combine(op: ast.boolop, first: Predicate, second: Predicate) -> Predicate:
+        if isinstance(op, ast.And):
+            return lambda aircraft, changed: first(aircraft, changed) and second(aircraft, changed)
+        return lambda aircraft, changed: first(aircraft, changed) or second(aircraft, changed)
+
+    def _compare(self, op: ast.cmpop, left_node: ast.AST, right_node: ast.AST) -> Predicate:
+        """Compile one comparison; ordering and membership tests are False for unknown values."""
+        left = self.value(left_node)
+        right = self.value(right_node)
+        if isinstance(left, _Constant) and not isinstance(right, _Constant) and type(op) in _REFLECTED:
+            left, right, op = right, left, _REFLECTED[type(op)]()
+        compare = _COMPARISONS.get(type(op))
+        if compare is None:
+            raise ValueError(f"unsupported comparison: {type(op).__name__}")
+        equality = isinstance(op, (ast.Eq, ast.NotEq))
+
+        if isinstance(left, _Constant) and isinstance(right, _Constant):
+            result = bool(compare(left.value, right.value))
+            return lambda aircraft, changed: result
+
+        if isinstance(right, _Constant):
+            constant = right.value
+            if equality:
+                return lambda aircraft, changed: compare(left(aircraft), constant)
+            if constant is None:
+                return lambda aircraft, changed: False
+            if isinstance(op, ast.In) and isinstance(constant, (frozenset, tuple)):
+                return lambda aircraft, changed: left(aircraft) in constant
+            return lambda aircraft, changed: ((value := left(aircraft)) is not None and
+                                              compare(value, constant))
+
+        if isinstance(left, _Constant):
+            # Only membership can leave a constant on the left, e.g. "'RCH' in callsign"
+            constant = left.value
+            return lambda aircraft, changed: ((value := right(aircraft)) is not None and
+                                              compare(constant, value))
+
+        if equality:
+            return lambda aircraft, changed: compare(left(aircraft), right(aircraft))
+        return lambda aircraft, changed: ((first := left(aircraft)) is not None and
+                                          (second := right(aircraft)) is not None and
+                                          compare(first, second))
+
+    def _call(self, node: ast.Call) -> Predicate:
+        if node.keywords:
+            raise ValueError("keyword arguments are not supported")
+
+        if isinstance(node.func, ast.Name) and node.func.id == 'changed':
+            if len(node.args) != 1 or not isinstance(node.args[0], ast.Name) or node.args[0].id not in FIELDS:
+                raise ValueError("changed() takes one field name")
+            name = node.args[0].id
+            self.fields.add(name)
+            self.event = True
+            return lambda aircraft, changed: name in changed
+
+        if isinstance(node.func, ast.Attribute) and node.func.attr in _STRING_METHODS:
+            if len(node.args) != 1:
+                raise ValueError(f"{node.func.attr}() takes one argument")
+            target = self.value(node.func.value)
+            argument = self.value(node.args[0])
+            if isinstance(target, _Constant) or not isinstance(argument, _Constant):
+                raise ValueError(f"{node.func.attr}() must be called on a field with a constant argument")
+            prefixes = argument.value
+            if isinstance(prefixes, frozenset):
+                prefixes = tuple(prefixes)
+            if not isinstance(prefixes, str) and not (isinstance(prefixes, tuple) and
+                                                      all(isinstance(item, str) for item in prefixes)):
+                raise ValueError(f"{node.func.attr}() needs a string or a collection of strings")
+            method = operator.methodcaller(node.func.attr, prefixes)
+            return lambda aircraft, changed: isinstance(text := target(aircraft), str) and method(text)
+
+        raise ValueError("only changed(field), .startswith() and .endswith() may be called")
+
+
+def compile_expression(expression: str, distance: Value = _no_distance) -> Tuple[Predicate, FrozenSet[str], bool]:
+    """Compile a rule expression into (predicate, fields read, is event rule); raises ValueError."""
+    try:
+        tree = ast.parse(expression.strip(), mode='eval')
+    except SyntaxError as e:
+        raise ValueError(f"syntax error: {e.msg}")
+    compiler = _Compiler(distance)
+    predicate = compiler.predicate(tree.body)
+    if not compiler.fields - STATIC_FIELDS:
+        raise ValueError("rule reads no field that changes with messages")
+    return predicate, frozenset(compiler.fields), compiler.event
+
+
+@dataclass
+class RuleMatch:
+    """A rule matching an aircraft."""
+    address: int
+    icao: str
+    rule: str
+    timestamp: float
+
+    # Rule alerts go through normal throttling
+    priority = False
+
+    @property
+    def alert_key(self) -> str:
+        """Key for de-duplicating and throttling this kind of alert."""
+        return f"{self.icao}:rule:{self.rule}"
+
+    @property
+    def alert_type(self) -> str:
+        """Alert heading, e.g. "RULE low military"."""
+        return f"RULE {self.rule}"
+
+
+@dataclass
+class _CompiledRule:
+    name: str
+    expression: str
+    predicate: Predicate
+    fields: FrozenSet[str]
+    event: bool
+
+
+class RuleEngine:
+    """Evaluates the rules affected by each aircraft update."""
+
+    # Most distinct changed-field combinations to keep evaluation plans for
+    MAX_PLANS = 1024
+
+    def __init__(self, rules: Sequence[Any] = (), reference: Tuple[float, float] = (0.0, 0.0)):
+        self.reference = reference
+        self._distance_cache: Tuple[Any, ...] = (None, None, None)  # (lat, lon, distance) of the last lookup
+
+        self.rules: List[_CompiledRule] = []
+        for rule in rules:
+            try:
+                predicate, fields, event = compile_expression(rule.expression, self._distance)
+                self.rules.append(_CompiledRule(rule.name, rule.expression, predicate, fields, event))
+            except ValueError as e:
+                logger.error(f"Invalid alert rule {rule.name}: {e}")
+
+        # field -> bitmask of the rules reading it
+        self.field_masks: Dict[str, int] = {}
+        for index, rule in enumerate(self.rules):
+            for name in rule.fields - STATIC_FIELDS:
+                self.field_masks[name] = self.field_masks.get(name, 0) | (1 << index)
+
+        # changed fields -> ((rule bit, rule), ...) to evaluate, built from the masks on first use
+        self._plans: Dict[Tuple[str, ...], Tuple[Tuple[int, _CompiledRule], ...]] = {}
+
+        # address -> bitmask of state rules currently true, only for aircraft matching any
+        self.matched: Dict[int, int] = {}
+
+        # Statistics
+        self.evaluations = 0
+        self.matches = 0
+        self.errors = 0
+
+        if self.rules:
+            logger.info(f"Compiled {len(self.rules)} alert rules over {len(self.field_masks)} fields")
+
+    def __len__(self) -> int:
+        return len(self.rules)
+
+    def set_reference(self, lat: float, lon: float) -> None:
+        """Move the point distance is measured from."""
+        if (lat, lon) != self.reference:
+            self.reference = (lat, lon)
+            self._distance_cache = (None, None, None)
+
+    def evaluate(self, aircraft, changed: Sequence[str], now: float) -> List[RuleMatch]:
+        """Evaluate the rules reading any of the changed fields and return new matches."""
+        key = tuple(changed)
+        plan = self._plans.get(key)
+        if plan is None:
+            plan = self._plan(key)
+        if not plan:
+            return []
+
+        address = aircraft.address
+        matched = self.matched.get(address, 0)
+        state = matched
+        found = []
+        self.evaluations += len(plan)
+        for bit, rule in plan:
+            try:
+                hit = rule.predicate(aircraft, changed)
+            except Exception as e:
+                self.errors += 1
+                logger.debug(f"Alert rule {rule.name} failed for {aircraft.icao}: {e}")
+                continue
+
+            if rule.event:
+                if hit:
+                    found.append(RuleMatch(address, aircraft.icao, rule.name, now))
+            elif hit:
+                if not state & bit:
+                    state |= bit
+                    found.append(RuleMatch(address, aircraft.icao, rule.name, now))
+            elif state & bit:
+                state ^= bit
+
+        if state != matched:
+            if state:
+                self.matched[address] = state
+            else:
+                del self.matched[address]
+        self.matches += len(found)
+        return found
+
+    def inherit(self, previous: 'RuleEngine') -> None:
+        """Take over match state of rules that are unchanged from a previous engine."""
+        bits = {(rule.name, rule.expression): 1 << index for index, rule in enumerate(self.rules)}
+        moves = [(1 << index, bits[(rule.name, rule.expression)])
+                 for index, rule in enumerate(previous.rules) if (rule.name, rule.expression) in bits]
+        if not moves:
+            return
+        for address, matched in previous.matched.items():
+            state = 0
+            for old_bit, new_bit in moves:
+                if matched & old_bit:
+                    state |= new_bit
+            if state:
+                self.matched[address] = state
+
+    def prune(self, is_tracked: Callable[[int], bool]) -> int:
+        """Drop match state of aircraft that are no longer tracked."""
+        stale = [address for address in self.matched if not is_tracked(address)]
+        for address in stale:
+            del self.matched[address]
+        return len(stale)
+
+    def get_statistics(self) -> Dict[str, Any]:
+        """Get rule engine statistics."""
+        return {
+            "rules": len(self.rules),
+            "indexed_fields": len(self.field_masks),
+            "plans": len(self._plans),
+            "matching_aircraft": len(self.matched),
+            "evaluations": self.evaluations,
+            "matches": self.matches,
+            "errors": self.errors
+        }
+
+    def _plan(self, changed: Tuple[str, ...]) -> Tuple[Tuple[int, _CompiledRule], ...]:
+        """Collect the rules reading any of the changed fields, in configuration order."""
+        mask = 0
+        for name in changed:
+            mask |= self.field_masks.get(name, 0)
+        plan = []
+        while mask:
+            bit = mask & -mask
+            mask ^= bit
+            plan.append((bit, self.rules[bit.bit_length() - 1]))
+        plan = tuple(plan)
+        if len(self._plans) < self.MAX_PLANS:
+            self._plans[changed] = plan
+        return plan
+
+    def _distance(self, aircraft) -> Optional[float]:
+        """Distance from the reference point in km, reused while the aircraft's position is unchanged."""
+        lat, lon = aircraft.latitude, aircraft.longitude
+        if lat is None or lon is None:
+            return None
+        cached_lat, cached_lon, distance = self._distance_cache
+        if lat != cached_lat or lon != cached_lon:
+            distance = calculate_distance(self.reference[0], self.reference[1], lat, lon)
+            self._distance_cache = (lat, lon, distance)
+        return distance
@@ -0,0 +1,188 @@
+"""
+Lat/lon grid index for range, bounding-box and nearest-neighbour queries.
+
+Positions are bucketed into fixed-size grid cells and moved between cells
+only when they cross a cell edge, so updates are O(1). Queries visit just
+the cells that can hold a match and compute exact distances for the keys
+found there, so their cost follows the number of results rather than the
+number of indexed keys.
+"""
+
+import heapq
+import math
+from typing import Dict, Hashable, Iterator, List, Optional, Set, Tuple
+
+from utils import calculate_distance
+
+
+# Kilometers per degree of latitude
+KM_PER_DEGREE = 111.195
+
+Cell = Tuple[int, int]
+
+
+class GridIndex:
+    """Keys with positions, bucketed into cell_degrees x cell_degrees cells."""
+
+    def __init__(self, cell_degrees: float = 0.5):
+        self.cell_degrees = cell_degrees
+        self.columns = int(round(360 / cell_degrees))
+        self.cells: Dict[Cell, Set[Hashable]] = {}
+        self.positions: Dict[Hashable, Tuple[float, float, Cell]] = {}
+
+    def __len__(self) -> int:
+        return len(self.positions)
+
+    def __contains__(self, key: Hashable) -> bool:
+        return key in self.positions
+
+    def update(self, key: Hashable, lat: float, lon: float) -> None:
+        """Set a key's position, moving it to another cell only if it crossed one."""
+        cell = self._cell(lat, lon)
+        previous = self.positions.get(key)
+        if previous is None or previous[2] != cell:
+            if previous is not None:
+                self._discard_from_cell(key, previous[2])
+            bucket = self.cells.get(cell)
+            if bucket is None:
+                bucket = self.cells[cell] = set()
+            bucket.add(key)
+        self.positions[key] = (lat, lon, cell)
+
+    def remove(self, key: Hashable) -> None:
+        """Drop a key."""
+        previous = self.positions.pop(key, None)
+        if previous is not None:
+            self._discard_from_cell(key, previous[2])
+
+    def position(self, key: Hashable) -> Optional[Tuple[float, float]]:
+        """Get a key's indexed position."""
+        entry = self.positions.get(key)
+        return (entry[0], entry[1]) if entry else None
+
+    def within_radius(self, lat: float, lon: float, radius_km: float) -> List[Tuple[float, Hashable]]:
+        """Get (distance km, key) for keys within radius_km, nearest first."""
+        lat_span = radius_km / KM_PER_DEGREE
+        rows = int(math.ceil(lat_span / self.cell_degrees))
+        found = []
+        for key in self._keys_in_cells(self._radius_cells(lat, lon, radius_km, rows)):
+            key_lat, key_lon, _ = self.positions[key]
+            distance = calculate_distance(lat, lon, key_lat, key_lon)
+            if distance <= radius_km:
+                found.append((distance, key))
+        found.sort(key=lambda item: item[0])
+        return found
+
+    def in_bbox(self, south: float, west: float, north: float, east: float) -> List[Hashable]:
+        """Get keys inside a bounding box; west > east crosses the antimeridian."""
+        wraps = west > east
+        last_column = int(math.floor((east + 360 if wraps else east) / self.cell_degrees))
+        columns = {self._wrap(column)
+                   for column in range(int(math.floor(west / self.cell_degrees)), last_column + 1)}
+
+        found = []
+        for row in range(self._row(south), self._row(north) + 1):
+            for column in columns:
+                for key in self.cells.get((row, column), ()):
+                    key_lat, key_lon, _ = self.positions[key]
+                    inside_lon = (key_lon >= west or key_lon <= east) if wraps else west <= key_lon <= east
+                    if south <= key_lat <= north and inside_lon:
+                        found.append(key)
+        return found
+
+    def nearest(self, lat: float, lon: float, k: int = 1,
+                max_km: Optional[float] = None) -> List[Tuple[float, Hashable]]:
+        """Get the k nearest keys as (distance km, key), nearest first."""
+        if k <= 0 or not self.positions:
+            return []
+
+        # Max-heap (negated distances) of the best k so far
+        best: List[Tuple[float, int, Hashable]] = []
+        counter = 0
+        seen = 0
+        center_row, center_column = self._cell(lat, lon)
+        max_ring = self.columns // 2
+        cell_km = self.cell_degrees * KM_PER_DEGREE
+
+        for ring in range(max_ring + 1):
+            # Anything in this ring or beyond is at least this far away
+            lon_scale = math.cos(math.radians(min(abs(lat) + ring * self.cell_degrees, 89.9)))
+            bound = max(ring - 1, 0) * cell_km * lon_scale
+            if len(best) == k and bound > -best[0][0]:
+                break
+            if max_km is not None and bound > max_km:
+                break
+            if seen == len(self.positions):
+                break
+
+            for key in self._keys_in_cells(self._ring_cells(center_row, center_column, ring)):
+                seen += 1
+                key_lat, key_lon, _ = self.positions[key]
+                distance = calculate_distance(lat, lon, key_lat, key_lon)
+                if max_km is not None and distance > max_km:
+                    continue
+                counter += 1
+                if len(best) < k:
+                    heapq.heappush(best, (-distance, counter, key))
+                elif distance < -best[0][0]:
+                    heapq.heapreplace(best, (-distance, counter, key))
+
+        return sorted(((-negated, key) for negated, _, key in best), key=lambda item: item[0])
+
+    def _cell(self, lat: float, lon: float) -> Cell:
+        """Grid cell of a position."""
+        return self._row(lat), self._column(lon)
+
+    def _row(self, lat: float) -> int:
+        return int(math.floor(lat / self.cell_degrees))
+
+    def _column(self, lon: float) -> int:
+        return self._wrap(int(math.floor(lon / self.cell_degrees)))
+
+    def _discard_from_cell(self, key: Hashable, cell: Cell) -> None:
+        """Remove a key from a cell, dropping the cell when it empties."""
+        bucket = self.cells.get(cell)
+        if bucket is not None:
+            bucket.discard(key)
+            if not bucket:
+                del self.cells[cell]
+
+    def _radius_cells(self, lat: float, lon: float, radius_km: float, rows: int) -> Iterator[Cell]:
+        """Cells that can hold a point within radius_km."""
+        center_row, center_column = self._cell(lat, lon)
+        lon_scale = max(math.cos(math.radians(min(abs(lat) + rows * self.cell_degrees, 89.9))), 1e-6)
+        columns = min(int(math.ceil(radius_km / (KM_PER_DEGREE * lon_scale) / self.cell_degrees)),
+                      self.columns // 2)
+        wrapped = {self._wrap(center_column + offset) for offset in range(-columns, columns + 1)}
+        for row in range(center_row - rows, center_row + rows + 1):
+            for column in wrapped:
+                yield row, column
+
+    def _ring_cells(self, center_row: int, center_column: int, ring: int) -> Iterator[Cell]:
+        """Cells at Chebyshev distance ring from a center cell."""
+        if ring == 0:
+            yield center_row, center_column
+            return
+        columns = {self._wrap(center_column + offset) for offset in range(-ring, ring + 1)}
+        for row in (center_row - ring, center_row + ring):
+            for column in columns:
+                yield row, column
+        edge_columns = {self._wrap(center_column - ring), self._wrap(center_column + ring)}
+        for row in range(center_row - ring + 1, center_row + ring):
+            for column in edge_columns:
+                yield row, column
+
+    def _wrap(self, column: int) -> int:
+        return (column + self.columns // 2) % self.columns - self.columns // 2
+
+    def _keys_in_cells(self, cells: Iterator[Cell]) -> Iterator[Hashable]:
+        """Keys in the given cells (each cell visited once)."""
+        visited = set()
+        grid = self.cells
+        for cell in cells:
+            if cell in visited:
+                continue
+            visited.add(cell)
+            bucket = grid.get(cell)
+            if bucket:
+                yield from bucket
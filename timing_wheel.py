@@ -0,0 +1,121 @@
+"""
+Hierarchical timing wheel for expiring tracked state.
+
+Keys are filed in one-second slots by deadline; level 0 covers the next
+`slots` seconds and every further level covers `slots` times more, with
+far slots cascading down as time reaches them. Scheduling and expiring a
+key are O(1), so owners can expire state every second instead of scanning
+everything once a minute.
+
+Owners reschedule lazily: a key is filed once, and when it comes due the
+owner checks its real last-seen time and files it again if it was refreshed
+meanwhile. Updates then only write a timestamp.
+"""
+
+import math
+import threading
+import time
+from typing import Dict, Hashable, List, Optional, Set, Tuple
+
+
+class TimingWheel:
+    """Keys due at whole-tick deadlines, expired by advance()."""
+
+    def __init__(self, slots: int = 64, levels: int = 3, resolution: float = 1.0,
+                 start: Optional[float] = None):
+        self.slots = slots
+        self.levels = levels
+        self.resolution = resolution
+        self.wheels: List[List[Set[Hashable]]] = [[set() for _ in range(slots)] for _ in range(levels)]
+        self.entries: Dict[Hashable, Tuple[int, int, int]] = {}  # key -> (tick, level, slot)
+        self.current = self._tick(time.monotonic() if start is None else start)
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self.entries)
+
+    def __contains__(self, key: Hashable) -> bool:
+        return key in self.entries
+
+    def schedule(self, key: Hashable, deadline: float) -> None:
+        """File a key to come due at deadline; an already earlier deadline is kept."""
+        with self._lock:
+            tick = max(self._tick(deadline), self.current)
+            entry = self.entries.get(key)
+            if entry is not None:
+                if entry[0] <= tick:
+                    return
+                self.wheels[entry[1]][entry[2]].discard(key)
+            self._insert(key, tick)
+
+    def cancel(self, key: Hashable) -> None:
+        """Remove a key."""
+        with self._lock:
+            entry = self.entries.pop(key, None)
+            if entry is not None:
+                self.wheels[entry[1]][entry[2]].discard(key)
+
+    def advance(self, now: float) -> List[Hashable]:
+        """Move the wheel up to now and return the keys that came due."""
+        target = self._tick(now)
+        due: List[Hashable] = []
+        with self._lock:
+            if target - self.current >= self.slots ** self.levels:
+                # Stalled for longer than the wheel spans: collect directly
+                due = [key for key, entry in self.entries.items() if entry[0] <= target]
+                for key in due:
+                    entry = self.entries.pop(key)
+                    self.wheels[entry[1]][entry[2]].discard(key)
+                self.current = target + 1
+                self._refile_all()
+                return due
+
+            while self.current <= target:
+                tick = self.current
+                if tick % self.slots == 0:
+                    self._cascade(tick)
+                index = tick % self.slots
+                slot = self.wheels[0][index]
+                if slot:
+                    self.wheels[0][index] = set()
+                    for key in slot:
+                        del self.entries[key]
+                    due.extend(slot)
+                self.current = tick + 1
+        return due
+
+    def _tick(self, timestamp: float) -> int:
+        """Convert a time to a whole tick, rounding up."""
+        return int(math.ceil(timestamp / self.resolution))
+
+    def _insert(self, key: Hashable, tick: int) -> None:
+        """File a key at the lowest level whose range holds its tick."""
+        span = 1
+        for level in range(self.levels):
+            if tick // span - self.current // span < self.slots or level == self.levels - 1:
+                index = (tick // span) % self.slots
+                self.wheels[level][index].add(key)
+                self.entries[key] = (tick, level, index)
+                return
+            span *= self.slots
+
+    def _cascade(self, tick: int) -> None:
+        """Refile higher-level slots that the wheel has reached."""
+        span = self.slots
+        for level in range(1, self.levels):
+            if tick % span:
+                break
+            index = (tick // span) % self.slots
+            slot = self.wheels[level][index]
+            if slot:
+                self.wheels[level][index] = set()
+                for key in slot:
+                    self._insert(key, self.entries[key][0])
+            span *= self.slots
+
+    def _refile_all(self) -> None:
+        """Refile every key relative to the current tick."""
+        entries = [(key, entry[0]) for key, entry in self.entries.items()]
+        self.wheels = [[set() for _ in range(self.slots)] for _ in range(self.levels)]
+        for key, tick in entries:
+            self._insert(key, max(tick, self.current))
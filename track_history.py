@@ -0,0 +1,262 @@
+"""
+Per-aircraft position history for Ursine Capture.
+
+Each aircraft keeps a bounded ring of (time, lat, lon, altitude, speed)
+samples in flat arrays. Samples are decimated on the way in: a new one is
+kept only once the aircraft has moved far enough or enough time has passed,
+so steady cruise costs a handful of samples a minute.
+
+Rings start small, double as samples arrive up to their capacity, and halve
+when eviction leaves them mostly empty, so allocated memory follows the
+number of samples actually stored. All rings share a global sample budget;
+when it is exceeded the oldest samples across all aircraft are evicted
+first.
+"""
+
+import math
+from array import array
+from collections import deque
+from typing import Any, Dict, List, Optional, Tuple
+
+
+# Stored for altitude/speed when unknown
+MISSING = -(1 << 31)
+
+# Decimation: keep a sample after MIN_INTERVAL seconds if the aircraft moved
+# MIN_DISTANCE_KM, and after MAX_INTERVAL seconds regardless
+MIN_INTERVAL = 1.0
+MIN_DISTANCE_KM = 0.25
+MAX_INTERVAL = 30.0
+
+_KM_PER_DEGREE = 111.195
+
+# Slots a new ring starts with
+INITIAL_SLOTS = 4
+
+Sample = Tuple[float, float, float, Optional[int], Optional[int]]
+
+
+class TrackHistory:
+    """Ring of up to capacity position samples for one aircraft, grown on demand."""
+
+    __slots__ = ('address', 'capacity', 'size', 'times', 'lats', 'lons', 'altitudes', 'speeds',
+                 'start', 'count', 'overwritten', 'closed')
+
+    def __init__(self, address: int, capacity: int):
+        self.address = address
+        self.capacity = capacity
+        self.size = min(INITIAL_SLOTS, capacity)  # allocated slots
+        self.times = array('d', bytes(8 * self.size))
+        self.lats = array('d', bytes(8 * self.size))
+        self.lons = array('d', bytes(8 * self.size))
+        self.altitudes = array('i', bytes(4 * self.size))
+        self.speeds = array('i', bytes(4 * self.size))
+        self.start = 0
+        self.count = 0
+        self.overwritten = 0  # samples lost to wrap-around not yet matched in the store's FIFO
+        self.closed = False
+
+    def __len__(self) -> int:
+        return self.count
+
+    def append(self, timestamp: float, lat: float, lon: float,
+               altitude: Optional[int], speed: Optional[int]) -> bool:
+        """Add a sample, returning True if it overwrote the oldest one."""
+        wrapped = self.count == self.capacity
+        if wrapped:
+            index = self.start
+            self.start = (self.start + 1) % self.size
+        else:
+            if self.count == self.size:
+                self._resize(min(2 * self.size, self.capacity))
+            index = (self.start + self.count) % self.size
+            self.count += 1
+        self.times[index] = timestamp
+        self.lats[index] = lat
+        self.lons[index] = lon
+        self.altitudes[index] = MISSING if altitude is None else altitude
+        self.speeds[index] = MISSING if speed is None else speed
+        return wrapped
+
+    def drop_oldest(self) -> None:
+        """Remove the oldest sample, shrinking the ring once it is mostly empty."""
+        if self.count:
+            self.start = (self.start + 1) % self.size
+            self.count -= 1
+            if self.size > INITIAL_SLOTS and self.count <= self.size // 4:
+                self._resize(max(self.size // 2, INITIAL_SLOTS))
+
+    def nbytes(self) -> int:
+        """Bytes allocated for sample storage."""
+        return sum(len(values) * values.itemsize
+                   for values in (self.times, self.lats, self.lons, self.altitudes, self.speeds))
+
+    def last(self) -> Optional[Tuple[float, float, float]]:
+        """Get (time, lat, lon) of the newest sample."""
+        if not self.count:
+            return None
+        index = (self.start + self.count - 1) % self.size
+        return self.times[index], self.lats[index], self.lons[index]
+
+    def samples(self, since: float = 0.0) -> List[Sample]:
+        """Get samples oldest first as (time, lat, lon, altitude, speed)."""
+        result = []
+        for offset in range(self.count):
+            index = (self.start + offset) % self.size
+            timestamp = self.times[index]
+            if timestamp < since:
+                continue
+            altitude = self.altitudes[index]
+            speed = self.speeds[index]
+            result.append((timestamp, self.lats[index], self.lons[index],
+                           None if altitude == MISSING else altitude,
+                           None if speed == MISSING else speed))
+        return result
+
+    def course_change(self, seconds: float) -> Optional[float]:
+        """Get the change in course over ground (degrees, -180..180) across the last seconds."""
+        if self.count < 3:
+            return None
+        newest = (self.start + self.count - 1) % self.size
+        cutoff = self.times[newest] - seconds
+
+        # Oldest pair inside the window against the newest pair
+        first = None
+        for offset in range(self.count - 1):
+            index = (self.start + offset) % self.size
+            if self.times[index] >= cutoff:
+                first = offset
+                break
+        if first is None or first >= self.count - 2:
+            return None
+
+        a = (self.start + first) % self.size
+        b = (self.start + first + 1) % self.size
+        c = (self.start + self.count - 2) % self.size
+        change = self._bearing(c, newest) - self._bearing(a, b)
+        return (change + 180.0) % 360.0 - 180.0
+
+    def _resize(self, size: int) -> None:
+        """Reallocate the arrays with size slots, oldest sample first."""
+        order = [(self.start + offset) % self.size for offset in range(self.count)]
+        padding = size - self.count
+        for name in ('times', 'lats', 'lons', 'altitudes', 'speeds'):
+            old = getattr(self, name)
+            new = array(old.typecode, [old[index] for index in order])
+            new.frombytes(bytes(old.itemsize * padding))
+            setattr(self, name, new)
+        self.start = 0
+        self.size = size
+
+    def _bearing(self, a: int, b: int) -> float:
+        """Approximate course from sample a to sample b in degrees."""
+        east = (self.lons[b] - self.lons[a]) * math.cos(math.radians(self.lats[a]))
+        north = self.lats[b] - self.lats[a]
+        return math.degrees(math.atan2(east, north)) % 360.0
+
+
+class TrackHistoryStore:
+    """Track histories of all aircraft under one global sample budget."""
+
+    def __init__(self, capacity: int = 120, max_samples: int = 200000):
+        self.capacity = capacity
+        self.max_samples = max_samples
+        self.tracks: Dict[int, TrackHistory] = {}
+        self.total = 0
+
+        # One entry per stored sample, oldest first, naming the ring it went into
+        self._fifo: deque = deque()
+
+        # Statistics
+        self.recorded = 0
+        self.decimated = 0
+        self.evicted = 0
+
+    def __len__(self) -> int:
+        return len(self.tracks)
+
+    def record(self, address: int, timestamp: float, lat: float, lon: float,
+               altitude: Optional[int] = None, speed: Optional[int] = None) -> bool:
+        """Record a position unless it is too close in time and space to the last one."""
+        track = self.tracks.get(address)
+        if track is None:
+            track = self.tracks[address] = TrackHistory(address, self.capacity)
+        else:
+            last_time, last_lat, last_lon = track.last()
+            elapsed = timestamp - last_time
+            if elapsed < MAX_INTERVAL:
+                if elapsed < MIN_INTERVAL:
+                    self.decimated += 1
+                    return False
+                north = (lat - last_lat) * _KM_PER_DEGREE
+                east = (lon - last_lon) * _KM_PER_DEGREE * math.cos(math.radians(lat))
+                if north * north + east * east < MIN_DISTANCE_KM * MIN_DISTANCE_KM:
+                    self.decimated += 1
+                    return False
+
+        if track.append(timestamp, lat, lon, altitude, speed):
+            # The ring dropped its own oldest sample
+            track.overwritten += 1
+        else:
+            self.total += 1
+        self._fifo.append(track)
+        self.recorded += 1
+
+        if self.total > self.max_samples:
+            self._evict()
+        elif len(self._fifo) > 2 * self.max_samples:
+            self._compact()
+        return True
+
+    def get(self, address: int) -> Optional[TrackHistory]:
+        """Get an aircraft's history."""
+        return self.tracks.get(address)
+
+    def discard(self, address: int) -> None:
+        """Forget an aircraft's history."""
+        track = self.tracks.pop(address, None)
+        if track is not None:
+            track.closed = True
+            self.total -= track.count
+
+    def get_statistics(self) -> Dict[str, Any]:
+        """Get history statistics."""
+        return {
+            "aircraft": len(self.tracks),
+            "samples": self.total,
+            "max_samples": self.max_samples,
+            "recorded": self.recorded,
+            "decimated": self.decimated,
+            "evicted": self.evicted,
+            "memory_bytes": sum(track.nbytes() for track in self.tracks.values())
+        }
+
+    def _evict(self) -> None:
+        """Drop the globally oldest samples until back under budget."""
+        fifo = self._fifo
+        while self.total > self.max_samples and fifo:
+            track = fifo.popleft()
+            if track.closed:
+                continue
+            if track.overwritten:
+                # This sample already fell off the ring
+                track.overwritten -= 1
+                continue
+            track.drop_oldest()
+            self.total -= 1
+            self.evicted += 1
+            if not track.count:
+                track.closed = True
+                del self.tracks[track.address]
+
+    def _compact(self) -> None:
+        """Drop FIFO entries for samples that no longer exist."""
+        fifo = deque()
+        for track in self._fifo:
+            if track.closed:
+                continue
+            if track.overwritten:
+                track.overwritten -= 1
+                continue
+            fifo.append(track)
+        self._fifo = fifo
@@ -0,0 +1,333 @@
+#!/usr/bin/env python3
+"""
+Synthetic ADS-B traffic generator for load-testing without radios.
+
+Simulates aircraft flying around the configured reference position and
+serves their messages the way dump1090 does:
+
+    30002  AVR raw text (*8D...;)
+    30003  SBS/BaseStation text
+    30005  Beast binary
+
+Every aircraft transmits identification, even/odd airborne position and
+velocity DF17 frames with valid CRC, at roughly real squitter rates scaled to
+the requested total message rate.
+
+Usage: python traffic_generator.py [aircraft] [msgs_per_sec] [config.json] [port_offset]
+"""
+
+import asyncio
+import json
+import logging
+import math
+import random
+import sys
+import time
+from dataclasses import dataclass, field
+from datetime import datetime
+from typing import Any, Dict, List, Optional, Set
+
+from beast import encode_frame, FRAME_MODE_S_LONG, MLAT_CLOCK_HZ
+from modes import encode_identification, encode_airborne_position, encode_velocity
+
+
+logger = logging.getLogger(__name__)
+
+
+AVR_PORT = 30002
+SBS_PORT = 30003
+BEAST_PORT = 30005
+
+# Traffic stays within this distance of the reference position
+DEFAULT_RADIUS_KM = 250.0
+
+# Message mix per aircraft, roughly matching real squitter rates
+# (positions and velocity twice a second, identification every five seconds)
+MESSAGE_CYCLE = ('position', 'velocity', 'position', 'velocity') * 5 + ('identification',)
+
+# Clients more than this far behind are disconnected
+MAX_CLIENT_BUFFER = 1024 * 1024
+
+TICK_SECONDS = 0.02
+
+_EARTH_RADIUS_KM = 6371.0
+_KT_TO_KMS = 1.852 / 3600
+
+
+@dataclass
+class SimulatedAircraft:
+    """State of one simulated aircraft."""
+    address: int
+    callsign: str
+    lat: float
+    lon: float
+    altitude: float
+    speed: float          # knots
+    track: float          # degrees
+    vertical_rate: int    # ft/min
+    cycle_position: int = 0
+    odd: bool = False
+
+    @property
+    def icao(self) -> str:
+        """Get ICAO address as hex string."""
+        return f"{self.address:06X}"
+
+
+@dataclass
+class GeneratorStats:
+    """Counters for the generator."""
+    messages: int = 0
+    beast_bytes: int = 0
+    sbs_lines: int = 0
+    clients_dropped: int = 0
+    started: float = field(default_factory=time.monotonic)
+
+
+class TrafficSimulator:
+    """Moves aircraft around a reference point and encodes their messages."""
+
+    def __init__(self, aircraft_count: int, ref_lat: float, ref_lon: float,
+                 radius_km: float = DEFAULT_RADIUS_KM, seed: Optional[int] = None):
+        self.ref_lat = ref_lat
+        self.ref_lon = ref_lon
+        self.radius_km = radius_km
+        self.random = random.Random(seed)
+        self.aircraft = [self._spawn(i) for i in range(aircraft_count)]
+        self._next = 0
+
+    def _spawn(self, index: int) -> SimulatedAircraft:
+        """Create an aircraft at a random position within the radius."""
+        rng = self.random
+        distance = self.radius_km * math.sqrt(rng.random())
+        bearing = rng.uniform(0, 360)
+        lat, lon = self._offset(self.ref_lat, self.ref_lon, distance, bearing)
+        airline = rng.choice(("UAL", "AAL", "DAL", "SWA", "ASA", "JBU", "N"))
+        number = rng.randint(1, 9999)
+        return SimulatedAircraft(
+            address=(0xA00001 + index * 7919) & 0xFFFFFF,
+            callsign=f"{airline}{number}"[:8],
+            lat=lat,
+            lon=lon,
+            altitude=rng.choice((rng.uniform(2000, 12000), rng.uniform(25000, 41000))),
+            speed=rng.uniform(180, 520),
+            track=rng.uniform(0, 360),
+            vertical_rate=rng.choice((0, 0, 0, 1280, -1280, 640, -640)),
+            cycle_position=rng.randrange(len(MESSAGE_CYCLE))
+        )
+
+    @staticmethod
+    def _offset(lat: float, lon: float, distance_km: float, bearing: float) -> tuple:
+        """Move a position by a distance along a bearing (great circle)."""
+        angular = distance_km / _EARTH_RADIUS_KM
+        lat1 = math.radians(lat)
+        lon1 = math.radians(lon)
+        brg = math.radians(bearing)
+        lat2 = math.asin(math.sin(lat1) * math.cos(angular) +
+                         math.cos(lat1) * math.sin(angular) * math.cos(brg))
+        lon2 = lon1 + math.atan2(math.sin(brg) * math.sin(angular) * math.cos(lat1),
+                                 math.cos(angular) - math.sin(lat1) * math.sin(lat2))
+        return math.degrees(lat2), (math.degrees(lon2) + 540) % 360 - 180
+
+    def advance(self, seconds: float) -> None:
+        """Move every aircraft forward in time, turning back at the edge of the area."""
+        for aircraft in self.aircraft:
+            aircraft.lat, aircraft.lon = self._offset(aircraft.lat, aircraft.lon,
+                                                      aircraft.speed * _KT_TO_KMS * seconds, aircraft.track)
+            aircraft.altitude = max(1000.0, min(45000.0, aircraft.altitude + aircraft.vertical_rate * seconds / 60))
+            if aircraft.altitude in (1000.0, 45000.0):
+                aircraft.vertical_rate = 0
+
+            # Gentle random turns, and head home when leaving the area
+            dlat = math.radians(self.ref_lat - aircraft.lat)
+            dlon = math.radians(self.ref_lon - aircraft.lon) * math.cos(math.radians(aircraft.lat))
+            if math.hypot(dlat, dlon) * _EARTH_RADIUS_KM > self.radius_km:
+                home = math.degrees(math.atan2(dlon, dlat)) % 360
+                turn = ((home - aircraft.track + 540) % 360) - 180
+                aircraft.track = (aircraft.track + max(-3.0, min(3.0, turn)) * seconds) % 360
+            elif self.random.random() < 0.01:
+                aircraft.track = (aircraft.track + self.random.uniform(-20, 20)) % 360
+
+    def next_messages(self, count: int) -> List[tuple]:
+        """Get the next messages round-robin as (aircraft, kind, frame bytes)."""
+        messages = []
+        fleet = self.aircraft
+        if not fleet:
+            return messages
+        for _ in range(count):
+            aircraft = fleet[self._next]
+            self._next = (self._next + 1) % len(fleet)
+
+            kind = MESSAGE_CYCLE[aircraft.cycle_position]
+            aircraft.cycle_position = (aircraft.cycle_position + 1) % len(MESSAGE_CYCLE)
+
+            if kind == 'position':
+                frame = encode_airborne_position(aircraft.address, aircraft.lat, aircraft.lon,
+                                                 int(aircraft.altitude), aircraft.odd)
+                aircraft.odd = not aircraft.odd
+            elif kind == 'velocity':
+                frame = encode_velocity(aircraft.address, aircraft.speed, aircraft.track, aircraft.vertical_rate)
+            else:
+                frame = encode_identification(aircraft.address, aircraft.callsign)
+            messages.append((aircraft, kind, frame))
+        return messages
+
+
+def sbs_line(aircraft: SimulatedAircraft, kind: str, now: datetime) -> str:
+    """Format a message as the SBS line dump1090 would emit for it."""
+    date = now.strftime("%Y/%m/%d")
+    clock = now.strftime("%H:%M:%S.") + f"{now.microsecond // 1000:03d}"
+    fields = [""] * 12
+    if kind == 'position':
+        msg_type = 3
+        fields[1] = str(int(aircraft.altitude))
+        fields[4] = f"{aircraft.lat:.5f}"
+        fields[5] = f"{aircraft.lon:.5f}"
+    elif kind == 'velocity':
+        msg_type = 4
+        fields[2] = str(int(aircraft.speed))
+        fields[3] = str(int(round(aircraft.track)) % 360)
+        fields[6] = str(aircraft.vertical_rate)
+    else:
+        msg_type = 1
+        fields[0] = aircraft.callsign
+    fields[8:12] = ["0", "0", "0", "0"]
+    return (f"MSG,{msg_type},1,1,{aircraft.icao},1,{date},{clock},{date},{clock}," +
+            ",".join(fields) + "\n")
+
+
+class TrafficServer:
+    """Serves simulated traffic on dump1090-style AVR, SBS and Beast ports."""
+
+    def __init__(self, simulator: TrafficSimulator, rate: float, host: str = "127.0.0.1",
+                 port_offset: int = 0):
+        self.simulator = simulator
+        self.rate = rate
+        self.host = host
+        self.ports = {
+            'avr': AVR_PORT + port_offset,
+            'sbs': SBS_PORT + port_offset,
+            'beast': BEAST_PORT + port_offset,
+        }
+        self.clients: Dict[str, Set[asyncio.StreamWriter]] = {name: set() for name in self.ports}
+        self.stats = GeneratorStats()
+        self._clock_start = time.monotonic()
+
+    async def run(self, duration: Optional[float] = None) -> None:
+        """Serve traffic until cancelled or for the given number of seconds."""
+        servers = []
+        for name, port in self.ports.items():
+            server = await asyncio.start_server(
+                lambda reader, writer, name=name: self._on_client(name, reader, writer), self.host, port)
+            servers.append(server)
+            logger.info(f"Serving {name} traffic on {self.host}:{port}")
+
+        try:
+            await self._generate(duration)
+        finally:
+            for server in servers:
+                server.close()
+            for writers in self.clients.values():
+                for writer in writers:
+                    writer.close()
+
+    async def _on_client(self, name: str, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        """Register a client and wait for it to disconnect."""
+        self.clients[name].add(writer)
+        logger.info(f"{name} client connected: {writer.get_extra_info('peername')}")
+        try:
+            while await reader.read(1024):
+                pass
+        except (ConnectionError, asyncio.CancelledError):
+            pass
+        finally:
+            self.clients[name].discard(writer)
+
+    async def _generate(self, duration: Optional[float]) -> None:
+        """Generate messages at the configured rate and broadcast them."""
+        start = time.monotonic()
+        last = start
+        owed = 0.0
+        while duration is None or time.monotonic() - start < duration:
+            await asyncio.sleep(TICK_SECONDS)
+            now = time.monotonic()
+            elapsed = now - last
+            last = now
+
+            self.simulator.advance(elapsed)
+            owed += self.rate * elapsed
+            count = int(owed)
+            owed -= count
+            if count:
+                self._broadcast(self.simulator.next_messages(count), now)
+
+    def _broadcast(self, messages: List[tuple], now: float) -> None:
+        """Encode a batch once per format and write it to every client."""
+        clients = self.clients
+        timestamp = int((now - self._clock_start) * MLAT_CLOCK_HZ)
+
+        payloads = {}
+        if clients['beast']:
+            payloads['beast'] = b''.join(
+                encode_frame(FRAME_MODE_S_LONG, frame, timestamp + i * 120, self.simulator.random.randint(40, 220))
+                for i, (_, _, frame) in enumerate(messages))
+            self.stats.beast_bytes += len(payloads['beast'])
+        if clients['avr']:
+            payloads['avr'] = ''.join(f"*{frame.hex().upper()};\n" for _, _, frame in messages).encode('ascii')
+        if clients['sbs']:
+            wall = datetime.now()
+            payloads['sbs'] = ''.join(sbs_line(aircraft, kind, wall)
+                                      for aircraft, kind, _ in messages).encode('ascii')
+            self.stats.sbs_lines += len(messages)
+
+        for name, payload in payloads.items():
+            for writer in list(clients[name]):
+                if writer.transport.get_write_buffer_size() > MAX_CLIENT_BUFFER:
+                    logger.warning(f"{name} client too slow, disconnecting")
+                    self.stats.clients_dropped += 1
+                    clients[name].discard(writer)
+                    writer.close()
+                    continue
+                writer.write(payload)
+
+        self.stats.messages += len(messages)
+
+    def get_statistics(self) -> Dict[str, Any]:
+        """Get generator statistics."""
+        elapsed = time.monotonic() - self.stats.started
+        return {
+            "aircraft": len(self.simulator.aircraft),
+            "target_rate": self.rate,
+            "messages": self.stats.messages,
+            "actual_rate": round(self.stats.messages / elapsed, 1) if elapsed > 0 else 0.0,
+            "clients": {name: len(writers) for name, writers in self.clients.items()},
+            "clients_dropped": self.stats.clients_dropped
+        }
+
+
+def main():
+    """Run the traffic generator until interrupted."""
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s - %(levelname)s - %(message)s")
+
+    aircraft_count = int(sys.argv[1]) if len(sys.argv) > 1 else 50
+    rate = float(sys.argv[2]) if len(sys.argv) > 2 else 500.0
+    config_path = sys.argv[3] if len(sys.argv) > 3 else "config.json"
+    port_offset = int(sys.argv[4]) if len(sys.argv) > 4 else 0
+
+    from config import Config
+    receiver_config = Config(config_path).snapshot.receiver
+
+    simulator = TrafficSimulator(aircraft_count, receiver_config.reference_lat, receiver_config.reference_lon)
+    server = TrafficServer(simulator, rate, port_offset=port_offset)
+    logger.info(f"Simulating {aircraft_count} aircraft at {rate:.0f} msg/s around "
+                f"{receiver_config.reference_lat}, {receiver_config.reference_lon}")
+
+    try:
+        asyncio.run(server.run())
+    except KeyboardInterrupt:
+        pass
+    print(json.dumps(server.get_statistics(), indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -4,9 +4,11 @@ Shared utilities and helper functions for Ursine Capture system.
 
 import logging
 import math
+import os
 import re
 import subprocess
 import psutil
+import tempfile
 import time
 import traceback
 from datetime import datetime, timedelta
@@ -594,4 +596,21 @@ def calculate_bearing(lat1: float, lon1: float, lat2: float, lon2: float) -> flo
     # Normalize to 0-360 degrees
     bearing_deg = (bearing_deg + 360) % 360
     
-    return bearing_deg
\ No newline at end of file
+    return bearing_deg
+
+
+def atomic_write(filename: str, text: str) -> None:
+    """Write text to a file atomically so readers never see a partial file."""
+    directory = os.path.dirname(os.path.abspath(filename))
+    fd, temp_path = tempfile.mkstemp(prefix=f".{os.path.basename(filename)}.", suffix=".tmp", dir=directory)
+    try:
+        with os.fdopen(fd, 'w') as f:
+            f.write(text)
+        os.chmod(temp_path, 0o644)
+        os.replace(temp_path, filename)
+    except BaseException:
+        try:
+            os.unlink(temp_path)
+        except OSError:
+            pass
+        raise